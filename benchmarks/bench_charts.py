@@ -0,0 +1,120 @@
+"""
+Benchmark : octets envoyés au client Flet par tick pour les graphiques.
+
+Compare l'ancienne mise à jour (réécriture de toutes les ordonnées à chaque
+tick) au glissement de fenêtre de SlidingWindow (points ajoutés/retirés,
+valeurs quantifiées, rien d'envoyé si rien n'a changé visuellement), sur les
+graphiques CPU, RAM et réseau d'une page Flet hors ligne. Les commandes de
+chaque page.update() sont sérialisées comme par le serveur Flet pour compter
+les octets qui partiraient vers un client distant (mode web).
+
+Usage :
+    python benchmarks/bench_charts.py [--ticks 300] [--idle 0.2] [--seed 0]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import flet as ft  # noqa: E402
+from flet.core.connection import Connection  # noqa: E402
+from flet.core.protocol import CommandEncoder, PageCommandsBatchResponsePayload  # noqa: E402
+
+from constants import HISTORY_SIZE  # noqa: E402
+from components.charts import CPULineChart, RAMLineChart, NetworkLineChart  # noqa: E402
+
+
+class CountingConnection(Connection):
+    """Connexion Flet hors ligne : compte les octets JSON de chaque lot de commandes."""
+
+    def __init__(self):
+        super().__init__()
+        self.bytes_sent = 0
+        self._ids = itertools.count(1)
+
+    def send_command(self, session_id, command):
+        return self.send_commands(session_id, [command])
+
+    def send_commands(self, session_id, commands):
+        if commands:
+            self.bytes_sent += len(json.dumps(commands, cls=CommandEncoder, separators=(",", ":")))
+        results = [
+            " ".join(f"_{next(self._ids)}" for _ in command.commands)
+            for command in commands if command.name in ("add", "get")
+        ]
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+def legacy_update(chart, *histories, scale=1.0):
+    """Ancienne mise à jour : réécriture de toutes les ordonnées."""
+    for data, history in zip(chart.chart.data_series, histories):
+        for point, value in zip(data.data_points, history):
+            point.y = min(value * scale, 100) if value else 0
+
+
+def run(mode, ticks, idle, seed):
+    """
+    Returns:
+        (octets moyens par tick, ms moyennes par tick)
+    """
+    rng = random.Random(seed)
+    connection = CountingConnection()
+    page = ft.Page(connection, "bench", asyncio.new_event_loop())
+    charts = (CPULineChart(), RAMLineChart(), NetworkLineChart())
+    page.add(*charts)
+    connection.bytes_sent = 0
+
+    series = {name: [0.0] * HISTORY_SIZE for name in ('cpu', 'ram', 'down', 'up')}
+    level = {'cpu': 20.0, 'ram': 60.0, 'down': 300.0, 'up': 50.0}
+    elapsed = 0.0
+    for _ in range(ticks):
+        # Un tick sur `idle` sans nouvel échantillon (collecteur plus lent que l'UI)
+        if rng.random() >= idle:
+            for name, history in series.items():
+                level[name] = max(0.0, level[name] + rng.gauss(0, 2 if name in ('cpu', 'ram') else 40))
+                history.append(level[name])
+                del history[0]
+
+        started = time.perf_counter()
+        if mode == 'legacy':
+            legacy_update(charts[0], series['cpu'])
+            legacy_update(charts[1], series['ram'])
+            legacy_update(charts[2], series['down'], series['up'], scale=0.1)
+            for chart in charts:
+                chart.chart.update()  # Ancien envoi par graphique
+        else:
+            charts[0].update_chart(series['cpu'])
+            charts[1].update_chart(series['ram'])
+            charts[2].update_chart(series['down'], series['up'])
+        page.update()
+        elapsed += time.perf_counter() - started
+
+    return connection.bytes_sent / ticks, elapsed / ticks * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--idle", type=float, default=0.2,
+                        help="Proportion de ticks sans nouvel échantillon")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'bytes/tick':>11} {'ms/tick':>8}")
+    results = {}
+    for mode in ('legacy', 'sliding'):
+        results[mode] = run(mode, args.ticks, args.idle, args.seed)
+        print(f"{mode:>8} {results[mode][0]:>11.0f} {results[mode][1]:>8.3f}")
+    legacy, sliding = results['legacy'][0], results['sliding'][0]
+    if sliding:
+        print(f"{'':>8} {legacy / sliding:>10.1f}x fewer bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark : sélection des processus les plus gourmands.
+
+Compare l'ancien chemin (process_iter + dict par processus + tri complet)
+au cache persistant ProcessCache + sélection bornée top_k (tas).
+
+Usage :
+    python benchmarks/bench_processes.py [--ticks 20] [--sizes 1000 10000 50000]
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+
+import fake_psutil  # noqa: E402
+
+psutil = fake_psutil.install()
+
+from process_table import ProcessCache, top_k  # noqa: E402
+
+
+LIMIT = 7
+
+
+def legacy_top_processes(cpu_count, limit=LIMIT, sort_by='cpu'):
+    """Chemin historique de SystemDataManager.get_top_processes (avant le cache)."""
+    procs = []
+    for p in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+        try:
+            cpu_pct = p.info['cpu_percent'] or 0.0
+            mem_pct = p.info['memory_percent'] or 0.0
+            name = p.info['name'] or "Unknown"
+            if cpu_pct > 0:
+                cpu_pct = min(cpu_pct / cpu_count, 100)
+            procs.append({
+                'pid': p.info['pid'],
+                'name': name,
+                'cpu_percent': cpu_pct,
+                'memory_percent': mem_pct,
+            })
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    sort_key = 'cpu_percent' if sort_by == 'cpu' else 'memory_percent'
+    return sorted(procs, key=lambda p: p[sort_key], reverse=True)[:limit]
+
+
+def cached_top_processes(cache, cpu_count, limit=LIMIT, sort_by='cpu'):
+    rows = cache.sample(cpu_count, True)
+    return top_k(rows, limit, sort_by)
+
+
+def measure(func, ticks):
+    """Temps moyen par tick (ms), churn des PID exclu de la mesure."""
+    func()  # amorçage (création des objets Process)
+    total = 0.0
+    for _ in range(ticks):
+        fake_psutil.advance()
+        started = time.perf_counter()
+        func()
+        total += time.perf_counter() - started
+    return total / ticks * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    cpu_count = psutil.cpu_count()
+    print(f"{'processes':>10} {'legacy ms':>11} {'cached ms':>11} {'speedup':>8}")
+    for size in args.sizes:
+        fake_psutil.configure(size)
+        legacy = measure(lambda: legacy_top_processes(cpu_count), args.ticks)
+
+        fake_psutil.configure(size)
+        cache = ProcessCache()
+        cached = measure(lambda: cached_top_processes(cache, cpu_count), args.ticks)
+
+        print(f"{size:>10} {legacy:>11.2f} {cached:>11.2f} {legacy / cached:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark : coût par tick des collecteurs CPU/RAM/réseau sous Linux.
+
+Compare le chemin rapide /proc (ProcfsBackend : fichiers pré-ouverts, pread
+dans un buffer réutilisé) aux fonctions génériques de psutil, puis le scan
+groupé de la table des processus (ProcScanner) au cache psutil ProcessCache,
+sur le /proc réel avec `--spawn` processus inactifs supplémentaires.
+
+Usage :
+    python benchmarks/bench_procfs.py [--ticks 2000] [--spawn 1000] [--scans 20]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from procfs import ProcfsBackend, ProcScanner  # noqa: E402
+
+
+def measure(func, ticks):
+    """Temps moyen par appel en microsecondes."""
+    func()
+    started = time.perf_counter()
+    for _ in range(ticks):
+        func()
+    return (time.perf_counter() - started) / ticks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--spawn", type=int, default=1000)
+    parser.add_argument("--scans", type=int, default=20)
+    args = parser.parse_args()
+
+    backend = ProcfsBackend.create()
+    if backend is None:
+        sys.exit("Linux /proc fast path unavailable on this platform")
+
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    cases = [
+        ("cpu_percent", backend.cpu_percent, psutil and (lambda: psutil.cpu_percent(interval=None))),
+        ("virtual_memory", backend.virtual_memory, psutil and psutil.virtual_memory),
+        ("net_io_counters", backend.net_io_counters, psutil and psutil.net_io_counters),
+    ]
+
+    print(f"{'collector':>16} {'procfs us':>10} {'psutil us':>10} {'speedup':>8}")
+    total_fast = total_psutil = 0.0
+    for name, fast, generic in cases:
+        fast_us = measure(fast, args.ticks)
+        total_fast += fast_us
+        if generic:
+            generic_us = measure(generic, args.ticks)
+            total_psutil += generic_us
+            print(f"{name:>16} {fast_us:>10.1f} {generic_us:>10.1f} {generic_us / fast_us:>7.2f}x")
+        else:
+            print(f"{name:>16} {fast_us:>10.1f} {'n/a':>10} {'':>8}")
+
+    if psutil:
+        print(f"{'per tick':>16} {total_fast:>10.1f} {total_psutil:>10.1f} {total_psutil / total_fast:>7.2f}x")
+    backend.close()
+
+    if psutil:
+        bench_process_table(psutil, args.spawn, args.scans)
+
+
+def bench_process_table(psutil, spawn, scans):
+    """ProcScanner.scan contre ProcessCache.sample sur le /proc réel."""
+    from process_table import ProcessCache
+
+    children = [subprocess.Popen(["sleep", "600"]) for _ in range(spawn)]
+    try:
+        cpu_count = psutil.cpu_count() or 1
+        scanner = ProcScanner()
+        cache = ProcessCache()
+        scanner_ms = measure(lambda: scanner.scan(cpu_count), scans) / 1000
+        cache_ms = measure(lambda: cache.sample(cpu_count), scans) / 1000
+        count = len(scanner.scan(cpu_count))
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+
+    print()
+    print(f"{'processes':>16} {'procfs ms':>10} {'psutil ms':>10} {'speedup':>8}")
+    print(f"{count:>16} {scanner_ms:>10.2f} {cache_ms:>10.2f} {cache_ms / scanner_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Substitut synthétique de psutil pour les benchmarks Taskly.
+
+Reproduit la surface d'API utilisée par SystemDataManager avec une table de
+processus générée à partir d'une graine, afin d'obtenir des mesures
+reproductibles quel que soit l'état de la machine.
+
+Usage :
+    import fake_psutil
+    fake_psutil.install(process_count=10000)   # remplace sys.modules['psutil']
+    fake_psutil.advance()                      # simule un tick (churn des PID)
+"""
+import random
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+
+POWER_TIME_UNLIMITED = -2
+POWER_TIME_UNKNOWN = -1
+
+
+class Error(Exception):
+    pass
+
+
+class NoSuchProcess(Error):
+    def __init__(self, pid=None, name=None, msg=None):
+        super().__init__(msg or f"process no longer exists (pid={pid})")
+        self.pid = pid
+
+
+class ZombieProcess(NoSuchProcess):
+    pass
+
+
+class AccessDenied(Error):
+    def __init__(self, pid=None, name=None, msg=None):
+        super().__init__(msg or f"access denied (pid={pid})")
+        self.pid = pid
+
+
+# ==========================================
+# ÉTAT SYNTHÉTIQUE
+# ==========================================
+_NAMES = ["python", "chrome", "postgres", "nginx", "java", "node", "bash", "sshd", "redis", "kworker"]
+
+_state = {
+    'rng': random.Random(0),
+    'processes': {},     # pid -> [create_time, name, cpu, mem]
+    'next_pid': 1,
+    'churn': 0.005,
+    'cpu_count': 8,
+    'net': [0, 0],
+    'disk': [0, 0],
+}
+
+
+def configure(process_count=1000, seed=0, churn=0.005, cpu_count=8):
+    """(Ré)initialise la table synthétique."""
+    rng = random.Random(seed)
+    _state.update(rng=rng, processes={}, next_pid=1, churn=churn, cpu_count=cpu_count)
+    for _ in range(process_count):
+        _spawn()
+
+
+def _spawn():
+    rng = _state['rng']
+    pid = _state['next_pid']
+    _state['next_pid'] += 1
+    _state['processes'][pid] = [
+        time.time() - rng.random() * 1000,
+        rng.choice(_NAMES),
+        rng.expovariate(1.0) * 5,
+        rng.expovariate(1.0) * 0.5,
+    ]
+
+
+def advance():
+    """Simule un tick : fait varier la charge et renouvelle une fraction des PID."""
+    rng = _state['rng']
+    procs = _state['processes']
+    churn = int(len(procs) * _state['churn'])
+    if churn:
+        for pid in rng.sample(list(procs), churn):
+            del procs[pid]
+        for _ in range(churn):
+            _spawn()
+    for entry in rng.sample(list(procs.values()), min(len(procs), 100)):
+        entry[2] = rng.expovariate(1.0) * 5
+    _state['net'][0] += rng.randint(0, 10**6)
+    _state['net'][1] += rng.randint(0, 10**7)
+    _state['disk'][0] += rng.randint(0, 10**6)
+    _state['disk'][1] += rng.randint(0, 10**6)
+
+
+# ==========================================
+# PROCESSUS
+# ==========================================
+class Process:
+    def __init__(self, pid=None):
+        entry = _state['processes'].get(pid)
+        if entry is None:
+            raise NoSuchProcess(pid)
+        self.pid = pid
+        self._create_time = entry[0]
+        self.info = {}
+
+    def _entry(self):
+        entry = _state['processes'].get(self.pid)
+        if entry is None or entry[0] != self._create_time:
+            raise NoSuchProcess(self.pid)
+        return entry
+
+    @contextmanager
+    def oneshot(self):
+        yield
+
+    def create_time(self):
+        return self._create_time
+
+    def name(self):
+        return self._entry()[1]
+
+    def ppid(self):
+        self._entry()
+        return 1
+
+    def cpu_percent(self, interval=None):
+        return self._entry()[2]
+
+    def memory_percent(self):
+        return self._entry()[3]
+
+    def is_running(self):
+        # Comme psutil : compare avec une nouvelle instance pour détecter la réutilisation du PID
+        try:
+            return Process(self.pid)._create_time == self._create_time
+        except NoSuchProcess:
+            return False
+
+    def as_dict(self, attrs):
+        result = {}
+        with self.oneshot():
+            for attr in attrs:
+                try:
+                    value = getattr(self, attr)
+                    if callable(value):
+                        value = value()
+                except (AccessDenied, ZombieProcess):
+                    value = None
+                except NotImplementedError:
+                    continue
+                result[attr] = value
+        return result
+
+
+_pmap = {}
+
+
+def pids():
+    return list(_state['processes'])
+
+
+def process_iter(attrs=None):
+    """Reproduit psutil.process_iter : cache _pmap, tri des PID, is_running() par processus."""
+    def add(pid):
+        proc = Process(pid)
+        if attrs is not None:
+            proc.info = proc.as_dict(attrs)
+        _pmap[proc.pid] = proc
+        return proc
+
+    a = set(pids())
+    b = set(_pmap.keys())
+    for pid in b - a:
+        _pmap.pop(pid, None)
+
+    ls = sorted(list(_pmap.items()) + list(dict.fromkeys(a - b).items()))
+    for pid, proc in ls:
+        try:
+            if proc is None:
+                yield add(pid)
+            elif proc.is_running():
+                if attrs is not None:
+                    proc.info = proc.as_dict(attrs)
+                yield proc
+            else:
+                yield add(pid)
+        except NoSuchProcess:
+            _pmap.pop(pid, None)
+
+
+# ==========================================
+# MÉTRIQUES SYSTÈME
+# ==========================================
+_svmem = namedtuple('svmem', 'total available percent used free')
+_sdiskusage = namedtuple('sdiskusage', 'total used free percent')
+_sdiskio = namedtuple('sdiskio', 'read_count write_count read_bytes write_bytes read_time write_time')
+_snetio = namedtuple('snetio', 'bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout')
+_scpufreq = namedtuple('scpufreq', 'current min max')
+_sbattery = namedtuple('sbattery', 'percent secsleft power_plugged')
+_sdiskpart = namedtuple('sdiskpart', 'device mountpoint fstype opts')
+
+
+def cpu_percent(interval=None, percpu=False):
+    rng = _state['rng']
+    if percpu:
+        return [rng.random() * 100 for _ in range(_state['cpu_count'])]
+    return rng.random() * 100
+
+
+def cpu_count(logical=True):
+    return _state['cpu_count'] if logical else max(1, _state['cpu_count'] // 2)
+
+
+def cpu_freq(percpu=False):
+    freq = _scpufreq(2400.0, 800.0, 3600.0)
+    return [freq] * _state['cpu_count'] if percpu else freq
+
+
+def virtual_memory():
+    total = 64 * 1024**3
+    available = int(total * 0.4)
+    return _svmem(total, available, 60.0, total - available, available)
+
+
+def disk_usage(path):
+    total = 1024**4
+    return _sdiskusage(total, total // 2, total // 2, 50.0)
+
+
+def disk_partitions(all=False):
+    return [_sdiskpart('/dev/disk0s1', '/', 'apfs', 'rw')]
+
+
+def disk_io_counters(perdisk=False):
+    counters = _sdiskio(1000, 1000, _state['disk'][0], _state['disk'][1], 10, 10)
+    return {'disk0': counters} if perdisk else counters
+
+
+def net_io_counters(pernic=False):
+    counters = _snetio(_state['net'][0], _state['net'][1], 0, 0, 0, 0, 0, 0)
+    return {'en0': counters} if pernic else counters
+
+
+def sensors_battery():
+    return _sbattery(80, POWER_TIME_UNLIMITED, True)
+
+
+def boot_time():
+    return time.time() - 86400
+
+
+def install(process_count=1000, seed=0, **kwargs):
+    """Configure la table et remplace le module psutil réel."""
+    configure(process_count, seed, **kwargs)
+    sys.modules['psutil'] = sys.modules[__name__]
+    return sys.modules[__name__]
@@ -0,0 +1,182 @@
+"""
+Suite de benchmarks du chemin chaud de Taskly.
+
+Mesure le coût de chaque collecteur `_get_*_metrics` de SystemDataManager,
+de get_metrics() complet, de get_top_processes() (tri CPU et mémoire) et
+d'un tick de mise à jour complet (métriques + classements des processus),
+sur le substitut synthétique fake_psutil de 100 à 50 000 processus.
+
+Le chemin rapide /proc et la persistance de l'historique sont désactivés :
+les mesures ne dépendent ni de la machine ni du disque. Les résultats sont
+écrits en JSON ; `--compare` signale les régressions par rapport à un run
+précédent (code de sortie 1).
+
+Usage :
+    python benchmarks/run_benchmarks.py [--sizes 100 1000 10000 50000] [--ticks 20]
+                                        [--output results.json]
+                                        [--compare baseline.json] [--threshold 1.25]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+
+import fake_psutil  # noqa: E402
+
+psutil = fake_psutil.install()
+
+import data_manager  # noqa: E402
+from metric_sources import PsutilSource  # noqa: E402
+
+# Mesures reproductibles : aucune écriture disque
+data_manager.HISTORY_PERSIST = False
+
+SCHEMA_VERSION = 1
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+
+
+def force_due(manager):
+    """Rend tous les collecteurs dus pour que get_metrics() fasse un tick complet."""
+    now = manager.collectors.clock()
+    for job in manager.collectors.jobs.values():
+        job.deadline = now
+
+
+def measure(func, ticks, before=None):
+    """
+    Exécute `func` `ticks` fois après un appel d'amorçage.
+
+    `before` (churn des PID, échéances) est appelé avant chaque mesure,
+    hors chronométrage.
+
+    Returns:
+        Dict de statistiques en millisecondes
+    """
+    if before:
+        before()
+    func()
+
+    samples = []
+    for _ in range(ticks):
+        if before:
+            before()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    return {
+        'mean_ms': statistics.fmean(samples),
+        'median_ms': statistics.median(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'min_ms': samples[0],
+        'max_ms': samples[-1],
+    }
+
+
+def bench_size(size, ticks, seed):
+    """Toutes les mesures pour une table de `size` processus."""
+    fake_psutil.configure(size, seed=seed)
+    # Uniquement psutil (synthétique) : pas de chemin rapide /proc
+    manager = data_manager.SystemDataManager(source=PsutilSource(fastpath=False))
+
+    def tick():
+        fake_psutil.advance()
+        force_due(manager)
+
+    cases = {
+        f"collector.{name}": (func, fake_psutil.advance)
+        for name, func in manager._collector_funcs.items()
+    }
+    cases.update({
+        'get_metrics': (manager.get_metrics, tick),
+        'get_top_processes.cpu': (lambda: manager.get_top_processes(sort_by='cpu'), fake_psutil.advance),
+        'get_top_processes.memory': (lambda: manager.get_top_processes(sort_by='memory'), fake_psutil.advance),
+        'update_tick': (lambda: (manager.get_metrics(), manager.get_process_rankings()), tick),
+    })
+
+    results = {}
+    try:
+        for name, (func, before) in cases.items():
+            results[name] = measure(func, ticks, before)
+    finally:
+        manager.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Liste des cas dont la médiane dépasse `threshold` × la médiane de référence."""
+    regressions = []
+    for size, cases in results['results'].items():
+        for name, stats in cases.items():
+            reference = baseline.get('results', {}).get(size, {}).get(name)
+            if not reference or reference['median_ms'] <= 0:
+                continue
+            ratio = stats['median_ms'] / reference['median_ms']
+            if ratio > threshold:
+                regressions.append({
+                    'processes': int(size),
+                    'case': name,
+                    'baseline_ms': reference['median_ms'],
+                    'median_ms': stats['median_ms'],
+                    'ratio': ratio,
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Fichier JSON de sortie (stdout par défaut)")
+    parser.add_argument("--compare", help="Résultats JSON de référence")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Ratio de médiane au-delà duquel un cas est une régression")
+    args = parser.parse_args()
+
+    results = {
+        'schema': SCHEMA_VERSION,
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'ticks': args.ticks,
+            'seed': args.seed,
+            'cpu_count': psutil.cpu_count(),
+        },
+        'results': {},
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} processes...", file=sys.stderr)
+        results['results'][str(size)] = bench_size(size, args.ticks, args.seed)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        results['regressions'] = compare(results, baseline, args.threshold)
+        for item in results['regressions']:
+            print(f"REGRESSION {item['case']} @ {item['processes']}: "
+                  f"{item['baseline_ms']:.3f} -> {item['median_ms']:.3f} ms "
+                  f"({item['ratio']:.2f}x)", file=sys.stderr)
+        exit_code = 1 if results['regressions'] else 0
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
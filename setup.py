@@ -40,6 +40,7 @@ setup(
     entry_points={
         "console_scripts": [
             "taskly=main:main",
+            "taskly-agent=agent:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,305 @@
+"""
+Agent de collecte headless pour Taskly.
+Exécute SystemDataManager sans Flet et expose ses snapshots sur un socket Unix local.
+
+Protocole (une commande texte par ligne, réponses JSON terminées par '\\n') :
+    snapshot   -> dernier snapshot publié
+    subscribe  -> flux continu, un snapshot par tick jusqu'à la déconnexion
+    ping       -> {"ok": true, "version": N}
+
+Un seul passage de collecte par tick est partagé par tous les clients :
+le snapshot est encodé une fois puis envoyé tel quel à chacun.
+"""
+import argparse
+import json
+import signal
+import socket
+import socketserver
+import threading
+from pathlib import Path
+
+from constants import (
+    AGENT_SOCKET_PATH, AGENT_MAX_CLIENTS_BACKLOG, UPDATE_INTERVAL, TOP_PROCESSES_LIMIT,
+    COLLECTOR_INTERVALS, METRIC_SOURCE, REPLAY_PATH, SYNTHETIC_SEED, RECORD_FORMAT, METRICS_SERVER_HOST
+)
+from utils import debug_log, logger, json_default, prepare_socket_path, bind_private_socket
+from data_manager import SystemDataManager
+from metric_sources import SOURCES, create_source
+from recorder import MetricsRecorder, RECORD_FORMATS
+from metrics_server import MetricsServer
+from scheduler import Scheduler
+
+
+# ==========================================
+# PUBLICATION DES SNAPSHOTS
+# ==========================================
+class SnapshotPublisher:
+    """Conserve le dernier snapshot encodé et réveille les abonnés à chaque tick."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._version = 0
+        self._payload = None
+        self._closed = False
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def publish(self, snapshot):
+        """Encode le snapshot du bus une seule fois et le rend disponible à tous les clients."""
+        payload = (json.dumps(snapshot.to_dict(), separators=(',', ':'), default=json_default) + '\n').encode('utf-8')
+        with self._cond:
+            self._version = snapshot.version
+            self._payload = payload
+            self._cond.notify_all()
+
+    def latest(self):
+        """Retourne (version, payload) du dernier snapshot publié."""
+        with self._cond:
+            return self._version, self._payload
+
+    def wait_for_newer(self, version, timeout=None):
+        """Attend un snapshot plus récent que `version` (ou la fermeture)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version > version or self._closed, timeout)
+            return self._version, self._payload
+
+    def close(self):
+        """Réveille tous les abonnés pour qu'ils se terminent."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+# ==========================================
+# SERVEUR SOCKET UNIX
+# ==========================================
+class _AgentRequestHandler(socketserver.StreamRequestHandler):
+    """Traite les commandes d'un client connecté."""
+
+    def handle(self):
+        publisher = self.server.publisher
+        try:
+            for raw_line in self.rfile:
+                command = raw_line.strip().decode('utf-8', errors='replace').lower()
+                if not command:
+                    continue
+
+                if command == 'snapshot':
+                    version, payload = publisher.latest()
+                    if payload is None:
+                        version, payload = publisher.wait_for_newer(0, timeout=UPDATE_INTERVAL * 5)
+                    self._send(payload or b'{"error":"no snapshot yet"}\n')
+                elif command == 'subscribe':
+                    self._stream(publisher)
+                    return
+                elif command == 'ping':
+                    version, _ = publisher.latest()
+                    self._send(f'{{"ok":true,"version":{version}}}\n'.encode('utf-8'))
+                else:
+                    self._send(b'{"error":"unknown command"}\n')
+        except (BrokenPipeError, ConnectionResetError):
+            debug_log("Agent client disconnected", "DEBUG")
+
+    def _stream(self, publisher):
+        """Envoie chaque nouveau snapshot jusqu'à la déconnexion du client."""
+        version, payload = publisher.latest()
+        if payload is not None:
+            self._send(payload)
+        while not publisher.closed:
+            new_version, payload = publisher.wait_for_newer(version, timeout=UPDATE_INTERVAL * 5)
+            if new_version == version or payload is None:
+                continue
+            version = new_version
+            self._send(payload)
+
+    def _send(self, payload):
+        self.wfile.write(payload)
+        self.wfile.flush()
+
+
+class _AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = AGENT_MAX_CLIENTS_BACKLOG
+
+    def __init__(self, socket_path, publisher):
+        self.publisher = publisher
+        super().__init__(socket_path, _AgentRequestHandler)
+
+
+# ==========================================
+# AGENT
+# ==========================================
+class CollectorAgent:
+    """Collecteur unique exécuté hors UI, partagé par tous les clients du socket."""
+
+    def __init__(self, socket_path=AGENT_SOCKET_PATH, interval=UPDATE_INTERVAL,
+                 process_limit=TOP_PROCESSES_LIMIT, source=None, recorder=None, metrics_server=None):
+        self.socket_path = Path(socket_path).expanduser()
+        self.interval = interval
+        self.process_limit = process_limit
+        self.data_manager = SystemDataManager(source)
+        self.publisher = SnapshotPublisher()
+        self.recorder = recorder    # MetricsRecorder optionnel (--record)
+        # Encodage JSON sur son propre thread : la collecte n'attend jamais les clients
+        self.data_manager.bus.subscribe(self.publisher.publish, mode='thread', policy='latest', name='agent-socket')
+        if recorder is not None:
+            self.data_manager.bus.subscribe(recorder.record, name='recorder')
+        # Endpoint OpenMetrics optionnel (--metrics-port / --metrics-socket) : dict d'options de MetricsServer
+        self.metrics_server = MetricsServer(self.data_manager.bus, **metrics_server) if metrics_server else None
+        self._stop_event = threading.Event()
+        self._server = None
+        self._threads = []
+
+        # Échéances monotones : processus puis publication, sans dérive
+        self.scheduler = Scheduler()
+        self.scheduler.add_job('processes', COLLECTOR_INTERVALS['processes'], self._refresh_processes)
+        self.scheduler.add_job('publish', interval, self.collect_once)
+
+    def _refresh_processes(self):
+        # Classements joints aux snapshots suivants par le gestionnaire de données
+        self.data_manager.get_process_rankings(limit=self.process_limit)
+
+    def collect_once(self):
+        """Effectue un passage de collecte ; le snapshot est diffusé par le bus."""
+        self.data_manager.get_metrics()
+
+    def _collect_loop(self):
+        logger.info("Agent collection loop started")
+        while not self._stop_event.is_set():
+            self.scheduler.wait(self._stop_event)
+            if self._stop_event.is_set():
+                break
+            try:
+                self.scheduler.run_pending()
+            except Exception as e:
+                logger.error(f"Error in agent collection loop: {e}", exc_info=True)
+        logger.info("Agent collection loop stopped")
+
+    def start(self):
+        """Démarre le serveur socket et la boucle de collecte."""
+        prepare_socket_path(self.socket_path, "taskly-agent")
+        # ✅ SÉCURITÉ : socket accessible uniquement par l'utilisateur courant
+        self._server = bind_private_socket(
+            self.socket_path, lambda path: _AgentServer(path, self.publisher), "taskly-agent")
+
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="taskly-agent-server", daemon=True),
+            threading.Thread(target=self._collect_loop, name="taskly-agent-collector", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        if self.recorder is not None:
+            self.recorder.start()
+        if self.metrics_server is not None:
+            self.metrics_server.start()
+        logger.info(f"taskly-agent listening on {self.socket_path}")
+
+    def stop(self):
+        """Arrête proprement la collecte et le serveur."""
+        self._stop_event.set()
+        self.publisher.close()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.data_manager.close()
+        if self.recorder is not None:
+            self.recorder.stop()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+        logger.info("taskly-agent stopped")
+
+    def serve_forever(self):
+        """Démarre l'agent et bloque jusqu'à l'arrêt (SIGINT/SIGTERM)."""
+        self.start()
+        try:
+            while not self._stop_event.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def request_stop(self, *_):
+        self._stop_event.set()
+
+
+# ==========================================
+# CLIENT
+# ==========================================
+class AgentClient:
+    """Client minimal pour les dashboards et scripts attachés à l'agent."""
+
+    def __init__(self, socket_path=AGENT_SOCKET_PATH, timeout=5.0):
+        self.socket_path = str(Path(socket_path).expanduser())
+        self.timeout = timeout
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+    def get_snapshot(self):
+        """Retourne le dernier snapshot publié par l'agent."""
+        with self._connect() as sock:
+            sock.sendall(b'snapshot\n')
+            with sock.makefile('rb') as stream:
+                return json.loads(stream.readline())
+
+    def iter_snapshots(self):
+        """Itère sur les snapshots au rythme de l'agent."""
+        with self._connect() as sock:
+            sock.settimeout(None)
+            sock.sendall(b'subscribe\n')
+            with sock.makefile('rb') as stream:
+                for line in stream:
+                    yield json.loads(line)
+
+
+def main(argv=None):
+    """Point d'entrée `taskly-agent`."""
+    parser = argparse.ArgumentParser(prog="taskly-agent", description="Taskly headless metrics collector")
+    parser.add_argument("--socket", default=AGENT_SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--interval", type=float, default=UPDATE_INTERVAL, help="Sampling interval (seconds)")
+    parser.add_argument("--processes", type=int, default=TOP_PROCESSES_LIMIT, help="Top processes per ranking")
+    parser.add_argument("--source", choices=sorted(SOURCES), default=METRIC_SOURCE, help="Metric source")
+    parser.add_argument("--replay", default=REPLAY_PATH, help="NDJSON recording for --source replay")
+    parser.add_argument("--seed", type=int, default=SYNTHETIC_SEED, help="Seed for --source synthetic")
+    parser.add_argument("--record", metavar="DIR", help="Record every tick to DIR")
+    parser.add_argument("--record-format", choices=RECORD_FORMATS, default=RECORD_FORMAT,
+                        help="Recording format (NDJSON snapshots, long CSV or columnar .tkc)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="Serve OpenMetrics on http://HOST:PORT/metrics")
+    parser.add_argument("--metrics-host", default=METRICS_SERVER_HOST, help="Bind address for --metrics-port")
+    parser.add_argument("--metrics-socket", metavar="PATH", help="Serve OpenMetrics on a Unix socket instead")
+    args = parser.parse_args(argv)
+
+    if args.source == 'replay':
+        source = create_source('replay', path=args.replay)
+    elif args.source == 'synthetic':
+        source = create_source('synthetic', seed=args.seed)
+    else:
+        source = create_source(args.source)
+
+    recorder = MetricsRecorder(args.record, fmt=args.record_format) if args.record else None
+    metrics_server = None
+    if args.metrics_socket:
+        metrics_server = {'socket_path': args.metrics_socket}
+    elif args.metrics_port is not None:
+        metrics_server = {'host': args.metrics_host, 'port': args.metrics_port}
+    agent = CollectorAgent(socket_path=args.socket, interval=args.interval, process_limit=args.processes,
+                           source=source, recorder=recorder, metrics_server=metrics_server)
+    signal.signal(signal.SIGTERM, agent.request_stop)
+    signal.signal(signal.SIGINT, agent.request_stop)
+    agent.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
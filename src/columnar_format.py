@@ -0,0 +1,411 @@
+"""
+Format d'enregistrement colonnaire compressé pour Taskly (.tkc).
+
+Une colonne float64 par métrique, découpée en blocs compressés séparément
+(zlib ou lzma de la bibliothèque standard) : relire une métrique sur une
+plage ne décompresse que cette colonne, dans les seuls blocs concernés.
+
+Format (little-endian) :
+    en-tête : magic (8 octets) | version (uint16) | codec (uint16) | nb colonnes (uint32)
+              | taille en-tête (uint32) puis les noms de colonnes en UTF-8
+              séparés par '\\0', complétés à un multiple de 8
+    blocs   : magic b'TKCH' | lignes (uint32) | premier et dernier timestamp en ms (int64 x 2)
+              | taille compressée de chaque colonne (uint32 x (1 + nb colonnes))
+              puis les colonnes compressées : timestamps en deltas int64 (ms),
+              puis les valeurs float64 (octets regroupés par rang pour la compression)
+
+Un bloc incomplet en fin de fichier (arrêt brutal) est ignoré à la lecture.
+"""
+import bisect
+import csv
+import json
+import lzma
+import mmap
+import struct
+import zlib
+from array import array
+from datetime import datetime
+from itertools import accumulate
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # numpy est optionnel : colonnes en array('d')
+    np = None
+
+from constants import COLUMNAR_CODEC, COLUMNAR_CHUNK_ROWS
+from recorder import CSV_HEADER, flatten_metrics, read_long_csv, read_ndjson
+from utils import debug_log
+
+MAGIC = b'TASKLYCF'
+FORMAT_VERSION = 1
+COLUMNAR_SUFFIX = '.tkc'
+CODECS = ('none', 'zlib', 'lzma')
+_HEADER = struct.Struct('<8sHHII')
+_CHUNK = struct.Struct('<4sIqq')
+_CHUNK_MAGIC = b'TKCH'
+
+
+def _compress(codec, data):
+    if codec == 1:
+        return zlib.compress(data, 6)
+    if codec == 2:
+        return lzma.compress(data, preset=6)
+    return bytes(data)
+
+
+def _decompress(codec, data):
+    if codec == 1:
+        return zlib.decompress(data)
+    if codec == 2:
+        return lzma.decompress(data)
+    return bytes(data)
+
+
+def _shuffle(raw, width=8):
+    """Regroupe les octets de même rang : exposants et poids forts se suivent et se compressent bien."""
+    return b''.join(raw[i::width] for i in range(width))
+
+
+def _unshuffle(raw, width=8):
+    out = bytearray(len(raw))
+    step = len(raw) // width
+    for i in range(width):
+        out[i::width] = raw[i * step:(i + 1) * step]
+    return out
+
+
+def _float_column(raw):
+    """Colonne float64 : tableau numpy (sans copie du tampon décompressé) ou array('d')."""
+    if np is not None:
+        return np.frombuffer(raw, dtype=np.float64)
+    values = array('d')
+    values.frombytes(raw)
+    return values
+
+
+def _concat(parts):
+    if np is not None:
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+    values = array('d')
+    for part in parts:
+        values.extend(part)
+    return values
+
+
+def _encode_header(codec, columns):
+    names = '\0'.join(columns).encode('utf-8')
+    size = _HEADER.size + len(names)
+    size += -size % 8
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, codec, len(columns), size) + names
+    return header.ljust(size, b'\0')
+
+
+# ==========================================
+# ÉCRITURE
+# ==========================================
+class ColumnarWriter:
+    """
+    Écriture d'un fichier .tkc, bloc par bloc.
+
+    Les lignes sont accumulées en colonnes array('d') et compressées tous les
+    `chunk_rows` enregistrements (et à la fermeture). Une valeur absente vaut NaN.
+    """
+
+    def __init__(self, path, columns, codec=COLUMNAR_CODEC, chunk_rows=COLUMNAR_CHUNK_ROWS):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        self.path = Path(path)
+        self.columns = tuple(columns)
+        self.codec = CODECS.index(codec)
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self._timestamps = array('q')
+        self._values = [array('d') for _ in self.columns]
+        self._file = open(self.path, 'wb')
+        self._file.write(_encode_header(self.codec, self.columns))
+        self.bytes_written = self._file.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, timestamp, values):
+        """Ajoute un enregistrement (timestamp Unix + {colonne: valeur})."""
+        self._timestamps.append(round(timestamp * 1000))
+        get = values.get
+        nan = float('nan')
+        for name, column in zip(self.columns, self._values):
+            value = get(name)
+            column.append(nan if value is None else value)
+        self.rows += 1
+        if len(self._timestamps) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Compresse et écrit le bloc en cours (une seule écriture par bloc)."""
+        timestamps = self._timestamps
+        if not timestamps:
+            return
+        deltas = array('q', [0])
+        deltas.extend(b - a for a, b in zip(timestamps, timestamps[1:]))
+        payloads = [_compress(self.codec, _shuffle(deltas.tobytes()))]
+        payloads.extend(_compress(self.codec, _shuffle(column.tobytes())) for column in self._values)
+        header = _CHUNK.pack(_CHUNK_MAGIC, len(timestamps), timestamps[0], timestamps[-1])
+        sizes = struct.pack(f'<{len(payloads)}I', *map(len, payloads))
+        chunk = b''.join([header, sizes, *payloads])
+        self._file.write(chunk)
+        self._file.flush()
+        self.bytes_written += len(chunk)
+
+        self._timestamps = array('q')
+        self._values = [array('d') for _ in self.columns]
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+# ==========================================
+# LECTURE
+# ==========================================
+class _Chunk:
+    __slots__ = ('rows', 'base', 'first', 'last', 'offsets')
+
+    def __init__(self, rows, base, last, offsets):
+        self.rows = rows
+        self.base = base            # Premier timestamp (ms), origine des deltas
+        self.first = base / 1000    # Premier timestamp (s)
+        self.last = last / 1000     # Dernier timestamp (s)
+        self.offsets = offsets      # (début, fin) de chaque colonne compressée dans le fichier
+
+
+class ColumnarReader:
+    """
+    Lecture d'un fichier .tkc mappé en mémoire.
+
+    À l'ouverture, seuls les en-têtes de blocs sont parcourus ; une colonne
+    n'est décompressée qu'à la demande, dans les blocs qui recoupent la plage.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            magic, version, codec, ncols, header_size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"Not a Taskly columnar file: {self.path}")
+            names = f.read(header_size - _HEADER.size).rstrip(b'\0').decode('utf-8')
+            size = f.seek(0, 2)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.codec = codec
+        self.columns = tuple(names.split('\0')) if names else ()
+        self._index = {name: i + 1 for i, name in enumerate(self.columns)}
+        self.chunks = self._scan(header_size, size)
+
+    def _scan(self, offset, size):
+        chunks = []
+        sizes_struct = struct.Struct(f'<{1 + len(self.columns)}I')
+        while offset + _CHUNK.size + sizes_struct.size <= size:
+            magic, rows, first, last = _CHUNK.unpack_from(self._mmap, offset)
+            if magic != _CHUNK_MAGIC:
+                debug_log(f"Corrupted chunk at offset {offset} in {self.path}", "WARNING")
+                break
+            offset += _CHUNK.size
+            sizes = sizes_struct.unpack_from(self._mmap, offset)
+            offset += sizes_struct.size
+            bounds = list(accumulate(sizes, initial=offset))
+            if bounds[-1] > size:
+                break   # Dernier bloc incomplet
+            chunks.append(_Chunk(rows, first, last, tuple(zip(bounds, bounds[1:]))))
+            offset = bounds[-1]
+        return chunks
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return sum(chunk.rows for chunk in self.chunks)
+
+    @property
+    def first_timestamp(self):
+        return self.chunks[0].first if self.chunks else None
+
+    @property
+    def last_timestamp(self):
+        return self.chunks[-1].last if self.chunks else None
+
+    def _payload(self, chunk, position):
+        start, end = chunk.offsets[position]
+        return _unshuffle(_decompress(self.codec, memoryview(self._mmap)[start:end]))
+
+    def _chunk_timestamps(self, chunk):
+        deltas = array('q')
+        deltas.frombytes(self._payload(chunk, 0))
+        base = chunk.base
+        if np is not None:
+            return (np.cumsum(np.frombuffer(deltas, dtype=np.int64)) + base) / 1000
+        return array('d', ((base + ms) / 1000 for ms in accumulate(deltas)))
+
+    def _selection(self, start, end):
+        """Blocs recoupant [start, end] avec les bornes de lignes à garder dans chacun."""
+        start = float('-inf') if start is None else start
+        end = float('inf') if end is None else end
+        for chunk in self.chunks:
+            if chunk.last < start or chunk.first > end:
+                continue
+            if chunk.first >= start and chunk.last <= end:
+                yield chunk, 0, chunk.rows
+                continue
+            timestamps = self._chunk_timestamps(chunk)
+            lo = bisect.bisect_left(timestamps, start)
+            hi = bisect.bisect_right(timestamps, end)
+            if hi > lo:
+                yield chunk, lo, hi
+
+    def timestamps(self, start=None, end=None):
+        """Timestamps Unix des lignes de [start, end]."""
+        return _concat([self._chunk_timestamps(chunk)[lo:hi] for chunk, lo, hi in self._selection(start, end)])
+
+    def column(self, name, start=None, end=None):
+        """Valeurs d'une colonne sur [start, end] (tableau numpy, ou array('d') sans numpy)."""
+        position = self._index.get(name)
+        if position is None:
+            raise KeyError(name)
+        return _concat([
+            _float_column(self._payload(chunk, position))[lo:hi]
+            for chunk, lo, hi in self._selection(start, end)
+        ])
+
+    def read(self, columns=None, start=None, end=None):
+        """
+        Plusieurs colonnes d'un coup, blocs sélectionnés une seule fois.
+
+        Returns:
+            {'timestamp': ..., colonne: ...} ; toutes les colonnes par défaut
+        """
+        columns = self.columns if columns is None else tuple(columns)
+        positions = [self._index[name] for name in columns]
+        parts = {name: [] for name in ('timestamp', *columns)}
+        for chunk, lo, hi in self._selection(start, end):
+            parts['timestamp'].append(self._chunk_timestamps(chunk)[lo:hi])
+            for name, position in zip(columns, positions):
+                parts[name].append(_float_column(self._payload(chunk, position))[lo:hi])
+        return {name: _concat(values) for name, values in parts.items()}
+
+    def rows(self, start=None, end=None):
+        """
+        Itère sur (timestamp, {colonne: valeur}), un bloc décompressé à la fois.
+
+        Les valeurs NaN (métrique absente à ce tick) sont omises.
+        """
+        for chunk, lo, hi in self._selection(start, end):
+            timestamps = self._chunk_timestamps(chunk)
+            columns = [
+                (name, _float_column(self._payload(chunk, position)))
+                for name, position in self._index.items()
+            ]
+            for index in range(lo, hi):
+                values = {}
+                for name, column in columns:
+                    value = float(column[index])
+                    if value == value:
+                        values[name] = value
+                yield float(timestamps[index]), values
+
+
+# ==========================================
+# CONVERSIONS
+# ==========================================
+def _snapshot_timestamp(snapshot):
+    timestamp = snapshot.get('timestamp', 0.0)
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp).timestamp()
+    return float(timestamp)
+
+
+def _read_snapshots(path):
+    """Snapshots d'un enregistrement NDJSON ou d'un export JSON (un seul instantané)."""
+    if str(path).endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return [data] if isinstance(data, dict) else list(data)
+    return read_ndjson(path)
+
+
+def _records(path):
+    """(timestamp, {métrique: valeur}) d'un fichier JSON/NDJSON ou CSV long."""
+    if str(path).endswith('.csv'):
+        current, values = None, {}
+        for timestamp, name, value in read_long_csv(path):
+            if timestamp != current and values:
+                yield current, values
+                values = {}
+            current = timestamp
+            values[name] = value
+        if values:
+            yield current, values
+        return
+    for snapshot in _read_snapshots(path):
+        yield _snapshot_timestamp(snapshot), dict(flatten_metrics(snapshot.get('metrics', {})))
+
+
+def to_columnar(source, target, codec=COLUMNAR_CODEC, chunk_rows=COLUMNAR_CHUNK_ROWS):
+    """
+    Convertit un enregistrement NDJSON, CSV long ou un export JSON en .tkc.
+
+    Deux passes en flux : la première établit l'union des métriques (schéma),
+    la seconde écrit ; le fichier source n'est jamais chargé en entier.
+    """
+    columns = {}
+    for _, values in _records(source):
+        columns.update(dict.fromkeys(values))
+    with ColumnarWriter(target, columns, codec=codec, chunk_rows=chunk_rows) as writer:
+        for timestamp, values in _records(source):
+            writer.append(timestamp, values)
+    return writer.rows
+
+
+def to_ndjson(source, target):
+    """Convertit un .tkc en NDJSON ({'timestamp', 'metrics'} avec noms de métriques à plat)."""
+    count = 0
+    with ColumnarReader(source) as reader, open(target, 'w', encoding='utf-8') as f:
+        for timestamp, values in reader.rows():
+            f.write(json.dumps({'timestamp': timestamp, 'metrics': values}, separators=(',', ':')) + '\n')
+            count += 1
+    return count
+
+
+def to_long_csv(source, target):
+    """Convertit un .tkc en CSV long (timestamp, metric, value)."""
+    count = 0
+    with ColumnarReader(source) as reader, open(target, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(CSV_HEADER)
+        for timestamp, values in reader.rows():
+            writer.writerows((f"{timestamp:.3f}", name, f"{value:.6g}") for name, value in values.items())
+            count += 1
+    return count
+
+
+def convert(source, target, codec=COLUMNAR_CODEC):
+    """Convertit selon les extensions : vers .tkc, ou depuis .tkc vers .ndjson/.csv."""
+    if str(target).endswith(COLUMNAR_SUFFIX):
+        return to_columnar(source, target, codec=codec)
+    if str(target).endswith('.csv'):
+        return to_long_csv(source, target)
+    return to_ndjson(source, target)
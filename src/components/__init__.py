@@ -2,9 +2,11 @@
 Composants UI pour Taskly.
 """
 from .metric_card import MetricCard
-from .charts import CPULineChart, RAMLineChart, NetworkLineChart
+from .charts import CPULineChart, CPUHeatmap, RAMLineChart, NetworkLineChart
 from .process_list import ProcessList
+from .process_browser import ProcessBrowser
 from .system_info import SystemInfoPanel
 from .alert_manager import AlertManager, AlertPanel
+from .internals_panel import InternalsPanel
 
-__all__ = ['MetricCard', 'CPULineChart', 'RAMLineChart', 'NetworkLineChart', 'ProcessList', 'SystemInfoPanel', 'AlertManager', 'AlertPanel']
+__all__ = ['MetricCard', 'CPULineChart', 'CPUHeatmap', 'RAMLineChart', 'NetworkLineChart', 'ProcessList', 'ProcessBrowser', 'SystemInfoPanel', 'AlertManager', 'AlertPanel', 'InternalsPanel']
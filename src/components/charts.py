@@ -3,15 +3,122 @@ Composants de graphiques pour Taskly.
 """
 import flet as ft
 from config import AppleTheme, HISTORY_SIZE
+from constants import HISTORY_TIERS, HEATMAP_MAX_ROWS, CHART_QUANTUM
 from utils import with_opacity
 
 
+# Paliers de résolution sélectionnables ('raw' = échantillons bruts à 1 Hz)
+CHART_TIERS = ('raw',) + tuple(name for name, _, _ in HISTORY_TIERS)
+_TIER_SECONDS = {name: seconds for name, seconds, _ in HISTORY_TIERS}
+
+
+def tier_subtitle(tier, points=HISTORY_SIZE):
+    """Libellé de la fenêtre couverte par un palier (ex. 'Last 30 min')."""
+    seconds = _TIER_SECONDS.get(tier, 1) * points
+    if seconds < 60:
+        return f"Last {seconds}s"
+    if seconds < 3600 or seconds % 3600:
+        return f"Last {seconds // 60} min"
+    return f"Last {seconds // 3600} h"
+
+
+def next_tier(tier):
+    """Palier suivant dans CHART_TIERS (cyclique)."""
+    index = CHART_TIERS.index(tier) if tier in CHART_TIERS else -1
+    return CHART_TIERS[(index + 1) % len(CHART_TIERS)]
+
+
+def quantize(value, scale=1.0, quantum=CHART_QUANTUM):
+    """Valeur ramenée sur 0-100 et arrondie au pas d'affichage `quantum`."""
+    if not value:
+        return 0.0
+    y = min(value * scale, 100.0)
+    return round(y / quantum) * quantum
+
+
+def window_shift(previous, current, limit):
+    """
+    Nombre de points dont la fenêtre a glissé entre deux ticks.
+
+    Returns:
+        s tel que current commence par previous[s:] (0 = fenêtre inchangée),
+        ou None si aucun décalage <= limit ne correspond (changement de palier...)
+    """
+    n = len(current)
+    for shift in range(min(limit, n) + 1):
+        if previous[shift:] == current[:n - shift]:
+            return shift
+    return None
+
+
+class SlidingWindow:
+    """
+    Points d'un ou plusieurs LineChartData partageant le même axe X.
+
+    Quand l'historique a simplement avancé de s échantillons, les s plus
+    anciens points sont retirés, s nouveaux sont ajoutés à droite et l'axe X
+    glisse (min_x/max_x) : Flet n'envoie que ces points au lieu de réécrire
+    toutes les ordonnées. Sinon seules les ordonnées modifiées sont réécrites.
+    Les valeurs sont quantifiées : un écart invisible ne déclenche rien.
+    """
+
+    def __init__(self, chart, series, max_points):
+        self.chart = chart
+        self.series = series
+        self.max_points = max_points
+        self.values = [[0.0] * max_points for _ in series]
+        self.first_x = 0
+
+    def update(self, columns):
+        """
+        Args:
+            columns: Une liste de valeurs quantifiées par série (max_points chacune)
+
+        Returns:
+            Nombre de points modifiés (0 : rien à envoyer)
+        """
+        n = self.max_points
+        shift = window_shift(list(zip(*self.values)), list(zip(*columns)), n // 2)
+        if shift == 0:
+            return 0
+
+        changed = 0
+        if shift is not None:
+            for data, column in zip(self.series, columns):
+                points = data.data_points
+                del points[:shift]
+                points.extend(
+                    ft.LineChartDataPoint(self.first_x + n + k, column[n - shift + k])
+                    for k in range(shift)
+                )
+                changed += shift
+            self.first_x += shift
+            self.chart.min_x = self.first_x
+            self.chart.max_x = self.first_x + n
+        else:
+            for data, old, new in zip(self.series, self.values, columns):
+                for point, before, after in zip(data.data_points, old, new):
+                    if before != after:
+                        point.y = after
+                        changed += 1
+
+        self.values = [list(column) for column in columns]
+        return changed
+
+
+def _fit(values, max_points, scale=1.0):
+    """Dernières `max_points` valeurs quantifiées, complétées à gauche par des 0."""
+    column = [quantize(value, scale) for value in values[-max_points:]]
+    return [0.0] * (max_points - len(column)) + column
+
+
 class BaseLineChart(ft.Container):
     """Classe de base pour les graphiques de ligne."""
     
     def __init__(self, title, subtitle, color, max_points=30):
         super().__init__()
         self.max_points = max_points
+        self.tier = 'raw'
         self.data_points = [ft.LineChartDataPoint(i, 0) for i in range(max_points)]
         
         self.title_text = ft.Text(title, size=16, weight="w600", color=AppleTheme.TEXT_WHITE)
@@ -47,6 +154,7 @@ class BaseLineChart(ft.Container):
             vertical_grid_lines=ft.ChartGridLines(interval=10, color=with_opacity(0.1, "#FFFFFF"), width=1),
             border=ft.border.all(0, AppleTheme.TRANSPARENT)
         )
+        self.window = SlidingWindow(self.chart, self.chart.data_series, max_points)
 
         self.content = ft.Column(
             controls=[
@@ -54,7 +162,11 @@ class BaseLineChart(ft.Container):
                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                     controls=[
                         self.title_text,
-                        self.subtitle_text
+                        ft.Container(
+                            content=self.subtitle_text,
+                            on_click=lambda _: self.cycle_tier(),
+                            tooltip="Change resolution"
+                        )
                     ]
                 ),
                 ft.Container(content=self.chart, expand=True, padding=ft.padding.only(top=10))
@@ -70,12 +182,20 @@ class BaseLineChart(ft.Container):
         self.title_text.value = new_title
         self.title_text.update()
 
+    def cycle_tier(self):
+        """Passe au palier de résolution suivant (raw -> 1m -> 1h)."""
+        self.tier = next_tier(self.tier)
+        self.subtitle_text.value = tier_subtitle(self.tier, self.max_points)
+        self.subtitle_text.update()
+
     def update_chart(self, history_list):
-        """Met à jour le graphique avec les nouvelles données."""
-        for i, val in enumerate(history_list):
-            if i < len(self.data_points):
-                self.data_points[i].y = val if val is not None else 0
-        self.chart.update()
+        """
+        Met à jour le graphique (sans envoi : la page est mise à jour en lot).
+
+        Returns:
+            Nombre de points modifiés
+        """
+        return self.window.update([_fit(history_list, self.max_points)])
 
 
 class CPULineChart(BaseLineChart):
@@ -84,7 +204,7 @@ class CPULineChart(BaseLineChart):
     def __init__(self):
         super().__init__(
             title="CPU History",
-            subtitle=f"Last {HISTORY_SIZE}s",
+            subtitle=tier_subtitle('raw'),
             color=AppleTheme.BLUE,
             max_points=HISTORY_SIZE
         )
@@ -96,7 +216,7 @@ class RAMLineChart(BaseLineChart):
     def __init__(self):
         super().__init__(
             title="Memory History",
-            subtitle=f"Last {HISTORY_SIZE}s",
+            subtitle=tier_subtitle('raw'),
             color=AppleTheme.PURPLE,
             max_points=HISTORY_SIZE
         )
@@ -108,12 +228,15 @@ class NetworkLineChart(ft.Container):
     def __init__(self):
         super().__init__()
         max_points = HISTORY_SIZE
+        self.max_points = max_points
+        self.tier = 'raw'
         self.download_points = [ft.LineChartDataPoint(i, 0) for i in range(max_points)]
         self.upload_points = [ft.LineChartDataPoint(i, 0) for i in range(max_points)]
         
         self.title_text = ft.Text("Network History", size=16, weight="w600", color=AppleTheme.TEXT_WHITE)
         self.download_label = ft.Text("Download", size=10, color=AppleTheme.TEXT_GREY)
         self.upload_label = ft.Text("Upload", size=10, color=AppleTheme.TEXT_GREY)
+        self.tier_text = ft.Text(tier_subtitle(self.tier), size=10, color=AppleTheme.TEXT_GREY)
         
         self.chart = ft.LineChart(
             data_series=[
@@ -153,6 +276,7 @@ class NetworkLineChart(ft.Container):
             vertical_grid_lines=ft.ChartGridLines(interval=10, color=with_opacity(0.1, "#FFFFFF"), width=1),
             border=ft.border.all(0, AppleTheme.TRANSPARENT)
         )
+        self.window = SlidingWindow(self.chart, self.chart.data_series, max_points)
 
         self.content = ft.Column(
             controls=[
@@ -172,6 +296,11 @@ class NetworkLineChart(ft.Container):
                                     ft.Container(width=12, height=3, bgcolor=AppleTheme.CYAN, border_radius=2),
                                     self.upload_label
                                 ], spacing=5)
+                            ),
+                            ft.Container(
+                                content=self.tier_text,
+                                on_click=lambda _: self.cycle_tier(),
+                                tooltip="Change resolution"
                             )
                         ], spacing=10)
                     ]
@@ -189,19 +318,107 @@ class NetworkLineChart(ft.Container):
         self.title_text.value = new_title
         self.title_text.update()
 
+    def cycle_tier(self):
+        """Passe au palier de résolution suivant (raw -> 1m -> 1h)."""
+        self.tier = next_tier(self.tier)
+        self.tier_text.value = tier_subtitle(self.tier, self.max_points)
+        self.tier_text.update()
+
     def update_chart(self, download_history, upload_history):
-        """Met à jour le graphique avec les données réseau."""
+        """
+        Met à jour le graphique (sans envoi : la page est mise à jour en lot).
+
+        Returns:
+            Nombre de points modifiés
+        """
         # Normalize to 0-100 scale (assuming max 1000 KB/s)
-        max_speed = 1000
-        
-        for i, val in enumerate(download_history):
-            if i < len(self.download_points):
-                normalized = min((val / max_speed) * 100, 100) if val else 0
-                self.download_points[i].y = normalized
-        
-        for i, val in enumerate(upload_history):
-            if i < len(self.upload_points):
-                normalized = min((val / max_speed) * 100, 100) if val else 0
-                self.upload_points[i].y = normalized
-        
-        self.chart.update()
+        scale = 100 / 1000
+        return self.window.update([
+            _fit(download_history, self.max_points, scale),
+            _fit(upload_history, self.max_points, scale),
+        ])
+
+
+class CPUHeatmap(ft.Container):
+    """
+    Carte de chaleur de la charge par cœur (lignes = cœurs, colonnes = temps).
+
+    Au-delà de HEATMAP_MAX_ROWS cœurs, chaque ligne regroupe des cœurs
+    consécutifs par leur maximum. Les valeurs sont quantifiées en quelques
+    niveaux de couleur et seules les cellules qui changent de niveau sont
+    modifiées.
+    """
+
+    LEVELS = (
+        with_opacity(0.12, AppleTheme.BLUE),
+        with_opacity(0.35, AppleTheme.BLUE),
+        with_opacity(0.6, AppleTheme.BLUE),
+        AppleTheme.BLUE,
+        AppleTheme.ORANGE,
+        AppleTheme.RED,
+    )
+
+    def __init__(self, cores, max_rows=HEATMAP_MAX_ROWS, max_points=HISTORY_SIZE):
+        super().__init__()
+        self.cores = max(1, cores)
+        self.rows = min(self.cores, max_rows)
+        self.max_points = max_points
+        self._levels = [[0] * max_points for _ in range(self.rows)]
+        self.cells = [
+            [ft.Container(expand=True, bgcolor=self.LEVELS[0], border_radius=2) for _ in range(max_points)]
+            for _ in range(self.rows)
+        ]
+
+        self.title_text = ft.Text("CPU Cores", size=16, weight="w600", color=AppleTheme.TEXT_WHITE)
+        group = "" if self.rows == self.cores else f" · max per {-(-self.cores // self.rows)}"
+        self.subtitle_text = ft.Text(f"{self.cores} cores{group}", size=12, color=AppleTheme.TEXT_GREY)
+
+        self.content = ft.Column(
+            controls=[
+                ft.Row(
+                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                    controls=[self.title_text, self.subtitle_text]
+                ),
+                ft.Container(
+                    content=ft.Column(
+                        controls=[ft.Row(controls=row, spacing=1, expand=True) for row in self.cells],
+                        spacing=1,
+                        expand=True
+                    ),
+                    expand=True,
+                    padding=ft.padding.only(top=10)
+                )
+            ]
+        )
+        self.bgcolor = AppleTheme.CARD_COLOR
+        self.border_radius = AppleTheme.BORDER_RADIUS
+        self.padding = AppleTheme.PADDING
+        self.expand = 1
+
+    def update_title(self, new_title):
+        """Met à jour le titre du graphique."""
+        self.title_text.value = new_title
+        self.title_text.update()
+
+    def update_heatmap(self, grouped):
+        """
+        Met à jour les cellules (sans envoi : la page est mise à jour en lot).
+
+        Args:
+            grouped: Une série de valeurs 0-100 par ligne (du plus ancien au plus récent)
+
+        Returns:
+            Nombre de cellules modifiées
+        """
+        top = len(self.LEVELS) - 1
+        changed = 0
+        for cells, levels, series in zip(self.cells, self._levels, grouped):
+            offset = self.max_points - len(series)
+            for i, value in enumerate(series[-self.max_points:]):
+                level = min(int(value * len(self.LEVELS) / 100), top) if value > 0 else 0
+                column = i + max(offset, 0)
+                if level != levels[column]:
+                    levels[column] = level
+                    cells[column].bgcolor = self.LEVELS[level]
+                    changed += 1
+        return changed
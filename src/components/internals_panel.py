@@ -0,0 +1,50 @@
+"""
+Composant InternalsPanel : temps passé dans le chemin chaud de Taskly.
+Panneau caché, affiché avec Ctrl/Cmd + Maj + I.
+"""
+import flet as ft
+from config import AppleTheme
+from utils import with_opacity
+
+_HEADER = f"{'span':<28}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'count':>8}"
+
+
+class InternalsPanel(ft.Container):
+    """Tableau p50/p95/p99 (ms) de chaque span instrumenté."""
+
+    def __init__(self):
+        super().__init__()
+
+        self.rows = {}  # span -> ft.Text, créés à la première apparition
+        self.table = ft.Column(spacing=2)
+
+        self.content = ft.Column(
+            controls=[
+                ft.Text("Taskly internals", size=16, weight="w600", color=AppleTheme.TEXT_WHITE),
+                ft.Divider(color=with_opacity(0.2, "#FFFFFF"), height=1),
+                ft.Text(_HEADER, size=11, font_family="monospace", color=AppleTheme.TEXT_GREY),
+                self.table,
+            ],
+            spacing=8
+        )
+        self.bgcolor = AppleTheme.CARD_COLOR
+        self.border_radius = AppleTheme.BORDER_RADIUS
+        self.padding = AppleTheme.PADDING
+
+    def update_stats(self, stats):
+        """
+        Met à jour les lignes (sans appeler update : mise à jour groupée).
+
+        Args:
+            stats: Dict {span: statistiques} de Instrumentation.stats()
+        """
+        for name, values in stats.items():
+            row = self.rows.get(name)
+            if row is None:
+                row = ft.Text("", size=11, font_family="monospace", color=AppleTheme.TEXT_WHITE)
+                self.rows[name] = row
+                self.table.controls.append(row)
+            row.value = (
+                f"{name:<28}{values['p50_ms']:>9.2f}{values['p95_ms']:>9.2f}"
+                f"{values['p99_ms']:>9.2f}{values['max_ms']:>9.2f}{values['count']:>8}"
+            )
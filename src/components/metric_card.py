@@ -69,7 +69,7 @@ class MetricCard(ft.Container):
         # FIX: Animation simplifiée compatible avec toutes versions de Flet
         try:
             self.animate_scale = ft.animation.Animation(150, ft.AnimationCurve.EASE_OUT)
-            verbose_log(f"Animation enabled for {title}")
+            verbose_log("Animation enabled for %s", title)
         except AttributeError:
             # Si l'animation n'est pas disponible, on continue sans
             debug_log(f"Animation not available for {title}, continuing without", "WARNING")
@@ -117,5 +117,5 @@ class MetricCard(ft.Container):
             needs_update = True
         
         if needs_update:
-            verbose_log(f"Updating card: {main_str}, {sub_val}, progress={safe_progress:.2f}")
+            verbose_log("Updating card: %s, %s, progress=%.2f", main_str, sub_val, safe_progress)
             self.update()
@@ -0,0 +1,153 @@
+"""
+Composant ProcessBrowser : table complète des processus, paginée.
+"""
+import threading
+import flet as ft
+from config import AppleTheme
+from constants import PROCESS_PAGE_SIZE
+from .process_list import ProcessRow
+
+# Colonne de tri de ProcessIndex pour chaque colonne du tableau (None : non triable)
+_SORT_KEYS = ('name', 'pid', 'cpu', 'memory', None)
+
+
+class ProcessBrowser(ft.Container):
+    """
+    Table de tous les processus avec recherche et tri par colonne.
+
+    Seule la page visible (PROCESS_PAGE_SIZE lignes) est rendue ; filtre et
+    tri sont servis par le ProcessIndex du dashboard, sans nouveau parcours
+    de la table des processus. Les lignes et l'état de navigation sont
+    partagés par le thread de rendu (refresh) et celui des événements Flet
+    (recherche, tri, pages) : tous deux les modifient sous `_lock`.
+    """
+
+    def __init__(self, index, page_size=PROCESS_PAGE_SIZE):
+        super().__init__()
+        self.index = index
+        self.page_size = page_size
+        self.query = ''
+        self.sort_by = 'cpu'
+        self.descending = True
+        self.offset = 0
+        self.total = 0
+        self._pool = [ProcessRow(cmdline=True) for _ in range(page_size)]
+        self._lock = threading.Lock()
+
+        self.title_text = ft.Text("All Processes", size=16, weight="w600", color=AppleTheme.TEXT_WHITE)
+        self.search_field = ft.TextField(
+            hint_text="Name, command or PID",
+            prefix_icon=ft.Icons.SEARCH,
+            dense=True,
+            width=260,
+            text_size=13,
+            border_color=AppleTheme.TEXT_GREY,
+            on_change=self._handle_search
+        )
+        self.columns = [
+            ft.DataColumn(ft.Text("Process", color=AppleTheme.TEXT_GREY, size=12), on_sort=self._handle_sort),
+            ft.DataColumn(ft.Text("PID", color=AppleTheme.TEXT_GREY, size=12), numeric=True, on_sort=self._handle_sort),
+            ft.DataColumn(ft.Text("CPU%", color=AppleTheme.TEXT_GREY, size=12), numeric=True, on_sort=self._handle_sort),
+            ft.DataColumn(ft.Text("RAM%", color=AppleTheme.TEXT_GREY, size=12), numeric=True, on_sort=self._handle_sort),
+            ft.DataColumn(ft.Text("Command", color=AppleTheme.TEXT_GREY, size=12)),
+        ]
+        self.data_table = ft.DataTable(
+            columns=self.columns,
+            rows=[],
+            sort_column_index=_SORT_KEYS.index(self.sort_by),
+            sort_ascending=not self.descending,
+            column_spacing=10,
+            heading_row_height=30,
+            data_row_min_height=32,
+            data_row_max_height=32,
+        )
+        self.range_text = ft.Text("", size=12, color=AppleTheme.TEXT_GREY)
+        self.prev_btn = ft.IconButton(ft.Icons.CHEVRON_LEFT, icon_color=AppleTheme.TEXT_GREY,
+                                      on_click=lambda _: self._move(-1))
+        self.next_btn = ft.IconButton(ft.Icons.CHEVRON_RIGHT, icon_color=AppleTheme.TEXT_GREY,
+                                      on_click=lambda _: self._move(1))
+
+        self.content = ft.Column(
+            controls=[
+                ft.Row(
+                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                    controls=[
+                        self.title_text,
+                        ft.Row([self.search_field, self.prev_btn, self.range_text, self.next_btn], spacing=5)
+                    ]
+                ),
+                ft.Container(
+                    content=ft.Column([self.data_table], scroll=ft.ScrollMode.AUTO),
+                    expand=True
+                )
+            ]
+        )
+        self.bgcolor = AppleTheme.CARD_COLOR
+        self.border_radius = AppleTheme.BORDER_RADIUS
+        self.padding = AppleTheme.PADDING
+        self.expand = 1
+
+    def update_labels(self, t):
+        """Met à jour les labels avec les traductions (envoyés avec la page)."""
+        self.title_text.value = t("all_processes")
+        self.search_field.hint_text = t("search_processes")
+        for column, key in zip(self.columns, ("process", "pid", "cpu_percent", "ram_percent", "command")):
+            column.label.value = t(key)
+
+    def refresh(self):
+        """Relit la page visible dans l'index (sans envoi : la page est mise à jour en lot)."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        self.total, procs = self.index.view(
+            self.query, self.sort_by, self.descending, self.offset, self.page_size
+        )
+        if self.offset and self.offset >= self.total:
+            # La page courante a disparu (filtre plus strict, processus terminés)
+            self.offset = max(0, (self.total - 1) // self.page_size * self.page_size)
+            self.total, procs = self.index.view(
+                self.query, self.sort_by, self.descending, self.offset, self.page_size
+            )
+
+        for entry, p in zip(self._pool, procs):
+            entry.set(p['name'], p['pid'], p['cpu_percent'], p['memory_percent'], p.get('cmdline', ''))
+        rows = [entry.row for entry in self._pool[:len(procs)]]
+        if rows != self.data_table.rows:
+            self.data_table.rows = rows
+
+        last = min(self.offset + self.page_size, self.total)
+        self.range_text.value = f"{self.offset + 1 if self.total else 0}–{last} / {self.total}"
+        self.prev_btn.disabled = self.offset == 0
+        self.next_btn.disabled = last >= self.total
+
+    def _handle_search(self, e):
+        with self._lock:
+            self.query = e.control.value.strip()
+            self.offset = 0
+            self._refresh()
+        self.update()
+
+    def _handle_sort(self, e):
+        key = _SORT_KEYS[e.column_index]
+        with self._lock:
+            if key == self.sort_by:
+                self.descending = not self.descending
+            else:
+                # Noms et PID croissants par défaut, CPU/RAM décroissants
+                self.sort_by = key
+                self.descending = key in ('cpu', 'memory')
+            self.data_table.sort_column_index = e.column_index
+            self.data_table.sort_ascending = not self.descending
+            self.offset = 0
+            self._refresh()
+        self.update()
+
+    def _move(self, direction):
+        with self._lock:
+            offset = self.offset + direction * self.page_size
+            if not 0 <= offset < max(self.total, 1):
+                return
+            self.offset = offset
+            self._refresh()
+        self.update()
@@ -1,17 +1,60 @@
 """
 Composant ProcessList pour afficher les processus système.
 """
+import threading
 import flet as ft
 from config import AppleTheme
 
 
+class ProcessRow:
+    """Ligne du tableau des processus, réutilisée tant que le PID reste affiché."""
+
+    __slots__ = ('row', 'texts', 'values')
+
+    def __init__(self, cmdline=False):
+        texts = [
+            ft.Text("", color=AppleTheme.TEXT_WHITE, size=13, weight="w500"),
+            ft.Text("", color=AppleTheme.TEXT_GREY, size=12),
+            ft.Text("", color=AppleTheme.ORANGE, size=13, weight="bold"),
+            ft.Text("", color=AppleTheme.PURPLE, size=13, weight="bold"),
+        ]
+        if cmdline:
+            texts.append(ft.Text("", color=AppleTheme.TEXT_GREY, size=12, no_wrap=True,
+                                 overflow=ft.TextOverflow.ELLIPSIS))
+        self.texts = tuple(texts)
+        self.row = ft.DataRow(cells=[ft.DataCell(text) for text in self.texts])
+        self.values = (None,) * len(texts)
+
+    def set(self, name, pid, cpu, mem, cmdline=''):
+        """Met à jour les textes qui ont changé. Retourne True si la ligne a changé."""
+        values = (str(name)[:15], str(pid), f"{cpu:.1f}%", f"{mem:.1f}%", cmdline[:80])[:len(self.texts)]
+        if values == self.values:
+            return False
+        for text, before, after in zip(self.texts, self.values, values):
+            if before != after:
+                text.value = after
+        self.values = values
+        return True
+
+
 class ProcessList(ft.Container):
     """Tableau des processus avec tri."""
     
-    def __init__(self, on_sort_change):
+    # Regroupements proposés (None : un processus par ligne)
+    GROUPS = ((None, "Processes"), ('name', "Application"), ('parent', "Parent"),
+              ('user', "User"), ('cgroup', "Cgroup"))
+
+    def __init__(self, on_sort_change, on_group_change=None):
         super().__init__()
         self.on_sort_change = on_sort_change
+        self.on_group_change = on_group_change
         self.current_sort = 'cpu'
+        self.current_group = None
+        self._rows = {}     # pid -> ProcessRow affichée
+        self._spare = []    # Lignes libérées, recyclées pour les nouveaux PID
+        # Réserve modifiée par le thread de rendu (update_processes) et par
+        # celui des événements Flet (changement de regroupement)
+        self._lock = threading.Lock()
         
         # Store labels for updates
         self.title_text = ft.Text("Top Processes", size=16, weight="w600", color=AppleTheme.TEXT_WHITE)
@@ -28,6 +71,18 @@ class ProcessList(ft.Container):
             data_row_min_height=40,
         )
 
+        # Regroupement des processus
+        self.group_dropdown = ft.Dropdown(
+            options=[ft.dropdown.Option(key or 'none', label) for key, label in self.GROUPS],
+            value='none',
+            dense=True,
+            width=150,
+            text_size=12,
+            border_color=AppleTheme.TEXT_GREY,
+            on_change=lambda e: self._change_group(e.control.value),
+            visible=on_group_change is not None
+        )
+
         # Boutons de tri
         self.cpu_sort_btn = ft.ElevatedButton(
             "Sort by CPU",
@@ -51,7 +106,7 @@ class ProcessList(ft.Container):
                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                     controls=[
                         self.title_text,
-                        ft.Row([self.cpu_sort_btn, self.mem_sort_btn], spacing=5)
+                        ft.Row([self.group_dropdown, self.cpu_sort_btn, self.mem_sort_btn], spacing=5)
                     ]
                 ),
                 ft.Container(
@@ -91,27 +146,59 @@ class ProcessList(ft.Container):
         self.mem_sort_btn.update()
         self.on_sort_change(sort_type)
 
+    def _change_group(self, value):
+        group = None if value == 'none' else value
+        if group == self.current_group:
+            return
+        self.current_group = group
+        # Les lignes étaient indexées par PID ou par groupe : on repart de zéro
+        with self._lock:
+            self._spare.extend(self._rows.values())
+            self._rows.clear()
+        self.pid_col.label.value = "Count" if group else "PID"
+        self.pid_col.update()
+        if self.on_group_change:
+            self.on_group_change(group)
+
     def update_processes(self, procs):
-        new_rows = []
+        """
+        Met à jour le tableau (sans envoi : la page est mise à jour en lot).
+
+        Les lignes sont conservées d'un tick à l'autre, indexées par PID :
+        seuls les textes modifiés changent, et un processus qui change de
+        rang est déplacé au lieu d'être recréé. Les lignes des processus
+        sortis du classement sont recyclées pour les nouveaux venus.
+        """
+        with self._lock:
+            rows = self._assign_rows(procs)
+        if rows != self.data_table.rows:
+            self.data_table.rows = rows
+
+    def _assign_rows(self, procs):
+        """Lignes à afficher, réserve verrouillée par l'appelant."""
+        rows = []
+        seen = set()
         for p in procs:
-            name = p.get('name', 'Unknown')
-            pid = p.get('pid', 0)
-            cpu = p.get('cpu_percent', 0.0)
-            mem = p.get('memory_percent', 0.0)
-            if cpu is None:
-                cpu = 0.0
-            if mem is None:
-                mem = 0.0
-
-            new_rows.append(
-                ft.DataRow(
-                    cells=[
-                        ft.DataCell(ft.Text(str(name)[:15], color=AppleTheme.TEXT_WHITE, size=13, weight="w500")),
-                        ft.DataCell(ft.Text(str(pid), color=AppleTheme.TEXT_GREY, size=12)),
-                        ft.DataCell(ft.Text(f"{cpu:.1f}%", color=AppleTheme.ORANGE, size=13, weight="bold")),
-                        ft.DataCell(ft.Text(f"{mem:.1f}%", color=AppleTheme.PURPLE, size=13, weight="bold")),
-                    ]
-                )
+            # Vue regroupée : une ligne par groupe, la colonne PID affiche l'effectif
+            key = p['group'] if 'group' in p else p.get('pid', 0)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            entry = self._rows.get(key)
+            if entry is None:
+                entry = self._spare.pop() if self._spare else ProcessRow()
+                self._rows[key] = entry
+            entry.set(
+                p.get('name', 'Unknown'),
+                f"×{p['count']}" if 'group' in p else key,
+                p.get('cpu_percent') or 0.0,
+                p.get('memory_percent') or 0.0
             )
-        self.data_table.rows = new_rows
-        self.data_table.update()
+            rows.append(entry.row)
+
+        for key in self._rows.keys() - seen:
+            self._spare.append(self._rows.pop(key))
+        # Pas plus de lignes en réserve que de lignes affichées
+        del self._spare[len(rows):]
+        return rows
@@ -3,7 +3,8 @@ Composant SystemInfoPanel pour afficher les informations système détaillées.
 """
 import flet as ft
 from config import AppleTheme
-from utils import with_opacity, format_uptime
+from constants import MOUNT_PANEL_LIMIT
+from utils import with_opacity, format_uptime, format_bytes
 
 
 class SystemInfoPanel(ft.Container):
@@ -15,6 +16,13 @@ class SystemInfoPanel(ft.Container):
         self.title_text = ft.Text("System Info", size=16, weight="w600", color=AppleTheme.TEXT_WHITE)
         self.cpu_info = ft.Text("", size=12, color=AppleTheme.TEXT_GREY)
         self.disk_info = ft.Text("", size=12, color=AppleTheme.TEXT_GREY)
+        self.disk_io_info = ft.Text("", size=12, color=AppleTheme.TEXT_GREY)
+        self.mount_infos = [ft.Text("", size=12, color=AppleTheme.TEXT_GREY) for _ in range(MOUNT_PANEL_LIMIT)]
+        self.mount_rows = [
+            ft.Row([ft.Icon(ft.Icons.FOLDER_OPEN, color=AppleTheme.ORANGE, size=16), text], spacing=10, visible=False)
+            for text in self.mount_infos
+        ]
+        self.nic_info = ft.Text("", size=12, color=AppleTheme.TEXT_GREY)
         self.uptime_info = ft.Text("", size=12, color=AppleTheme.TEXT_GREY)
         self.battery_info = ft.Text("", size=12, color=AppleTheme.TEXT_GREY)
         
@@ -30,6 +38,15 @@ class SystemInfoPanel(ft.Container):
                     ft.Icon(ft.Icons.STORAGE, color=AppleTheme.ORANGE, size=16),
                     self.disk_info
                 ], spacing=10),
+                *self.mount_rows,
+                ft.Row([
+                    ft.Icon(ft.Icons.SPEED, color=AppleTheme.ORANGE, size=16),
+                    self.disk_io_info
+                ], spacing=10),
+                ft.Row([
+                    ft.Icon(ft.Icons.LAN, color=AppleTheme.BLUE, size=16),
+                    self.nic_info
+                ], spacing=10),
                 ft.Row([
                     ft.Icon(ft.Icons.ACCESS_TIME, color=AppleTheme.GREEN, size=16),
                     self.uptime_info
@@ -62,6 +79,45 @@ class SystemInfoPanel(ft.Container):
         # Disk Info
         self.disk_info.value = f"{metrics['disk_used_gb']:.0f} GB used / {metrics['disk_total_gb']:.0f} GB total ({metrics['disk_percent']:.1f}%)"
         
+        # Montages les plus pleins
+        mounts = metrics.get('mounts') or []
+        for row, text, mount in zip(self.mount_rows, self.mount_infos, mounts[:MOUNT_PANEL_LIMIT] + [None] * MOUNT_PANEL_LIMIT):
+            row.visible = mount is not None
+            if mount is None:
+                continue
+            if mount['stale'] and not mount['total_gb']:
+                text.value = f"{mount['mountpoint']}: not responding"
+            else:
+                text.value = (
+                    f"{mount['mountpoint']}: {mount['percent']:.0f}% • "
+                    f"{format_bytes(mount['free_gb'] * 1024**3)} free"
+                    f"{' • not responding' if mount['stale'] else ''}"
+                )
+            text.color = AppleTheme.RED if mount['percent'] >= 90 else AppleTheme.TEXT_GREY
+        
+        # Disque et interface les plus actifs
+        disks = metrics.get('disks') or {}
+        if disks:
+            name, disk = max(disks.items(), key=lambda item: item[1]['read_kbps'] + item[1]['write_kbps'])
+            self.disk_io_info.value = (
+                f"{name}: R {format_bytes(disk['read_kbps'] * 1024)}/s • "
+                f"W {format_bytes(disk['write_kbps'] * 1024)}/s • "
+                f"{disk['read_iops'] + disk['write_iops']:.0f} IOPS • {disk['util_percent']:.0f}% busy"
+            )
+        else:
+            self.disk_io_info.value = "No disk I/O data"
+        
+        nics = metrics.get('nics') or {}
+        if nics:
+            name, nic = max(nics.items(), key=lambda item: item[1]['down_kbps'] + item[1]['up_kbps'])
+            self.nic_info.value = (
+                f"{name}: ↓ {format_bytes(nic['down_kbps'] * 1024)}/s • "
+                f"↑ {format_bytes(nic['up_kbps'] * 1024)}/s"
+                f"{' • ' + str(len(nics)) + ' interfaces' if len(nics) > 1 else ''}"
+            )
+        else:
+            self.nic_info.value = "No network interface data"
+        
         # Uptime
         self.uptime_info.value = f"Uptime: {format_uptime(metrics['uptime'])}"
         
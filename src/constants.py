@@ -7,16 +7,81 @@ Toutes les valeurs configurables en un seul endroit.
 # PERFORMANCE & TIMING
 # ==========================================
 UPDATE_INTERVAL = 1.0           # Secondes entre les mises à jour
-HISTORY_SIZE = 30               # Nombre de points d'historique
+HISTORY_SIZE = 30               # Nombre de points affichés par graphique
+HISTORY_RAW_SIZE = 300          # Échantillons bruts conservés (5 min à 1 Hz)
+HISTORY_CORE_SIZE = 300         # Ticks conservés par cœur (charge et fréquence)
+HEATMAP_MAX_ROWS = 16           # Lignes de la carte de chaleur CPU (cœurs regroupés au-delà)
+CHART_QUANTUM = 0.5             # Pas d'affichage des courbes (% de la hauteur) : en deçà, pas d'envoi
+HISTORY_TIERS = (               # Paliers d'agrégats : (nom, secondes, nombre d'intervalles)
+    ('1m', 60, 1440),           # 1 minute min/avg/max sur 24 h
+    ('1h', 3600, 24 * 28),      # 1 heure min/avg/max sur 4 semaines
+)
+
+# Persistance de l'historique (segments binaires mappés en mémoire)
+HISTORY_PERSIST = True
+HISTORY_STORE_DIRECTORY = "~/Library/Application Support/Taskly/history"
+HISTORY_SEGMENT_RECORDS = 21600             # Lignes par segment (6 h à 1 Hz)
+HISTORY_RETENTION_SECONDS = 7 * 86400       # Durée de conservation sur disque
+HISTORY_STORE_MAX_BYTES = 256 * 1024**2     # Taille maximale des segments
 CACHE_INTERVAL_DISK = 5         # Secondes entre les mises à jour du cache disque
 CACHE_INTERVAL_BATTERY = 5      # Secondes entre les mises à jour du cache batterie
 
+# Cadence propre à chaque collecteur (secondes), pilotée par le Scheduler
+COLLECTOR_INTERVALS = {
+    'cpu': UPDATE_INTERVAL,
+    'memory': UPDATE_INTERVAL,
+    'disk': CACHE_INTERVAL_DISK,
+    'network': UPDATE_INTERVAL,
+    'devices': UPDATE_INTERVAL,     # Débits par disque et par interface
+    'battery': CACHE_INTERVAL_BATTERY,
+    'processes': UPDATE_INTERVAL,
+    'system': UPDATE_INTERVAL,
+}
+COLLECTOR_TIMEOUT = 0.5         # Échéance d'un collecteur avant de servir sa valeur précédente
+COLLECTOR_WORKERS = 4           # Threads du pool de collecte
+DISK_DEVICE_EXCLUDE = ("loop", "ram", "zram")   # Préfixes de disques ignorés
+NIC_DEVICE_EXCLUDE = ("lo",)                     # Préfixes d'interfaces ignorées
+
+# ==========================================
+# MOUNTS
+# ==========================================
+MOUNT_INTERVAL = 10             # Secondes entre deux statvfs d'un disque local
+MOUNT_NETWORK_INTERVAL = 60     # Secondes entre deux statvfs d'un montage réseau / FUSE
+MOUNT_TIMEOUT = 2.0             # Au-delà, le montage est considéré comme bloqué
+MOUNT_REFRESH_INTERVAL = 30     # Secondes entre deux relectures de la liste des montages
+MOUNT_WORKERS = 4               # Threads dédiés aux appels statvfs
+MOUNT_PANEL_LIMIT = 3           # Montages les plus pleins affichés dans SystemInfoPanel
+MOUNT_EXCLUDE_FSTYPES = frozenset({
+    'tmpfs', 'devtmpfs', 'devfs', 'squashfs', 'overlay', 'proc', 'sysfs', 'cgroup',
+    'cgroup2', 'autofs', 'nullfs', 'ramfs', 'iso9660', 'udf',
+})
+MOUNT_NETWORK_FSTYPES = frozenset({'nfs', 'nfs4', 'cifs', 'smbfs', 'afpfs', 'webdav', 'sshfs'})
+
 # ==========================================
 # PROCESS MONITORING
 # ==========================================
 TOP_PROCESSES_LIMIT = 7         # Nombre de processus à afficher
+PROCESS_PAGE_SIZE = 25          # Lignes par page de la table complète des processus
 NORMALIZE_CPU_BY_CORES = True   # Normaliser CPU 0-100% (True) ou afficher total (False)
 
+# ==========================================
+# LINUX FAST PATH
+# ==========================================
+USE_PROCFS_FASTPATH = True      # Lire /proc directement sous Linux (psutil en repli)
+
+# ==========================================
+# METRIC SOURCES
+# ==========================================
+METRIC_SOURCE = "psutil"        # psutil | synthetic | replay
+SYNTHETIC_SEED = 0              # Graine du générateur synthétique
+SYNTHETIC_CPU_COUNT = 128       # Cœurs logiques simulés
+SYNTHETIC_PROCESS_COUNT = 50000 # Processus simulés
+SYNTHETIC_MEMORY_GB = 512       # Mémoire simulée
+SYNTHETIC_LINK_MBPS = 10000     # Débit de l'interface réseau simulée (10 GbE)
+REPLAY_PATH = None              # Fichier NDJSON de snapshots (format taskly-agent)
+REPLAY_SPEED = 1.0              # Vitesse de relecture (2.0 = deux fois plus vite)
+REPLAY_LOOP = True              # Reprendre au début en fin de fichier
+
 # ==========================================
 # ALERT THRESHOLDS
 # ==========================================
@@ -43,6 +108,18 @@ SHADOW_BLUR = 15
 # EXPORT SETTINGS
 # ==========================================
 EXPORT_DIRECTORY = "exports"    # Dossier pour les exports
+EXPORT_CHUNK_ROWS = 3600        # Lignes lues/écrites par bloc lors d'un export de plage
+EXPORT_RANGE_SECONDS = 3600     # Plage d'historique jointe à l'export du dashboard (1 h)
+
+# Enregistrement continu (un snapshot par tick, écrit hors des threads UI/collecte)
+RECORD_FORMAT = "ndjson"        # ndjson (format taskly-agent), csv (timestamp, metric, value) ou tkc (colonnaire)
+RECORD_MAX_BYTES = 64 * 1024 * 1024  # Rotation du fichier au-delà de cette taille
+RECORD_MAX_SECONDS = 3600       # Rotation du fichier au-delà de cette durée
+RECORD_FLUSH_RECORDS = 30       # Écriture par lots de N snapshots...
+RECORD_FLUSH_INTERVAL = 5.0     # ... ou toutes les N secondes
+RECORD_QUEUE_SIZE = 256         # Snapshots en attente avant abandon (disque saturé)
+COLUMNAR_CODEC = "zlib"         # Compression des blocs .tkc : zlib, lzma ou none
+COLUMNAR_CHUNK_ROWS = 600       # Enregistrements par bloc .tkc (10 min à 1 Hz)
 
 # ==========================================
 # INTERNATIONALIZATION
@@ -50,6 +127,32 @@ EXPORT_DIRECTORY = "exports"    # Dossier pour les exports
 DEFAULT_LANGUAGE = "fr"         # Langue par défaut (fr/en)
 CONFIG_FILE_PATH = "~/Library/Application Support/Taskly/config.json"  # Fichier de configuration utilisateur
 
+# ==========================================
+# HEADLESS AGENT
+# ==========================================
+AGENT_SOCKET_PATH = "~/.taskly/agent.sock"     # Socket Unix exposé par taskly-agent
+AGENT_MAX_CLIENTS_BACKLOG = 16                  # File d'attente des connexions entrantes
+
+# ==========================================
+# SNAPSHOT BUS
+# ==========================================
+SNAPSHOT_QUEUE_SIZE = 64        # File d'un abonné « queue » avant abandon des plus anciens
+
+# ==========================================
+# OPENMETRICS ENDPOINT
+# ==========================================
+METRICS_SERVER_ENABLED = False  # Endpoint /metrics (Prometheus) pendant le dashboard
+METRICS_SERVER_HOST = "127.0.0.1"   # Écoute locale uniquement
+METRICS_SERVER_PORT = 9466      # Port TCP de l'endpoint
+METRICS_SERVER_SOCKET = None    # Chemin d'un socket Unix à la place du port TCP (ex. "~/.taskly/metrics.sock")
+METRICS_MIN_INTERVAL = 0.0      # Secondes minimales entre deux rendus (0 = chaque tick)
+
+# ==========================================
+# INSTRUMENTATION
+# ==========================================
+INSTRUMENTATION_ENABLED = False     # Chronométrage du chemin chaud (panneau « Taskly internals »)
+INSTRUMENTATION_WINDOW = 512        # Échantillons conservés par span (p50/p95/p99 glissants)
+
 # ==========================================
 # DEBUG
 # ==========================================
@@ -2,19 +2,24 @@
 Interface principale du dashboard Taskly.
 """
 import flet as ft
-import time
 import threading
 from datetime import datetime
 
 from config import AppleTheme
+from constants import UPDATE_INTERVAL, COLLECTOR_INTERVALS, INSTRUMENTATION_ENABLED, EXPORT_RANGE_SECONDS
+from constants import METRICS_SERVER_ENABLED, METRICS_SERVER_SOCKET
 from constants import DEFAULT_LANGUAGE, WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_MIN_WIDTH, WINDOW_MIN_HEIGHT
 from utils import debug_log, verbose_log, with_opacity
 from data_manager import SystemDataManager
 from data_exporter import DataExporter
+from process_index import ProcessIndex
+from metrics_server import MetricsServer
+from scheduler import Scheduler
+from instrumentation import instruments, span
 from i18n import TranslationManager
 from components import (
-    MetricCard, CPULineChart, RAMLineChart, NetworkLineChart,
-    ProcessList, SystemInfoPanel, AlertManager, AlertPanel
+    MetricCard, CPULineChart, CPUHeatmap, RAMLineChart, NetworkLineChart,
+    ProcessList, ProcessBrowser, SystemInfoPanel, AlertManager, AlertPanel, InternalsPanel
 )
 
 
@@ -29,10 +34,13 @@ class DashboardUI:
         self.data_manager = SystemDataManager()
         self.running = True
         self.current_sort = 'cpu'
+        self.current_group = None
         self.show_details = False
         self.show_alerts = False
+        self.show_internals = False
+        self.show_all_processes = False
         self.alert_manager = AlertManager()
-        self.data_exporter = DataExporter()
+        self.data_exporter = DataExporter(data_manager=self.data_manager)
         
         # Translation manager
         self.i18n = TranslationManager(default_language=DEFAULT_LANGUAGE)
@@ -62,6 +70,7 @@ class DashboardUI:
         self.page.window.height = WINDOW_HEIGHT
         self.page.window.min_width = WINDOW_MIN_WIDTH
         self.page.window.min_height = WINDOW_MIN_HEIGHT
+        self.page.on_keyboard_event = self._handle_keyboard
         debug_log(f"Window size: {self.page.window.width}x{self.page.window.height}")
 
     def toggle_details(self, e):
@@ -92,6 +101,39 @@ class DashboardUI:
             debug_log("Alerts panel hidden")
         self.layout.update()
     
+    def toggle_all_processes(self, e):
+        """Bascule entre le top des processus et la table complète."""
+        self.show_all_processes = not self.show_all_processes
+        debug_log(f"All processes view {'shown' if self.show_all_processes else 'hidden'}")
+        current, replacement = self.process_component, self.process_browser
+        if self.show_all_processes:
+            self.process_browser.refresh()
+        else:
+            current, replacement = replacement, current
+        if current in self.layout.controls:
+            self.layout.controls[self.layout.controls.index(current)] = replacement
+        self.layout.update()
+
+    def _handle_keyboard(self, e):
+        """Raccourci caché Ctrl/Cmd + Maj + I : panneau « Taskly internals »."""
+        if e.key.upper() == "I" and e.shift and (e.ctrl or e.meta):
+            self.toggle_internals(e)
+
+    def toggle_internals(self, e):
+        """Affiche/cache le panneau d'instrumentation (et active le chronométrage)."""
+        self.show_internals = not self.show_internals
+        debug_log(f"Internals panel {'shown' if self.show_internals else 'hidden'}")
+        if self.show_internals:
+            instruments.enable()
+            self.internals_panel.update_stats(instruments.stats())
+            self.layout.controls.append(self.internals_panel)
+        else:
+            if not INSTRUMENTATION_ENABLED:
+                instruments.disable()
+            if self.internals_panel in self.layout.controls:
+                self.layout.controls.remove(self.internals_panel)
+        self.layout.update()
+
     def change_language(self, e):
         """Bascule entre français et anglais."""
         debug_log(f"Changing language from {self.i18n.get_current_language()}")
@@ -116,11 +158,13 @@ class DashboardUI:
         
         # Update charts
         self.cpu_chart.update_title(self.t("cpu_history"))
+        self.cpu_heatmap.update_title(self.t("cpu_cores"))
         self.ram_chart.update_title(self.t("ram_history"))
         self.net_chart.update_title(self.t("network_history"))
         
         # Update process list
         self.process_component.update_labels(self.t)
+        self.process_browser.update_labels(self.t)
         
         # Update system info panel if visible
         if self.show_details:
@@ -133,33 +177,38 @@ class DashboardUI:
         debug_log("UI translations updated")
     
     def export_data(self, e):
-        """Exporte les données actuelles."""
-        try:
-            metrics = self.data_manager.get_metrics()
-            json_file = self.data_exporter.export_to_json(metrics)
-            csv_file = self.data_exporter.export_to_csv(metrics)
-            
+        """
+        Exporte le dernier tick publié, en arrière-plan.
+
+        Aucune collecte supplémentaire (qui fausserait le débit réseau du tick
+        suivant) : le snapshot déjà publié est sérialisé par le thread d'export,
+        qui signale la fin via _export_done.
+        """
+        internals = instruments.stats() if instruments.enabled else None
+        self.data_exporter.export_async(
+            self.data_manager.latest_snapshot(),
+            on_done=self._export_done,
+            internals=internals,
+            range_seconds=EXPORT_RANGE_SECONDS,     # Historique horodaté de la dernière heure
+        )
+
+    def _export_done(self, files, error):
+        """Notification de fin d'export (appelée depuis le thread d'export)."""
+        if error is None:
             # Afficher une notification de succès
-            if json_file and csv_file:
-                snackbar = ft.SnackBar(
-                    content=ft.Row([
-                        ft.Icon(ft.Icons.CHECK_CIRCLE, color=AppleTheme.GREEN),
-                        ft.Text(
-                            self.t("export_success") + f" (JSON + CSV)",
-                            color=AppleTheme.TEXT_WHITE
-                        )
-                    ]),
-                    bgcolor=AppleTheme.CARD_COLOR,
-                    duration=3000
-                )
-                self.page.overlay.append(snackbar)
-                snackbar.open = True
-                self.page.update()
-                print(f"✅ Export réussi:\n  JSON: {json_file}\n  CSV: {csv_file}")
-            else:
-                raise Exception("Export failed")
-                
-        except Exception as ex:
+            snackbar = ft.SnackBar(
+                content=ft.Row([
+                    ft.Icon(ft.Icons.CHECK_CIRCLE, color=AppleTheme.GREEN),
+                    ft.Text(
+                        self.t("export_success") + " (JSON + CSV)",
+                        color=AppleTheme.TEXT_WHITE
+                    )
+                ]),
+                bgcolor=AppleTheme.CARD_COLOR,
+                duration=3000
+            )
+            print("✅ Export réussi:\n  " + "\n  ".join(files))
+        else:
             # Afficher une notification d'erreur
             snackbar = ft.SnackBar(
                 content=ft.Row([
@@ -172,10 +221,35 @@ class DashboardUI:
                 bgcolor=AppleTheme.CARD_COLOR,
                 duration=3000
             )
-            self.page.overlay.append(snackbar)
-            snackbar.open = True
-            self.page.update()
-            print(f"❌ Erreur d'export: {ex}")
+            print(f"❌ Erreur d'export: {error}")
+        self.page.overlay.append(snackbar)
+        snackbar.open = True
+        self.page.update()
+
+    def toggle_recording(self, e):
+        """Démarre/arrête l'enregistrement continu de chaque tick (NDJSON ou CSV long)."""
+        if self.data_exporter.recording:
+            files = self.data_exporter.stop_recording()
+            self.record_button.icon_color = AppleTheme.TEXT_GREY
+            message = self.t("recording_stopped") + (f" ({len(files)} file(s))" if files else "")
+            print("⏺ Enregistrement terminé:\n  " + "\n  ".join(files))
+        else:
+            recorder = self.data_exporter.start_recording()
+            self.record_button.icon_color = AppleTheme.RED
+            message = self.t("recording_started") + f" ({recorder.fmt.upper()})"
+        debug_log(f"Recording {'started' if self.data_exporter.recording else 'stopped'}")
+
+        snackbar = ft.SnackBar(
+            content=ft.Row([
+                ft.Icon(ft.Icons.FIBER_MANUAL_RECORD, color=AppleTheme.RED),
+                ft.Text(message, color=AppleTheme.TEXT_WHITE)
+            ]),
+            bgcolor=AppleTheme.CARD_COLOR,
+            duration=3000
+        )
+        self.page.overlay.append(snackbar)
+        snackbar.open = True
+        self.page.update()
 
     def build_ui(self):
         """Construit l'interface utilisateur."""
@@ -189,6 +263,13 @@ class DashboardUI:
         
         self.live_text = ft.Text(self.t("live"), color=AppleTheme.GREEN, size=12, weight="bold")
         
+        self.record_button = ft.IconButton(
+            icon=ft.Icons.FIBER_MANUAL_RECORD,
+            icon_color=AppleTheme.TEXT_GREY,
+            on_click=self.toggle_recording,
+            tooltip=self.t("tooltip_record")
+        )
+
         header = ft.Row(
             controls=[
                 ft.Row([
@@ -217,6 +298,13 @@ class DashboardUI:
                         on_click=self.export_data,
                         tooltip=self.t("tooltip_export")
                     ),
+                    self.record_button,
+                    ft.IconButton(
+                        icon=ft.Icons.LIST_ALT,
+                        icon_color=AppleTheme.PURPLE,
+                        on_click=self.toggle_all_processes,
+                        tooltip=self.t("tooltip_processes")
+                    ),
                     ft.IconButton(
                         icon=ft.Icons.NOTIFICATIONS_OUTLINED,
                         icon_color=AppleTheme.ORANGE,
@@ -255,22 +343,32 @@ class DashboardUI:
         debug_log("Creating system info panel and alert panel...")
         self.info_panel = SystemInfoPanel()
         self.alert_panel = AlertPanel()
+        self.internals_panel = InternalsPanel()
 
         # Charts Row
         debug_log("Creating charts...")
         self.cpu_chart = CPULineChart()
+        self.cpu_heatmap = CPUHeatmap(self.data_manager.cpu_count)
         self.ram_chart = RAMLineChart()
         self.net_chart = NetworkLineChart()
         
         charts_row = ft.Row(
-            controls=[self.cpu_chart, self.ram_chart, self.net_chart],
+            controls=[self.cpu_chart, self.cpu_heatmap, self.ram_chart, self.net_chart],
             spacing=20,
             expand=True
         )
         
         # Process List
         debug_log("Creating process list...")
-        self.process_component = ProcessList(on_sort_change=self._handle_sort_change)
+        self.process_component = ProcessList(
+            on_sort_change=self._handle_sort_change,
+            on_group_change=self._handle_group_change
+        )
+        # Index de la table complète, alimenté par la table figée de chaque snapshot
+        self.process_index = ProcessIndex(self.data_manager.source)
+        self._indexed_processes = None
+        self.process_browser = ProcessBrowser(self.process_index)
+        self.process_browser.update_labels(self.t)
 
         debug_log("All components created")
 
@@ -296,15 +394,162 @@ class DashboardUI:
         debug_log(f"Process sort changed to: {sort_type}")
         self.current_sort = sort_type
 
+    def _handle_group_change(self, group):
+        """Gère le changement de regroupement des processus."""
+        debug_log(f"Process grouping changed to: {group}")
+        self.current_group = group
+
+    def _chart_history(self, chart, column, snapshot):
+        """Historique à afficher selon le palier choisi sur le graphique, lu dans le snapshot."""
+        if chart.tier == 'raw':
+            return snapshot.metrics[f"{column}_history"]
+        return snapshot.series.get(f"{column}_{chart.tier}", ())
+
+    def _top_rows(self, snapshot):
+        """Classement affiché (processus ou groupes, selon le tri), lu dans le snapshot."""
+        if self.current_group:
+            return snapshot.top_groups.get(self.current_group, {}).get(self.current_sort, ())
+        return snapshot.top_processes.get(self.current_sort, ())
+
     def start_monitoring(self):
-        """Démarre le thread de monitoring."""
+        """Abonne l'interface et les alertes au bus de snapshots, puis démarre le thread de monitoring."""
+        bus = self.data_manager.bus
+        # Paliers agrégés et carte de chaleur publiés avec chaque snapshot
+        self.data_manager.publish_series = True
+        # Alertes : chaque tick, dans le thread de collecte (quelques comparaisons)
+        self._alerts_changed = False
+        self.alert_subscription = bus.subscribe(self._check_alerts, name='alerts')
+        # Interface : thread dédié, dernier snapshot seulement ; un page.update()
+        # lent saute des ticks au lieu de retarder la collecte
+        self.ui_subscription = bus.subscribe(self._render, mode='thread', policy='latest', name='ui')
+        # Endpoint /metrics optionnel, rendu une fois par tick depuis le bus
+        self.metrics_server = None
+        if METRICS_SERVER_ENABLED:
+            self.metrics_server = MetricsServer(bus, socket_path=METRICS_SERVER_SOCKET)
+            try:
+                self.metrics_server.start()
+            except OSError as e:
+                debug_log(f"OpenMetrics endpoint unavailable: {e}", "ERROR")
+                self.metrics_server = None
+
         debug_log("Starting monitoring thread...")
         monitor_thread = threading.Thread(target=self._update_loop, daemon=True)
         monitor_thread.start()
         debug_log("Monitoring thread started")
 
+    def _refresh_processes(self):
+        """Tâche planifiée : rafraîchit la liste des processus."""
+        # Les classements sont joints aux snapshots suivants (les deux tris)
+        with span('data.get_top_processes'):
+            if self.current_group:
+                self.data_manager.get_top_groups(self.current_group, sort_by=self.current_sort)
+            else:
+                self.data_manager.get_top_processes(sort_by=self.current_sort)
+
+    def _update_tick(self):
+        """Tâche planifiée : collecte les métriques et publie le snapshot du tick sur le bus."""
+        with span('data.get_metrics'):
+            self.data_manager.get_metrics()
+
+    def _check_alerts(self, snapshot):
+        """Abonné synchrone : vérifie les seuils à chaque tick, même si l'interface en saute."""
+        with span('alerts.check'):
+            if self.alert_manager.check_metrics(snapshot.metrics):
+                self._alerts_changed = True
+
+    def _render(self, snapshot):
+        """
+        Abonné de l'interface : applique un snapshot puis envoie la page en un seul lot.
+
+        Tout ce qui est affiché vient du snapshot (figé) : aucune lecture des
+        buffers que le thread de collecte réécrit pendant le rendu.
+        """
+        from utils import logger
+        
+        metrics = snapshot.metrics
+
+        # =============================================
+        # BATCH UPDATES - Préparer toutes les données
+        # =============================================
+        
+        # Mise à jour horloge
+        self.clock_text.value = datetime.now().strftime("%H:%M:%S")
+        
+        # Mise à jour des cartes (sans auto-update)
+        logger.debug("Updating metric cards...")
+        with span('ui.update_data'):
+            self.cpu_card.update_data(
+                f"{metrics['cpu_percent']:.1f}",
+                f"{metrics['cpu_count']} cores",
+                metrics['cpu_percent'] / 100
+            )
+            
+            self.ram_card.update_data(
+                f"{metrics['ram_percent']:.1f}",
+                f"{metrics['ram_used_gb']:.1f} / {metrics['ram_total_gb']:.1f} GB",
+                metrics['ram_percent'] / 100
+            )
+            
+            total_speed = metrics['net_down'] + metrics['net_up']
+            max_ref_speed = 5000
+            self.net_card.update_data(
+                f"{metrics['net_down']:.0f}",
+                f"↑ {metrics['net_up']:.0f} KB/s",
+                min(total_speed / max_ref_speed, 1.0)
+            )
+
+        # Mise à jour des graphiques
+        logger.debug("Updating charts...")
+        with span('ui.update_chart.cpu'):
+            self.cpu_chart.update_chart(self._chart_history(self.cpu_chart, 'cpu', snapshot))
+        with span('ui.update_heatmap'):
+            self.cpu_heatmap.update_heatmap(snapshot.series.get('core_heatmap', ()))
+        with span('ui.update_chart.ram'):
+            self.ram_chart.update_chart(self._chart_history(self.ram_chart, 'ram', snapshot))
+        with span('ui.update_chart.net'):
+            self.net_chart.update_chart(
+                self._chart_history(self.net_chart, 'net_down', snapshot),
+                self._chart_history(self.net_chart, 'net_up', snapshot)
+            )
+        
+        # Mise à jour de la liste de processus
+        with span('ui.update_processes'):
+            if snapshot.processes is not None and snapshot.processes is not self._indexed_processes:
+                # Nouveau scan : O(1), l'index se reconstruit à la première requête
+                self._indexed_processes = snapshot.processes
+                self.process_index.update(snapshot.processes)
+            if self.show_all_processes:
+                self.process_browser.refresh()
+            else:
+                self.process_component.update_processes(self._top_rows(snapshot))
+        
+        # Mise à jour info panel si visible
+        if self.show_details:
+            logger.debug("Updating info panel...")
+            self.info_panel.update_info(metrics)
+        
+        # Nouvelles alertes depuis le dernier rendu
+        if self._alerts_changed and self.show_alerts:
+            self._alerts_changed = False
+            self.alert_panel.update_alerts(self.alert_manager.get_recent_alerts())
+
+        # Panneau d'instrumentation (statistiques du tick précédent)
+        if self.show_internals:
+            self.internals_panel.update_stats(instruments.stats())
+
+        # =============================================
+        # BATCH UPDATE - Une seule mise à jour globale
+        # =============================================
+        with span('ui.page_update'):
+            self.page.update()
+
     def _update_loop(self):
-        """Boucle principale de mise à jour avec gestion d'erreurs robuste."""
+        """
+        Boucle principale pilotée par échéances avec gestion d'erreurs robuste.
+        
+        Le Scheduler cadence chaque tâche sur une horloge monotone : le temps de
+        collecte et de page.update() ne décale plus la période.
+        """
         from utils import logger
         import psutil
         
@@ -313,71 +558,20 @@ class DashboardUI:
         consecutive_errors = 0
         MAX_CONSECUTIVE_ERRORS = 10
         
+        self.scheduler = Scheduler()
+        self.scheduler.add_job('processes', COLLECTOR_INTERVALS['processes'], self._refresh_processes)
+        self.scheduler.add_job('ui', UPDATE_INTERVAL, self._update_tick)
+        
         while self.running:
             try:
+                self.scheduler.wait()
                 iteration += 1
                 logger.debug(f"--- Update iteration {iteration} ---")
                 
-                # Collecte des données
-                metrics = self.data_manager.get_metrics()
-                top_procs = self.data_manager.get_top_processes(sort_by=self.current_sort)
-
-                # =============================================
-                # BATCH UPDATES - Préparer toutes les données
-                # =============================================
-                
-                # Mise à jour horloge
-                self.clock_text.value = datetime.now().strftime("%H:%M:%S")
-                
-                # Mise à jour des cartes (sans auto-update)
-                logger.debug("Updating metric cards...")
-                self.cpu_card.update_data(
-                    f"{metrics['cpu_percent']:.1f}",
-                    f"{metrics['cpu_count']} cores",
-                    metrics['cpu_percent'] / 100
-                )
-                
-                self.ram_card.update_data(
-                    f"{metrics['ram_percent']:.1f}",
-                    f"{metrics['ram_used_gb']:.1f} / {metrics['ram_total_gb']:.1f} GB",
-                    metrics['ram_percent'] / 100
-                )
-                
-                total_speed = metrics['net_down'] + metrics['net_up']
-                max_ref_speed = 5000
-                self.net_card.update_data(
-                    f"{metrics['net_down']:.0f}",
-                    f"↑ {metrics['net_up']:.0f} KB/s",
-                    min(total_speed / max_ref_speed, 1.0)
-                )
-
-                # Mise à jour des graphiques
-                logger.debug("Updating charts...")
-                self.cpu_chart.update_chart(metrics['cpu_history'])
-                self.ram_chart.update_chart(metrics['ram_history'])
-                self.net_chart.update_chart(metrics['net_down_history'], metrics['net_up_history'])
-                
-                # Mise à jour de la liste de processus
-                self.process_component.update_processes(top_procs)
-                
-                # Mise à jour info panel si visible
-                if self.show_details:
-                    logger.debug("Updating info panel...")
-                    self.info_panel.update_info(metrics)
-                
-                # Vérifier les alertes
-                new_alerts = self.alert_manager.check_metrics(metrics)
-                if new_alerts and self.show_alerts:
-                    self.alert_panel.update_alerts(self.alert_manager.get_recent_alerts())
-
-                # =============================================
-                # BATCH UPDATE - Une seule mise à jour globale
-                # =============================================
-                self.page.update()
+                self.scheduler.run_pending()
 
                 logger.debug(f"Update iteration {iteration} complete")
                 consecutive_errors = 0  # Reset on success
-                time.sleep(1)
                 
             except psutil.Error as e:
                 # Erreur psutil récupérable (processus terminé, etc.)
@@ -389,8 +583,6 @@ class DashboardUI:
                     self.running = False
                     raise
                 
-                time.sleep(1)
-                
             except Exception as e:
                 # Erreur critique inattendue
                 consecutive_errors += 1
@@ -400,7 +592,10 @@ class DashboardUI:
                     logger.critical(f"Too many consecutive errors ({consecutive_errors}). Stopping.")
                     self.running = False
                     raise
-                
-                time.sleep(1)
         
+        self.data_manager.bus.unsubscribe(self.ui_subscription)
+        self.data_manager.bus.unsubscribe(self.alert_subscription)
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.data_exporter.close()
         logger.info("Update loop stopped")
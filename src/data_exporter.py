@@ -3,31 +3,52 @@ Module d'export de données système.
 """
 import json
 import csv
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from utils import debug_log
-from constants import EXPORT_DIRECTORY
+from utils import debug_log, json_default
+from constants import EXPORT_DIRECTORY, RECORD_FORMAT
+from recorder import MetricsRecorder
+from columnar_format import ColumnarWriter
+
+RANGE_FORMATS = ('csv', 'json', 'ndjson', 'tkc')
 
 
 class DataExporter:
     """Gère l'export des métriques système."""
     
-    def __init__(self, export_dir=EXPORT_DIRECTORY):
+    def __init__(self, export_dir=EXPORT_DIRECTORY, data_manager=None):
+        """
+        Args:
+            export_dir: Dossier des exports
+            data_manager: SystemDataManager dont l'historique alimente export_range()
+        """
         self.export_dir = Path(export_dir)
+        self.data_manager = data_manager
         self.export_dir.mkdir(exist_ok=True)
+        self.recorder = None
+        self._recording_subscription = None
+        self._worker = None         # Thread d'export en arrière-plan (créé au premier export)
+        self._pending = None
         debug_log(f"DataExporter initialized, export directory: {self.export_dir}")
     
-    def export_to_json(self, metrics, filename=None):
-        """Exporte les métriques en JSON."""
+    def export_to_json(self, metrics, filename=None, internals=None, timestamp=None):
+        """
+        Exporte les métriques en JSON.
+
+        `internals` (Instrumentation.stats()) ajoute les temps du chemin chaud ;
+        `timestamp` (Unix) date l'export du tick exporté plutôt que de l'instant présent.
+        """
+        moment = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
         if filename is None:
-            filename = f"taskly_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = f"taskly_metrics_{moment.strftime('%Y%m%d_%H%M%S')}.json"
         
         filepath = self.export_dir / filename
         
         try:
             # Prepare data for JSON serialization
             export_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': moment.isoformat(),
                 'metrics': {
                     'cpu': {
                         'percent': metrics['cpu_percent'],
@@ -65,8 +86,11 @@ class DataExporter:
                 }
             }
             
+            if internals:
+                export_data['internals'] = internals
+            
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2)
+                json.dump(export_data, f, indent=2, default=json_default)
             
             debug_log(f"Metrics exported to JSON: {filepath}")
             return str(filepath)
@@ -75,10 +99,11 @@ class DataExporter:
             debug_log(f"Error exporting to JSON: {e}", "ERROR")
             return None
     
-    def export_to_csv(self, metrics, filename=None):
-        """Exporte les métriques en CSV."""
+    def export_to_csv(self, metrics, filename=None, internals=None, timestamp=None):
+        """Exporte les métriques en CSV (et les temps du chemin chaud si fournis)."""
+        moment = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
         if filename is None:
-            filename = f"taskly_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            filename = f"taskly_metrics_{moment.strftime('%Y%m%d_%H%M%S')}.csv"
         
         filepath = self.export_dir / filename
         
@@ -87,7 +112,7 @@ class DataExporter:
                 writer = csv.writer(f)
                 
                 # Header
-                writer.writerow(['Timestamp', datetime.now().isoformat()])
+                writer.writerow(['Timestamp', moment.isoformat()])
                 writer.writerow([])
                 
                 # CPU
@@ -141,6 +166,21 @@ class DataExporter:
                     'Yes' if metrics['battery_plugged'] else 'No',
                     time_left
                 ])
+                
+                # Instrumentation
+                if internals:
+                    writer.writerow([])
+                    writer.writerow(['Internals (ms)'])
+                    writer.writerow(['Span', 'p50', 'p95', 'p99', 'Max', 'Count'])
+                    for name, stats in internals.items():
+                        writer.writerow([
+                            name,
+                            f"{stats['p50_ms']:.3f}",
+                            f"{stats['p95_ms']:.3f}",
+                            f"{stats['p99_ms']:.3f}",
+                            f"{stats['max_ms']:.3f}",
+                            stats['count']
+                        ])
             
             debug_log(f"Metrics exported to CSV: {filepath}")
             return str(filepath)
@@ -149,11 +189,221 @@ class DataExporter:
             debug_log(f"Error exporting to CSV: {e}", "ERROR")
             return None
     
+    # ------------------------------------------
+    # Export en arrière-plan
+    # ------------------------------------------
+    def export_async(self, snapshot, on_done=None, internals=None, range_seconds=None):
+        """
+        Exporte un snapshot publié (SystemDataManager.latest_snapshot()) hors du thread appelant.
+
+        Rien n'est collecté : le JSON, le CSV et, avec `range_seconds`, l'historique
+        horodaté des `range_seconds` secondes précédant le snapshot sont écrits
+        sur un thread dédié. Un export encore en cours absorbe les nouveaux clics.
+
+        Args:
+            on_done: Appelé depuis le thread d'export avec (fichiers, erreur)
+
+        Returns:
+            Future de l'export (liste des fichiers écrits)
+        """
+        if self._pending is not None and not self._pending.done():
+            return self._pending
+        if self._worker is None:
+            self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="taskly-export")
+        self._pending = self._worker.submit(self._export_snapshot, snapshot, internals, range_seconds)
+        if on_done is not None:
+            def report(future):
+                error = future.exception()
+                on_done(None if error else future.result(), error)
+            self._pending.add_done_callback(report)
+        return self._pending
+
+    def _export_snapshot(self, snapshot, internals, range_seconds):
+        if snapshot is None:
+            raise RuntimeError("No snapshot published yet")
+        metrics, timestamp = snapshot['metrics'], snapshot['timestamp']
+        files = [
+            self.export_to_json(metrics, internals=internals, timestamp=timestamp),
+            self.export_to_csv(metrics, internals=internals, timestamp=timestamp),
+        ]
+        if range_seconds:
+            files.append(self.export_range(timestamp - range_seconds, timestamp, fmt='csv'))
+        if None in files:
+            raise RuntimeError("Export failed")
+        return files
+
+    def close(self):
+        """Termine l'export en cours et l'enregistrement continu."""
+        if self._worker is not None:
+            self._worker.shutdown(wait=True)
+            self._worker = None
+        self.stop_recording()
+
+    # ------------------------------------------
+    # Export d'une plage d'historique
+    # ------------------------------------------
+    def export_range(self, start=None, end=None, resolution=None, fmt='csv', filename=None):
+        """
+        Exporte l'historique de [start, end] (timestamps Unix) avec ses horodatages.
+
+        L'historique est lu et écrit bloc par bloc (SystemDataManager.iter_history) :
+        une semaine à 1 Hz ne construit jamais un dict complet en mémoire.
+
+        Args:
+            resolution: None pour les échantillons bruts, ou secondes par point
+                (min/avg/max par intervalle)
+            fmt: 'csv' (une colonne par métrique), 'json', 'ndjson' ou 'tkc'
+
+        Returns:
+            Chemin du fichier, ou None en cas d'erreur
+        """
+        if fmt not in RANGE_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if filename is None:
+            filename = f"taskly_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+        filepath = self.export_dir / filename
+
+        try:
+            if self.data_manager is None:
+                raise RuntimeError("No data manager to read history from")
+            chunks = self.data_manager.iter_history(start, end, resolution)
+            writer = {
+                'csv': self._write_range_csv,
+                'json': self._write_range_json,
+                'ndjson': self._write_range_ndjson,
+                'tkc': self._write_range_columnar,
+            }[fmt]
+            rows = writer(filepath, chunks, {'start': start, 'end': end, 'resolution': resolution})
+            debug_log(f"History range exported ({rows} rows): {filepath}")
+            return str(filepath)
+
+        except Exception as e:
+            debug_log(f"Error exporting history range: {e}", "ERROR")
+            return None
+
+    @staticmethod
+    def _write_range_csv(filepath, chunks, info):
+        rows = 0
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            columns = None
+            for timestamps, values in chunks:
+                if columns is None:
+                    columns = list(values)
+                    writer.writerow(['timestamp', 'time', *columns])
+                series = [values[name] for name in columns]
+                writer.writerows(
+                    (f"{timestamp:.3f}", datetime.fromtimestamp(timestamp).isoformat(timespec='seconds'),
+                     *(f"{column[i]:.6g}" for column in series))
+                    for i, timestamp in enumerate(timestamps)
+                )
+                rows += len(timestamps)
+        return rows
+
+    @staticmethod
+    def _write_range_ndjson(filepath, chunks, info):
+        rows = 0
+        with open(filepath, 'w', encoding='utf-8') as f:
+            for timestamps, values in chunks:
+                items = list(values.items())
+                f.writelines(
+                    json.dumps({'timestamp': timestamp, 'metrics': {name: column[i] for name, column in items}},
+                               separators=(',', ':')) + '\n'
+                    for i, timestamp in enumerate(timestamps)
+                )
+                rows += len(timestamps)
+        return rows
+
+    @staticmethod
+    def _write_range_json(filepath, chunks, info):
+        """Document JSON écrit en flux : en-tête, puis les lignes bloc par bloc."""
+        rows = 0
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(info)[:-1] + ', "columns": ')
+            columns = None
+            for timestamps, values in chunks:
+                if columns is None:
+                    columns = ['timestamp', *values]
+                    f.write(json.dumps(columns) + ', "rows": [\n')
+                series = [values[name] for name in columns[1:]]
+                for i, timestamp in enumerate(timestamps):
+                    f.write((',\n' if rows else '') + json.dumps([timestamp, *(column[i] for column in series)]))
+                    rows += 1
+            if columns is None:
+                f.write('[], "rows": [')
+            f.write('\n]}\n')
+        return rows
+
+    @staticmethod
+    def _write_range_columnar(filepath, chunks, info):
+        writer = None
+        try:
+            for timestamps, values in chunks:
+                if writer is None:
+                    writer = ColumnarWriter(filepath, list(values))
+                items = list(values.items())
+                for i, timestamp in enumerate(timestamps):
+                    writer.append(timestamp, {name: column[i] for name, column in items})
+            if writer is None:
+                writer = ColumnarWriter(filepath, [])
+            return writer.rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+    # ------------------------------------------
+    # Enregistrement continu
+    # ------------------------------------------
+    @property
+    def recording(self):
+        return self.recorder is not None and self.recorder.recording
+
+    def start_recording(self, fmt=RECORD_FORMAT, **options):
+        """
+        Démarre l'enregistrement de chaque tick (voir MetricsRecorder).
+
+        Avec un gestionnaire de données, l'enregistreur s'abonne à son bus de
+        snapshots ; sinon les snapshots sont fournis par record().
+
+        Returns:
+            Le MetricsRecorder actif
+        """
+        if not self.recording:
+            self.recorder = MetricsRecorder(self.export_dir, fmt=fmt, **options)
+            self.recorder.start()
+            if self.data_manager is not None:
+                # record() ne fait que déposer le snapshot : abonné synchrone
+                self._recording_subscription = self.data_manager.bus.subscribe(
+                    self.recorder.record, name='recorder'
+                )
+        return self.recorder
+
+    def record(self, snapshot):
+        """Ajoute le snapshot du tick à l'enregistrement en cours (sans attente disque)."""
+        if self.recorder is not None:
+            self.recorder.record(snapshot)
+
+    def stop_recording(self):
+        """
+        Arrête l'enregistrement et écrit le dernier lot.
+
+        Returns:
+            Liste des fichiers écrits
+        """
+        if self.recorder is None:
+            return []
+        if self._recording_subscription is not None:
+            self._recording_subscription.unsubscribe()
+            self._recording_subscription = None
+        recorder, self.recorder = self.recorder, None
+        recorder.stop()
+        return recorder.files
+
     def get_export_history(self, limit=10):
         """Retourne la liste des fichiers exportés récemment."""
         try:
             files = sorted(
-                self.export_dir.glob("taskly_metrics_*"),
+                self.export_dir.glob("taskly_*"),
                 key=lambda p: p.stat().st_mtime,
                 reverse=True
             )
@@ -4,72 +4,227 @@ Version refactorisée et optimisée.
 """
 import psutil
 import time
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from history import TieredHistory, CoreHistory, DeviceHistory, Downsampler
+from device_metrics import DeviceRates, disk_rates, nic_rates, DISK_FIELDS, NIC_FIELDS
+from history_store import HistoryStore
 from utils import debug_log, verbose_log
+from process_table import ProcessRows, top_k
+from process_groups import ProcessGrouper
+from metric_sources import create_source
+from mounts import MountMonitor
+from scheduler import Scheduler
+from snapshot_bus import SnapshotBus
+from instrumentation import instruments
 from constants import (
-    HISTORY_SIZE, CACHE_INTERVAL_DISK, CACHE_INTERVAL_BATTERY,
-    TOP_PROCESSES_LIMIT, NORMALIZE_CPU_BY_CORES
+    HISTORY_SIZE, HISTORY_RAW_SIZE, HISTORY_CORE_SIZE, HISTORY_TIERS, HEATMAP_MAX_ROWS,
+    UPDATE_INTERVAL, COLLECTOR_INTERVALS,
+    COLLECTOR_TIMEOUT, COLLECTOR_WORKERS, DISK_DEVICE_EXCLUDE, NIC_DEVICE_EXCLUDE,
+    TOP_PROCESSES_LIMIT, NORMALIZE_CPU_BY_CORES,
+    HISTORY_PERSIST, HISTORY_STORE_DIRECTORY, HISTORY_SEGMENT_RECORDS,
+    HISTORY_RETENTION_SECONDS, HISTORY_STORE_MAX_BYTES, EXPORT_CHUNK_ROWS
 )
 
 
+# Colonnes de l'historique et clés correspondantes dans le dict de métriques
+HISTORY_KEYS = {
+    'cpu': 'cpu_history',
+    'ram': 'ram_history',
+    'net': 'net_history',
+    'net_down': 'net_down_history',
+    'net_up': 'net_up_history',
+}
+HISTORY_COLUMNS = tuple(HISTORY_KEYS)
+
+
 class SystemDataManager:
     """Gère la collecte et le stockage des métriques système de manière modulaire."""
     
-    def __init__(self):
+    def __init__(self, source=None):
+        """
+        Args:
+            source: MetricSource à consommer (METRIC_SOURCE par défaut)
+        """
         debug_log("Initializing SystemDataManager")
         
-        # Historiques optimisés
-        self.cpu_history = deque([0] * HISTORY_SIZE, maxlen=HISTORY_SIZE)
-        self.ram_history = deque([0] * HISTORY_SIZE, maxlen=HISTORY_SIZE)
-        self.net_history = deque([0] * HISTORY_SIZE, maxlen=HISTORY_SIZE)
-        self.net_down_history = deque([0] * HISTORY_SIZE, maxlen=HISTORY_SIZE)
-        self.net_up_history = deque([0] * HISTORY_SIZE, maxlen=HISTORY_SIZE)
-
+        # Source des métriques : machine réelle, synthétique ou relecture
+        self.source = source if source is not None else create_source()
+        
+        # Historique colonnaire horodaté multi-résolution (une ligne par tick) ;
+        # seules les mesures de la machine réelle sont persistées
+        self.history = TieredHistory(HISTORY_COLUMNS, HISTORY_RAW_SIZE, HISTORY_TIERS)
+        persist = HISTORY_PERSIST and self.source.live
+        self.history_store = self._open_history_store() if persist else None
+        
         # État réseau
-        self.last_net_io = psutil.net_io_counters()
+        self.last_net_io = self.source.net_io_counters()
         self.last_time = time.time()
         
         # Informations système
-        self.boot_time = psutil.boot_time()
-        self.cpu_count = psutil.cpu_count(logical=True) or 1
+        self.boot_time = self.source.boot_time()
+        self.cpu_count = self.source.cpu_count(logical=True) or 1
+        
+        # Historique 2-D (temps × cœur) : charge et fréquence par cœur
+        self.core_history = CoreHistory(self.cpu_count, HISTORY_CORE_SIZE)
+        self.core_freq_history = CoreHistory(self.cpu_count, HISTORY_CORE_SIZE)
+        
+        # Débits par disque / interface : un emplacement d'historique par périphérique
+        self.disk_rates = DeviceRates(disk_rates, DISK_FIELDS, DISK_DEVICE_EXCLUDE)
+        self.nic_rates = DeviceRates(nic_rates, NIC_FIELDS, NIC_DEVICE_EXCLUDE)
+        self.disk_history = DeviceHistory(DISK_FIELDS, HISTORY_RAW_SIZE)
+        self.nic_history = DeviceHistory(NIC_FIELDS, HISTORY_RAW_SIZE)
+        
+        # Occupation de tous les montages, interrogés en arrière-plan
+        self.mount_monitor = MountMonitor(self.source)
+        self.mount_monitor.start()
+        
+        # Regroupement incrémental des processus (application, parent, utilisateur, cgroup)
+        self.process_grouper = None     # Créé au premier regroupement demandé
+        
+        # Collecteurs planifiés, chacun à sa propre cadence
+        # (chronométrés par l'instrumentation lorsqu'elle est active)
+        self._collector_funcs = {
+            name: instruments.wrap(f"collector.{name}", func)
+            for name, func in {
+                'cpu': self._get_cpu_metrics,
+                'memory': self._get_memory_metrics,
+                'disk': self._get_disk_metrics,
+                'network': self._get_network_metrics,
+                'devices': self._get_device_metrics,
+                'battery': self._get_battery_metrics,
+                'system': self._get_system_metrics,
+            }.items()
+        }
+        self._latest = {name: {} for name in self._collector_funcs}
+        self.collectors = Scheduler()
+        for name in self._collector_funcs:
+            self.collectors.add_job(
+                name,
+                COLLECTOR_INTERVALS.get(name, UPDATE_INTERVAL),
+                partial(self._submit_collector, name)
+            )
+        
+        # Exécution concurrente : un collecteur lent ne bloque plus le tick
+        self._executor = ThreadPoolExecutor(
+            max_workers=COLLECTOR_WORKERS, thread_name_prefix="taskly-collector"
+        )
+        self._in_flight = {}
+        self._submitted = []
+        self._last_stale = []
         
-        # Cache pour opérations coûteuses
-        self.last_disk_check = 0
-        self.cached_disk_info = None
-        self.last_battery_check = 0
-        self.cached_battery_info = None
+        # Un snapshot figé par tick pour tous les consommateurs (UI, alertes,
+        # enregistrement, exports, agent) : aucun ne rappelle get_metrics()
+        self.bus = SnapshotBus()
+        # Derniers classements, joints à chaque snapshot : processus (CPU et
+        # mémoire, recalculés à chaque scan) et groupes sous leur propre clé
+        self._top_processes = {'cpu': [], 'memory': []}
+        self._top_groups = {}       # {clé de regroupement: {'cpu': [...], 'memory': [...]}}
+        self._processes = ProcessRows().frozen()    # Table complète du dernier scan (lecture seule)
+        # Séries d'affichage (paliers agrégés, carte de chaleur) jointes aux
+        # snapshots : activé par le dashboard, inutile pour l'agent
+        self.publish_series = False
         
         debug_log("SystemDataManager initialized successfully")
 
-    def _should_update_cache(self, last_check_time, interval):
-        """Vérifie si le cache doit être mis à jour."""
-        return time.time() - last_check_time > interval
+    def _open_history_store(self):
+        """Ouvre le stockage disque et recharge l'historique récent."""
+        try:
+            store = HistoryStore(
+                HISTORY_STORE_DIRECTORY, HISTORY_COLUMNS,
+                segment_records=HISTORY_SEGMENT_RECORDS,
+                retention_seconds=HISTORY_RETENTION_SECONDS,
+                max_bytes=HISTORY_STORE_MAX_BYTES,
+            )
+            store.enforce_retention()
+            store.compact()
+            
+            # Rechargement direct depuis les segments mappés (aucun parsing)
+            restored = store.tail(HISTORY_RAW_SIZE)
+            for wall_time, values in restored:
+                self.history.append(values, timestamp=wall_time - self.history.wall_offset)
+            debug_log(f"Restored {len(restored)} history samples from disk")
+            return store
+        except Exception as e:
+            debug_log(f"History persistence disabled: {e}", "ERROR")
+            return None
+
+    def close(self):
+        """Arrête le pool de collecteurs et écrit les échantillons en tampon."""
+        self.bus.close()
+        self._executor.shutdown(wait=False)
+        self.mount_monitor.stop()
+        self.source.close()
+        if self.history_store is not None:
+            self.history_store.close()
+            self.history_store = None
+
+    def _submit_collector(self, name):
+        """
+        Lance un collecteur sur le pool de threads.
+        
+        Un collecteur encore en cours (montage bloqué, batterie lente...) n'est
+        pas relancé : il garde sa dernière valeur jusqu'à ce qu'il se termine.
+        """
+        if name in self._in_flight:
+            return
+        future = self._executor.submit(self._collector_funcs[name])
+        self._in_flight[name] = future
+        self._submitted.append(future)
+
+    def _harvest_collectors(self):
+        """
+        Attend les collecteurs lancés jusqu'à COLLECTOR_TIMEOUT.
+        
+        Returns:
+            Liste triée des collecteurs en retard (valeur précédente conservée)
+        """
+        # Seuls les collecteurs lancés à ce tick sont attendus : un collecteur
+        # déjà en retard ne retarde pas les ticks suivants
+        if self._submitted:
+            wait(self._submitted, timeout=COLLECTOR_TIMEOUT)
+            self._submitted = []
+        
+        for name, future in list(self._in_flight.items()):
+            if not future.done():
+                continue
+            del self._in_flight[name]
+            try:
+                self._latest[name] = future.result()
+            except Exception as e:
+                debug_log(f"Collector '{name}' failed: {e}", "ERROR")
+        
+        stale = sorted(self._in_flight)
+        if stale and stale != self._last_stale:
+            debug_log(f"Stale collectors (>{COLLECTOR_TIMEOUT}s): {', '.join(stale)}", "WARNING")
+        self._last_stale = stale
+        return stale
 
     def _get_cpu_metrics(self):
-        """Collecte les métriques CPU."""
+        """Collecte les métriques CPU (global et par cœur)."""
         try:
-            # CPU percentage (déjà normalisé 0-100% par psutil pour le système global)
-            cpu_pct = psutil.cpu_percent(interval=None)
-            if cpu_pct is None:
-                cpu_pct = 0.0
+            # Une seule lecture par cœur ; le total en est la moyenne,
+            # comme le calcule psutil pour le système global
+            per_core = self.source.cpu_percent(percpu=True) or []
+            cpu_pct = sum(per_core) / len(per_core) if per_core else 0.0
             
             # Assurer que la valeur reste dans 0-100%
             cpu_pct = min(max(cpu_pct, 0), 100)
-            self.cpu_history.append(cpu_pct)
             
-            verbose_log(f"CPU: {cpu_pct:.1f}%")
+            verbose_log("CPU: %.1f%%", cpu_pct)
             
             # Informations CPU
-            cpu_count = psutil.cpu_count(logical=False)
-            cpu_count_logical = psutil.cpu_count(logical=True)
-            cpu_freq = psutil.cpu_freq()
+            cpu_count = self.source.cpu_count(logical=False)
+            cpu_count_logical = self.source.cpu_count(logical=True)
+            freqs = [freq.current for freq in self.source.cpu_freq(percpu=True) or []]
             
             return {
                 'cpu_percent': cpu_pct,
                 'cpu_count': cpu_count,
                 'cpu_count_logical': cpu_count_logical,
-                'cpu_freq': cpu_freq.current if cpu_freq else 0,
-                'cpu_history': list(self.cpu_history),
+                'cpu_freq': sum(freqs) / len(freqs) if freqs else 0,
+                'cpu_per_core': per_core,
+                'cpu_freq_per_core': freqs,
             }
         except Exception as e:
             debug_log(f"Error fetching CPU metrics: {e}", "ERROR")
@@ -78,23 +233,22 @@ class SystemDataManager:
                 'cpu_count': 0,
                 'cpu_count_logical': 0,
                 'cpu_freq': 0,
-                'cpu_history': list(self.cpu_history),
+                'cpu_per_core': [],
+                'cpu_freq_per_core': [],
             }
 
     def _get_memory_metrics(self):
         """Collecte les métriques mémoire."""
         try:
-            mem = psutil.virtual_memory()
-            self.ram_history.append(mem.percent)
+            mem = self.source.virtual_memory()
             
-            verbose_log(f"RAM: {mem.percent:.1f}% ({mem.used / (1024**3):.1f} GB used)")
+            verbose_log("RAM: %.1f%% (%.1f GB used)", mem.percent, mem.used / (1024**3))
             
             return {
                 'ram_percent': mem.percent,
                 'ram_used_gb': mem.used / (1024**3),
                 'ram_total_gb': mem.total / (1024**3),
                 'ram_available_gb': mem.available / (1024**3),
-                'ram_history': list(self.ram_history),
             }
         except Exception as e:
             debug_log(f"Error fetching memory metrics: {e}", "ERROR")
@@ -103,29 +257,22 @@ class SystemDataManager:
                 'ram_used_gb': 0,
                 'ram_total_gb': 0,
                 'ram_available_gb': 0,
-                'ram_history': list(self.ram_history),
             }
 
     def _get_disk_metrics(self):
-        """Collecte les métriques disque (avec cache)."""
+        """Collecte les métriques disque (cadence COLLECTOR_INTERVALS['disk'])."""
         try:
-            if self.cached_disk_info is None or self._should_update_cache(
-                self.last_disk_check, CACHE_INTERVAL_DISK
-            ):
-                disk = psutil.disk_usage('/')
-                disk_io = psutil.disk_io_counters()
-                
-                self.cached_disk_info = {
-                    'disk_percent': disk.percent,
-                    'disk_used_gb': disk.used / (1024**3),
-                    'disk_total_gb': disk.total / (1024**3),
-                    'disk_read': disk_io.read_bytes if disk_io else 0,
-                    'disk_write': disk_io.write_bytes if disk_io else 0,
-                }
-                self.last_disk_check = time.time()
-                verbose_log(f"Disk cache updated: {disk.percent:.1f}%")
+            disk = self.source.disk_usage('/')
+            disk_io = self.source.disk_io_counters()
+            verbose_log("Disk updated: %.1f%%", disk.percent)
             
-            return self.cached_disk_info
+            return {
+                'disk_percent': disk.percent,
+                'disk_used_gb': disk.used / (1024**3),
+                'disk_total_gb': disk.total / (1024**3),
+                'disk_read': disk_io.read_bytes if disk_io else 0,
+                'disk_write': disk_io.write_bytes if disk_io else 0,
+            }
         except Exception as e:
             debug_log(f"Error fetching disk metrics: {e}", "ERROR")
             return {
@@ -139,7 +286,7 @@ class SystemDataManager:
     def _get_network_metrics(self):
         """Collecte les métriques réseau."""
         try:
-            current_net_io = psutil.net_io_counters()
+            current_net_io = self.source.net_io_counters()
             current_time = time.time()
             elapsed = current_time - self.last_time
             
@@ -152,12 +299,7 @@ class SystemDataManager:
             upload_speed = (bytes_sent / 1024) / elapsed
             download_speed = (bytes_recv / 1024) / elapsed
             
-            total_speed = upload_speed + download_speed
-            self.net_history.append(min(total_speed / 10, 100))
-            self.net_down_history.append(download_speed)
-            self.net_up_history.append(upload_speed)
-            
-            verbose_log(f"Network: ↓{download_speed:.0f} KB/s ↑{upload_speed:.0f} KB/s")
+            verbose_log("Network: ↓%.0f KB/s ↑%.0f KB/s", download_speed, upload_speed)
             
             self.last_net_io = current_net_io
             self.last_time = current_time
@@ -167,9 +309,6 @@ class SystemDataManager:
                 'net_down': download_speed,
                 'net_total_sent': current_net_io.bytes_sent,
                 'net_total_recv': current_net_io.bytes_recv,
-                'net_history': list(self.net_history),
-                'net_down_history': list(self.net_down_history),
-                'net_up_history': list(self.net_up_history),
             }
         except Exception as e:
             debug_log(f"Error fetching network metrics: {e}", "ERROR")
@@ -178,28 +317,31 @@ class SystemDataManager:
                 'net_down': 0,
                 'net_total_sent': 0,
                 'net_total_recv': 0,
-                'net_history': list(self.net_history),
-                'net_down_history': list(self.net_down_history),
-                'net_up_history': list(self.net_up_history),
             }
 
+    def _get_device_metrics(self):
+        """Collecte les débits par disque (perdisk) et par interface réseau (pernic)."""
+        try:
+            now = time.monotonic()
+            disks = self.disk_rates.update(self.source.disk_io_counters(perdisk=True) or {}, now)
+            nics = self.nic_rates.update(self.source.net_io_counters(pernic=True) or {}, now)
+            verbose_log("Devices: %d disks, %d interfaces", len(disks), len(nics))
+            return {'disks': disks, 'nics': nics}
+        except Exception as e:
+            debug_log(f"Error fetching device metrics: {e}", "ERROR")
+            return {'disks': {}, 'nics': {}}
+
     def _get_battery_metrics(self):
-        """Collecte les métriques batterie (avec cache)."""
+        """Collecte les métriques batterie (cadence COLLECTOR_INTERVALS['battery'])."""
         try:
-            if self.cached_battery_info is None or self._should_update_cache(
-                self.last_battery_check, CACHE_INTERVAL_BATTERY
-            ):
-                battery = psutil.sensors_battery()
-                
-                self.cached_battery_info = {
-                    'battery_percent': battery.percent if battery else 0,
-                    'battery_plugged': battery.power_plugged if battery else False,
-                    'battery_time_left': battery.secsleft if battery and battery.secsleft != psutil.POWER_TIME_UNLIMITED else None,
-                }
-                self.last_battery_check = time.time()
-                verbose_log(f"Battery cache updated: {self.cached_battery_info['battery_percent']:.0f}%")
-            
-            return self.cached_battery_info
+            battery = self.source.sensors_battery()
+            battery_info = {
+                'battery_percent': battery.percent if battery else 0,
+                'battery_plugged': battery.power_plugged if battery else False,
+                'battery_time_left': battery.secsleft if battery and battery.secsleft != psutil.POWER_TIME_UNLIMITED else None,
+            }
+            verbose_log("Battery updated: %.0f%%", battery_info['battery_percent'])
+            return battery_info
         except Exception as e:
             debug_log(f"Error fetching battery metrics: {e}", "ERROR")
             return {
@@ -225,15 +367,21 @@ class SystemDataManager:
         verbose_log("Fetching system metrics...")
         
         try:
-            # Collecter toutes les métriques via les méthodes modulaires
-            metrics = {}
-            metrics.update(self._get_cpu_metrics())
-            metrics.update(self._get_memory_metrics())
-            metrics.update(self._get_disk_metrics())
-            metrics.update(self._get_network_metrics())
-            metrics.update(self._get_battery_metrics())
-            metrics.update(self._get_system_metrics())
+            # Lancer en parallèle les collecteurs dont l'échéance est atteinte,
+            # les autres (ou ceux en retard) conservent leur dernière valeur
+            self.collectors.run_pending()
+            stale = self._harvest_collectors()
+            
+            metrics = self._get_default_metrics()
+            for name in self._collector_funcs:
+                metrics.update(self._latest[name])
+            metrics['stale'] = stale
+            metrics['mounts'] = self.mount_monitor.snapshot()
             
+            self._record_history(metrics)
+            self.bus.publish(metrics, self._top_processes, top_groups=self._top_groups,
+                             processes=self._processes,
+                             series=self._display_series() if self.publish_series else None)
             return metrics
             
         except Exception as e:
@@ -244,22 +392,185 @@ class SystemDataManager:
             # Retourne des valeurs par défaut en cas d'erreur critique
             return self._get_default_metrics()
 
+    def _record_history(self, metrics):
+        """Ajoute une ligne à l'historique et expose des vues sans copie."""
+        total_speed = metrics['net_up'] + metrics['net_down']
+        row = {
+            'cpu': metrics['cpu_percent'],
+            'ram': metrics['ram_percent'],
+            'net': min(total_speed / 10, 100),
+            'net_down': metrics['net_down'],
+            'net_up': metrics['net_up'],
+        }
+        now = time.monotonic()
+        self.history.append(row, timestamp=now)
+        self.core_history.append(metrics['cpu_per_core'], timestamp=now)
+        self.core_freq_history.append(metrics['cpu_freq_per_core'], timestamp=now)
+        self.disk_history.append(metrics['disks'], timestamp=now)
+        self.nic_history.append(metrics['nics'], timestamp=now)
+        
+        if self.history_store is not None:
+            try:
+                self.history_store.append(self.history.to_wall_time(now), row)
+            except OSError as e:
+                debug_log(f"History persistence disabled: {e}", "ERROR")
+                self.history_store = None
+        
+        # Vues memoryview valides jusqu'au prochain tick
+        for column, key in HISTORY_KEYS.items():
+            metrics[key] = self.history.view(column, HISTORY_SIZE)
+        metrics['history_timestamps'] = self.history.timestamps(HISTORY_SIZE)
+
+    def _display_series(self):
+        """
+        Séries affichées par le dashboard, figées avec le snapshot du tick.
+
+        Returns:
+            Dict {'{colonne}_{palier}': moyennes du palier, 'core_heatmap': lignes de la carte de chaleur}
+        """
+        series = {
+            f"{column}_{tier}": self.history.series(column, tier, 'avg', HISTORY_SIZE)
+            for tier in self.history.tiers
+            for column in HISTORY_COLUMNS
+        }
+        series['core_heatmap'] = self.get_core_heatmap(min(self.cpu_count, HEATMAP_MAX_ROWS))
+        return series
+
+    def latest_snapshot(self):
+        """
+        Dernier tick publié par get_metrics(), sans collecte ni effet de bord.
+
+        Returns:
+            Snapshot immuable, ou None avant le premier tick
+        """
+        return self.bus.latest()
+
+    def get_history(self, column, tier=TieredHistory.RAW, stat='avg', n=HISTORY_SIZE):
+        """
+        Retourne l'historique d'une colonne pour un palier de résolution.
+        
+        Args:
+            column: 'cpu', 'ram', 'net', 'net_down' ou 'net_up'
+            tier: 'raw' ou un palier de HISTORY_TIERS ('1m', '1h')
+            stat: 'min', 'avg' ou 'max' (ignoré pour le palier brut)
+            n: Nombre de points
+        """
+        return self.history.series(column, tier, stat, n)
+
+    def iter_history(self, start=None, end=None, resolution=None, chunk_rows=EXPORT_CHUNK_ROWS):
+        """
+        Historique de [start, end] (timestamps Unix) par blocs, pour les exports.
+
+        Lu dans les segments disque quand la persistance est active, sinon
+        dans l'historique en mémoire (palier brut, ou palier agrégé couvrant
+        `start` si la résolution le permet). Aucun bloc n'est conservé :
+        la mémoire reste bornée quelle que soit la plage.
+
+        Args:
+            resolution: None pour les échantillons bruts, ou secondes par point
+                (colonnes `{colonne}_min/_avg/_max`)
+
+        Yields:
+            (timestamps Unix, {colonne: valeurs}) en listes
+        """
+        if self.history_store is not None:
+            chunks = self.history_store.iter_range(start, end, chunk_rows)
+        else:
+            tier = self.history.range_tier(start, resolution)
+            chunks = self.history.iter_range(start, end, tier, chunk_rows)
+
+        if not resolution:
+            yield from chunks
+            return
+
+        sampler = Downsampler(HISTORY_COLUMNS, resolution)
+        buffered_timestamps, buffered = [], {}
+        for timestamps, columns in chunks:
+            done_timestamps, done = sampler.feed(timestamps, columns)
+            buffered_timestamps.extend(done_timestamps)
+            for name, values in done.items():
+                buffered.setdefault(name, []).extend(values)
+            if len(buffered_timestamps) >= chunk_rows:
+                yield buffered_timestamps, buffered
+                buffered_timestamps, buffered = [], {}
+
+        done_timestamps, done = sampler.finish()
+        buffered_timestamps.extend(done_timestamps)
+        for name, values in done.items():
+            buffered.setdefault(name, []).extend(values)
+        if buffered_timestamps:
+            yield buffered_timestamps, buffered
+
+    def get_device_history(self, kind, device, field, n=HISTORY_SIZE):
+        """
+        Historique d'un champ pour un disque ou une interface.
+        
+        Args:
+            kind: 'disk' ou 'nic'
+            device: Nom du périphérique ('nvme0n1', 'en0'...)
+            field: Champ de DISK_FIELDS ou NIC_FIELDS
+        
+        Returns:
+            Vue sans copie, ou None si le périphérique est inconnu
+        """
+        history = self.disk_history if kind == 'disk' else self.nic_history
+        return history.series(device, field, n)
+
+    def get_core_heatmap(self, rows=HEATMAP_MAX_ROWS, n=HISTORY_SIZE, stat='max'):
+        """
+        Charge par cœur pour la carte de chaleur, cœurs regroupés en `rows` lignes.
+        
+        Le regroupement par maximum garde visible un seul cœur saturé,
+        que la moyenne globale réduirait à un point de pourcentage.
+        
+        Returns:
+            Liste de `rows` séries de `n` valeurs (0-100)
+        """
+        return self.core_history.grouped(rows, n, stat)
+
     def _get_default_metrics(self):
         """Retourne des métriques par défaut en cas d'erreur."""
         return {
             'cpu_percent': 0, 'cpu_count': 0, 'cpu_count_logical': 0,
             'cpu_freq': 0, 'cpu_history': [0] * HISTORY_SIZE,
+            'cpu_per_core': [], 'cpu_freq_per_core': [],
             'ram_percent': 0, 'ram_used_gb': 0, 'ram_total_gb': 0,
             'ram_available_gb': 0, 'ram_history': [0] * HISTORY_SIZE,
             'disk_percent': 0, 'disk_used_gb': 0, 'disk_total_gb': 0,
-            'disk_read': 0, 'disk_write': 0,
+            'disk_read': 0, 'disk_write': 0, 'mounts': [],
             'net_up': 0, 'net_down': 0, 'net_total_sent': 0,
             'net_total_recv': 0, 'net_history': [0] * HISTORY_SIZE,
             'net_down_history': [0] * HISTORY_SIZE, 'net_up_history': [0] * HISTORY_SIZE,
+            'disks': {}, 'nics': {},
             'battery_percent': 0, 'battery_plugged': False,
             'battery_time_left': None, 'uptime': 0,
+            'history_timestamps': [0] * HISTORY_SIZE,
+            'stale': [],
         }
 
+    def _scan_processes(self, normalize_cpu=NORMALIZE_CPU_BY_CORES, limit=TOP_PROCESSES_LIMIT):
+        """
+        Échantillonne la table des processus une seule fois via la source.
+        
+        Les deux classements (CPU et mémoire) sont recalculés à chaque scan :
+        les snapshots publiés ne dépendent pas du tri affiché.
+        
+        Args:
+            normalize_cpu: Si True, normalise CPU par nombre de cœurs (0-100%)
+                          Si False, affiche le total (peut dépasser 100%)
+            limit: Taille des classements publiés
+        
+        Returns:
+            ProcessRows (table compacte non triée)
+        """
+        rows = self.source.process_rows(self.cpu_count, normalize_cpu)
+        self._processes = rows.frozen()
+        self._top_processes = {
+            'cpu': top_k(rows, limit, 'cpu'),
+            'memory': top_k(rows, limit, 'memory'),
+        }
+        return rows
+
     def get_top_processes(self, limit=TOP_PROCESSES_LIMIT, sort_by='cpu', normalize_cpu=NORMALIZE_CPU_BY_CORES):
         """
         Récupère les processus les plus gourmands.
@@ -273,43 +584,61 @@ class SystemDataManager:
         Returns:
             Liste des processus triés
         """
-        verbose_log(f"Fetching top {limit} processes (sorted by {sort_by}, normalize={normalize_cpu})")
-        procs = []
+        verbose_log("Fetching top %d processes (sorted by %s, normalize=%s)", limit, sort_by, normalize_cpu)
         
         try:
-            for p in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    # Valeurs par défaut si None
-                    cpu_pct = p.info['cpu_percent'] or 0.0
-                    mem_pct = p.info['memory_percent'] or 0.0
-                    name = p.info['name'] or "Unknown"
-                    
-                    # FIX: Normaliser CPU par nombre de cœurs pour obtenir 0-100%
-                    if normalize_cpu and cpu_pct > 0:
-                        # Sur un système multi-cœurs, psutil peut retourner >100%
-                        # Ex: 2 cœurs à 100% = 200% CPU
-                        # On normalise: 200% / 2 cœurs = 100%
-                        # Note: psutil retourne déjà un %, donc pas besoin de *100
-                        cpu_pct = min(cpu_pct / self.cpu_count, 100)
-                    
-                    procs.append({
-                        'pid': p.info['pid'],
-                        'name': name,
-                        'cpu_percent': cpu_pct,
-                        'memory_percent': mem_pct,
-                    })
-                    
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    # Processus terminé ou accès refusé, on ignore
-                    pass
-            
-            # Tri par CPU ou mémoire
-            sort_key = 'cpu_percent' if sort_by == 'cpu' else 'memory_percent'
-            sorted_procs = sorted(procs, key=lambda p: p[sort_key], reverse=True)
+            procs = self._scan_processes(normalize_cpu, limit)
+            self._top_groups = {}
             
-            verbose_log(f"Found {len(procs)} processes, returning top {limit}")
-            return sorted_procs[:limit]
+            # Sélection bornée (tas) par CPU et mémoire, faite par le scan
+            verbose_log("Found %d processes, returning top %d", len(procs), limit)
+            return self._top_processes['cpu' if sort_by == 'cpu' else 'memory']
             
         except Exception as e:
             debug_log(f"Error getting processes: {e}", "ERROR")
             return []
+
+    def get_top_groups(self, key='name', limit=TOP_PROCESSES_LIMIT, sort_by='cpu', normalize_cpu=NORMALIZE_CPU_BY_CORES):
+        """
+        Récupère les groupes de processus les plus gourmands.
+        
+        Les groupes sont tenus à jour par deltas d'un scan à l'autre ;
+        changer de clé repart d'un regroupement neuf.
+        
+        Args:
+            key: 'name', 'parent', 'user' ou 'cgroup'
+            sort_by: 'cpu' ou 'memory'
+        
+        Returns:
+            Liste de dicts (group, name, count, cpu_percent, memory_percent)
+        """
+        try:
+            if self.process_grouper is None or self.process_grouper.key != key:
+                self.process_grouper = ProcessGrouper(key, self.source)
+            self.process_grouper.update(self._scan_processes(normalize_cpu, limit))
+            rankings = {
+                'cpu': self.process_grouper.top(limit, 'cpu'),
+                'memory': self.process_grouper.top(limit, 'memory'),
+            }
+            self._top_groups = {key: rankings}
+            return rankings['cpu' if sort_by == 'cpu' else 'memory']
+        except Exception as e:
+            debug_log(f"Error getting process groups: {e}", "ERROR")
+            return []
+
+    def get_process_rankings(self, limit=TOP_PROCESSES_LIMIT, normalize_cpu=NORMALIZE_CPU_BY_CORES):
+        """
+        Récupère les classements CPU et mémoire à partir d'un seul parcours.
+        
+        Utilisé par l'agent headless : un seul passage sur la table des
+        processus sert les deux modes de tri demandés par les clients.
+        
+        Returns:
+            Dict {'cpu': [...], 'memory': [...]}
+        """
+        try:
+            self._scan_processes(normalize_cpu, limit)
+            return self._top_processes
+        except Exception as e:
+            debug_log(f"Error getting process rankings: {e}", "ERROR")
+            return {'cpu': [], 'memory': []}
@@ -0,0 +1,90 @@
+"""
+Débits par périphérique pour Taskly (disques et interfaces réseau).
+Convertit les compteurs cumulés de psutil (perdisk / pernic) en taux par seconde.
+"""
+
+# Champs exposés par périphérique (une colonne d'historique chacun)
+DISK_FIELDS = ('read_kbps', 'write_kbps', 'read_iops', 'write_iops', 'util_percent', 'await_ms')
+NIC_FIELDS = ('down_kbps', 'up_kbps', 'packets_in', 'packets_out', 'errors')
+
+
+def _delta(current, last):
+    # Compteur remis à zéro (périphérique remplacé, débordement) : pas de taux négatif
+    return max(current - last, 0)
+
+
+def disk_rates(current, last, elapsed):
+    """Débits, IOPS, occupation (%) et attente moyenne (ms) d'un disque."""
+    reads = _delta(current.read_count, last.read_count)
+    writes = _delta(current.write_count, last.write_count)
+    ios = reads + writes
+    wait = _delta(current.read_time, last.read_time) + _delta(current.write_time, last.write_time)
+
+    # busy_time n'existe que sous Linux/FreeBSD
+    busy = getattr(current, 'busy_time', None)
+    util = 0.0
+    if busy is not None:
+        util = min(_delta(busy, last.busy_time) / (elapsed * 1000) * 100, 100.0)
+
+    return {
+        'read_kbps': _delta(current.read_bytes, last.read_bytes) / 1024 / elapsed,
+        'write_kbps': _delta(current.write_bytes, last.write_bytes) / 1024 / elapsed,
+        'read_iops': reads / elapsed,
+        'write_iops': writes / elapsed,
+        'util_percent': util,
+        'await_ms': wait / ios if ios else 0.0,
+    }
+
+
+def nic_rates(current, last, elapsed):
+    """Débits (KB/s), paquets/s et erreurs/s d'une interface réseau."""
+    errors = (_delta(current.errin, last.errin) + _delta(current.errout, last.errout)
+              + _delta(current.dropin, last.dropin) + _delta(current.dropout, last.dropout))
+    return {
+        'down_kbps': _delta(current.bytes_recv, last.bytes_recv) / 1024 / elapsed,
+        'up_kbps': _delta(current.bytes_sent, last.bytes_sent) / 1024 / elapsed,
+        'packets_in': _delta(current.packets_recv, last.packets_recv) / elapsed,
+        'packets_out': _delta(current.packets_sent, last.packets_sent) / elapsed,
+        'errors': errors / elapsed,
+    }
+
+
+class DeviceRates:
+    """
+    Taux par périphérique à partir de compteurs cumulés successifs.
+
+    Un périphérique qui apparaît n'a pas de taux au premier échantillon (0) ;
+    un périphérique absent est simplement oublié.
+    """
+
+    def __init__(self, compute, fields, exclude=()):
+        self.compute = compute
+        self.fields = fields
+        self.exclude = tuple(exclude)
+        self._last = {}
+        self._last_time = None
+
+    def update(self, counters, now):
+        """
+        Args:
+            counters: Dict {périphérique: namedtuple de compteurs psutil}
+            now: Horodatage monotone de la lecture
+
+        Returns:
+            Dict {périphérique: {champ: taux}}
+        """
+        elapsed = now - self._last_time if self._last_time is not None else 0.0
+        rates = {}
+        current = {}
+        for device, values in counters.items():
+            if self.exclude and device.startswith(self.exclude):
+                continue
+            current[device] = values
+            last = self._last.get(device)
+            if last is not None and elapsed > 0:
+                rates[device] = self.compute(values, last, elapsed)
+            else:
+                rates[device] = dict.fromkeys(self.fields, 0.0)
+        self._last = current
+        self._last_time = now
+        return rates
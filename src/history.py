@@ -0,0 +1,616 @@
+"""
+Stockage de l'historique des métriques pour Taskly.
+Buffer circulaire colonnaire et horodaté, lecture sans copie.
+"""
+import bisect
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy est optionnel : agrégations en Python pur
+    np = None
+
+
+class MetricHistory:
+    """
+    Buffer circulaire colonnaire : une colonne array('d') par métrique
+    plus une colonne d'horodatage monotone.
+
+    Chaque échantillon est écrit deux fois (indices i et i + capacity), si bien
+    que la fenêtre des N derniers points est toujours contiguë en mémoire :
+    les lectures retournent une memoryview sur le buffer, sans allocation
+    de liste. Une vue reste valide jusqu'au prochain append().
+    """
+
+    TIMESTAMP = 'timestamp'
+
+    def __init__(self, columns, capacity):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self._head = 0      # Prochain indice d'écriture dans [0, capacity)
+        self._count = 0     # Nombre d'échantillons réellement enregistrés
+
+        # Décalage pour convertir l'horloge monotone en heure murale
+        self.wall_offset = time.time() - time.monotonic()
+
+        self._data = {
+            name: array('d', bytes(8 * 2 * capacity))
+            for name in self.columns + (self.TIMESTAMP,)
+        }
+        self._views = {name: memoryview(column) for name, column in self._data.items()}
+
+    def __len__(self):
+        return self._count
+
+    def append(self, values, timestamp=None):
+        """
+        Ajoute un échantillon (une ligne) à toutes les colonnes.
+
+        Args:
+            values: Dict {colonne: valeur}, les colonnes absentes valent 0
+            timestamp: Horodatage monotone (time.monotonic() par défaut)
+        """
+        i = self._head
+        j = i + self.capacity
+        data = self._data
+
+        ts = time.monotonic() if timestamp is None else timestamp
+        column = data[self.TIMESTAMP]
+        column[i] = column[j] = ts
+
+        for name in self.columns:
+            value = values.get(name)
+            column = data[name]
+            column[i] = column[j] = value if value is not None else 0.0
+
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def view(self, name, n=None):
+        """
+        Retourne les `n` derniers points d'une colonne (du plus ancien au plus récent).
+
+        Les emplacements jamais écrits valent 0, comme l'ancien deque([0] * N).
+        """
+        if n is None or n > self.capacity:
+            n = self.capacity
+        end = self._head + self.capacity
+        return self._views[name][end - n:end]
+
+    def timestamps(self, n=None):
+        """Vue sur les horodatages monotones des `n` derniers points."""
+        return self.view(self.TIMESTAMP, n)
+
+    def latest(self, name):
+        """Dernière valeur écrite dans une colonne."""
+        return self._data[name][self._head + self.capacity - 1]
+
+    def to_wall_time(self, timestamp):
+        """Convertit un horodatage monotone en timestamp Unix."""
+        return timestamp + self.wall_offset
+
+    def iter_range(self, start=None, end=None, chunk_rows=3600, wall_offset=None):
+        """
+        Points enregistrés dans [start, end] (timestamps Unix), par blocs.
+
+        Yields:
+            (timestamps Unix, {colonne: valeurs}) en listes
+        """
+        offset = self.wall_offset if wall_offset is None else wall_offset
+        columns = self.snapshot()
+        timestamps = [t + offset for t in columns.pop(self.TIMESTAMP)]
+        lo = bisect.bisect_left(timestamps, float('-inf') if start is None else start)
+        hi = bisect.bisect_right(timestamps, float('inf') if end is None else end)
+        for first in range(lo, hi, chunk_rows):
+            last = min(first + chunk_rows, hi)
+            yield timestamps[first:last], {name: values[first:last] for name, values in columns.items()}
+
+    def snapshot(self):
+        """
+        Copie cohérente de toutes les colonnes et des horodatages (listes).
+
+        Sûre face à un append() sur un autre thread (exports) : l'emplacement
+        que réécrit un append() en cours est exclu de la copie (le plus ancien
+        point d'un buffer plein), et la copie est refaite si un append() s'est
+        terminé entre-temps.
+        """
+        while True:
+            head = self._head
+            n = min(self._count, self.capacity - 1)
+            end = head + self.capacity
+            copies = {name: view[end - n:end].tolist() for name, view in self._views.items()}
+            if self._head == head:
+                return copies
+
+
+class RollupTier:
+    """
+    Agrégats min/avg/max sur des intervalles fixes (ex. 1 minute, 1 heure).
+
+    Les agrégats sont calculés au fil de l'eau : chaque échantillon met à jour
+    l'intervalle en cours en O(1), et l'intervalle est écrit dans son propre
+    buffer circulaire dès qu'un échantillon de l'intervalle suivant arrive.
+    """
+
+    STATS = ('min', 'avg', 'max')
+
+    def __init__(self, name, bucket_seconds, capacity, columns, wall_offset=0.0):
+        self.name = name
+        self.bucket_seconds = bucket_seconds
+        self.columns = tuple(columns)
+        self.wall_offset = wall_offset
+        self.buffer = MetricHistory(
+            [f"{column}_{stat}" for column in self.columns for stat in self.STATS],
+            capacity,
+        )
+
+        self._bucket = None
+        self._count = 0
+        self._sums = dict.fromkeys(self.columns, 0.0)
+        self._mins = dict.fromkeys(self.columns, 0.0)
+        self._maxs = dict.fromkeys(self.columns, 0.0)
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def add(self, values, timestamp):
+        """Intègre un échantillon brut dans l'intervalle courant."""
+        # Intervalles alignés sur l'heure murale (minutes/heures pleines)
+        bucket = int((timestamp + self.wall_offset) // self.bucket_seconds)
+        if bucket != self._bucket:
+            if self._count:
+                self._flush()
+            self._bucket = bucket
+            self._count = 0
+
+        first = self._count == 0
+        self._count += 1
+        for column in self.columns:
+            value = values.get(column) or 0.0
+            if first:
+                self._sums[column] = value
+                self._mins[column] = value
+                self._maxs[column] = value
+            else:
+                self._sums[column] += value
+                if value < self._mins[column]:
+                    self._mins[column] = value
+                if value > self._maxs[column]:
+                    self._maxs[column] = value
+
+    def _flush(self):
+        row = {}
+        for column in self.columns:
+            row[f"{column}_min"] = self._mins[column]
+            row[f"{column}_avg"] = self._sums[column] / self._count
+            row[f"{column}_max"] = self._maxs[column]
+        start = self._bucket * self.bucket_seconds - self.wall_offset
+        self.buffer.append(row, timestamp=start)
+
+    def view(self, column, stat='avg', n=None):
+        """Vue sur les `n` derniers intervalles complets d'une statistique."""
+        return self.buffer.view(f"{column}_{stat}", n)
+
+    def timestamps(self, n=None):
+        """Début (monotone) des `n` derniers intervalles complets."""
+        return self.buffer.timestamps(n)
+
+
+class TieredHistory:
+    """
+    Historique multi-résolution : échantillons bruts + agrégats par paliers.
+
+    La mémoire reste bornée quelle que soit la durée d'exécution : chaque palier
+    est un buffer circulaire de taille fixe. Les méthodes view/timestamps/latest
+    portent sur le palier brut, comme MetricHistory.
+    """
+
+    RAW = 'raw'
+
+    def __init__(self, columns, raw_capacity, tiers=()):
+        self.columns = tuple(columns)
+        self.raw = MetricHistory(self.columns, raw_capacity)
+        self.wall_offset = self.raw.wall_offset
+        self.tiers = {
+            name: RollupTier(name, seconds, capacity, self.columns, self.wall_offset)
+            for name, seconds, capacity in tiers
+        }
+
+    def __len__(self):
+        return len(self.raw)
+
+    @property
+    def tier_names(self):
+        return (self.RAW,) + tuple(self.tiers)
+
+    def append(self, values, timestamp=None):
+        """Ajoute un échantillon brut et met à jour chaque palier en O(1)."""
+        ts = time.monotonic() if timestamp is None else timestamp
+        self.raw.append(values, ts)
+        for tier in self.tiers.values():
+            tier.add(values, ts)
+
+    def view(self, name, n=None):
+        return self.raw.view(name, n)
+
+    def timestamps(self, n=None):
+        return self.raw.timestamps(n)
+
+    def latest(self, name):
+        return self.raw.latest(name)
+
+    def to_wall_time(self, timestamp):
+        return self.raw.to_wall_time(timestamp)
+
+    def series(self, column, tier=RAW, stat='avg', n=None):
+        """
+        Retourne les `n` derniers points d'une colonne pour un palier donné.
+
+        Le palier brut ignore `stat` ; les paliers agrégés retournent min/avg/max.
+        """
+        if tier == self.RAW or tier not in self.tiers:
+            return self.raw.view(column, n)
+        return self.tiers[tier].view(column, stat, n)
+
+    def series_timestamps(self, tier=RAW, n=None):
+        """Horodatages monotones correspondant à series()."""
+        if tier == self.RAW or tier not in self.tiers:
+            return self.raw.timestamps(n)
+        return self.tiers[tier].timestamps(n)
+
+    def iter_range(self, start=None, end=None, tier=RAW, chunk_rows=3600):
+        """
+        Points d'un palier dans [start, end] (timestamps Unix), par blocs.
+
+        Les paliers agrégés exposent les colonnes `{colonne}_min/_avg/_max`
+        et l'horodatage de début de chaque intervalle.
+        """
+        buffer = self.raw if tier == self.RAW or tier not in self.tiers else self.tiers[tier].buffer
+        return buffer.iter_range(start, end, chunk_rows, wall_offset=self.wall_offset)
+
+    def range_tier(self, start, resolution):
+        """
+        Palier le plus fin couvrant `start` sans être plus fin que nécessaire.
+
+        Le palier brut est gardé tant qu'il remonte jusqu'à `start` ; sinon
+        le plus fin des paliers d'intervalle <= `resolution` qui y remonte
+        (à défaut, celui qui remonte le plus loin).
+        """
+        candidates = [(self.RAW, self.raw)] + [
+            (name, tier.buffer) for name, tier in self.tiers.items()
+            if resolution and tier.bucket_seconds <= resolution
+        ]
+        best = self.RAW
+        oldest = float('inf')
+        for name, buffer in candidates:
+            if not len(buffer):
+                continue
+            first = buffer.timestamps(len(buffer))[0] + self.wall_offset
+            if start is not None and first <= start:
+                return name
+            if first < oldest:
+                best, oldest = name, first
+        return best
+
+
+class Downsampler:
+    """
+    Réagrège des blocs (timestamps, colonnes) en intervalles fixes min/avg/max.
+
+    Accepte indifféremment des échantillons bruts (`cpu`) ou des agrégats
+    de palier (`cpu_min`, `cpu_avg`, `cpu_max`). Les intervalles sont alignés
+    sur l'heure murale, comme les paliers de TieredHistory.
+    """
+
+    STATS = RollupTier.STATS
+
+    def __init__(self, columns, seconds):
+        self.columns = tuple(columns)
+        self.seconds = seconds
+        self._bucket = None
+        self._count = 0
+        self._mins = {}
+        self._sums = {}
+        self._maxs = {}
+
+    def _empty(self):
+        return [], {f"{column}_{stat}": [] for column in self.columns for stat in self.STATS}
+
+    def _emit(self, timestamps, out):
+        timestamps.append(self._bucket * self.seconds)
+        for column in self.columns:
+            out[f"{column}_min"].append(self._mins[column])
+            out[f"{column}_avg"].append(self._sums[column] / self._count)
+            out[f"{column}_max"].append(self._maxs[column])
+
+    def feed(self, timestamps, columns):
+        """
+        Intègre un bloc.
+
+        Returns:
+            (timestamps, {colonne_stat: valeurs}) des intervalles terminés
+        """
+        sources = []
+        for column in self.columns:
+            raw = columns.get(column)
+            sources.append((
+                column,
+                columns.get(f"{column}_min", raw),
+                columns.get(f"{column}_avg", raw),
+                columns.get(f"{column}_max", raw),
+            ))
+        out_timestamps, out = self._empty()
+        mins, sums, maxs = self._mins, self._sums, self._maxs
+        for i, timestamp in enumerate(timestamps):
+            bucket = int(timestamp // self.seconds)
+            if bucket != self._bucket:
+                if self._count:
+                    self._emit(out_timestamps, out)
+                self._bucket = bucket
+                self._count = 0
+            first = self._count == 0
+            self._count += 1
+            for column, low, mean, high in sources:
+                if first:
+                    mins[column], sums[column], maxs[column] = low[i], mean[i], high[i]
+                else:
+                    sums[column] += mean[i]
+                    if low[i] < mins[column]:
+                        mins[column] = low[i]
+                    if high[i] > maxs[column]:
+                        maxs[column] = high[i]
+        return out_timestamps, out
+
+    def finish(self):
+        """Intervalle en cours (incomplet), à émettre en fin de plage."""
+        out_timestamps, out = self._empty()
+        if self._count:
+            self._emit(out_timestamps, out)
+            self._count = 0
+        return out_timestamps, out
+
+
+class CoreHistory:
+    """
+    Buffer circulaire 2-D (temps × cœur) pour les mesures par cœur.
+
+    Chaque tick est une ligne contiguë de `cores` valeurs, écrite deux fois
+    (lignes i et i + capacity) comme dans MetricHistory : la fenêtre des N
+    derniers ticks est un bloc contigu de N × cores valeurs, lu sans copie.
+    Avec numpy ce bloc est vu comme une matrice (N, cores) et les agrégations
+    sont vectorisées ; sans numpy elles retombent sur des boucles Python.
+    """
+
+    def __init__(self, cores, capacity):
+        if cores <= 0 or capacity <= 0:
+            raise ValueError("cores and capacity must be positive")
+
+        self.cores = cores
+        self.capacity = capacity
+        self._head = 0
+        self._count = 0
+        self._data = array('d', bytes(8 * 2 * capacity * cores))
+        self._view = memoryview(self._data)
+        self._timestamps = array('d', bytes(8 * 2 * capacity))
+
+    def __len__(self):
+        return self._count
+
+    def append(self, values, timestamp=None):
+        """
+        Ajoute une ligne (une valeur par cœur).
+
+        Une liste plus courte (cœur hors ligne) est complétée par des 0,
+        une liste plus longue est tronquée.
+        """
+        cores = self.cores
+        row = array('d', values[:cores])
+        if len(row) < cores:
+            row.extend(array('d', bytes(8 * (cores - len(row)))))
+
+        i = self._head
+        j = i + self.capacity
+        # Copie en bloc (memcpy) : pas de boucle par cœur
+        self._view[i * cores:(i + 1) * cores] = row
+        self._view[j * cores:(j + 1) * cores] = row
+        ts = time.monotonic() if timestamp is None else timestamp
+        self._timestamps[i] = self._timestamps[j] = ts
+
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _bounds(self, n):
+        if n is None or n > self.capacity:
+            n = self.capacity
+        end = self._head + self.capacity
+        return n, end - n, end
+
+    def window(self, n=None):
+        """Vue plate (ligne par ligne) sur les `n` derniers ticks × cœurs."""
+        n, start, end = self._bounds(n)
+        return self._view[start * self.cores:end * self.cores]
+
+    def core(self, index, n=None):
+        """Vue (sans copie) sur la série d'un cœur."""
+        return self.window(n)[index::self.cores]
+
+    def latest(self):
+        """Vue sur la dernière ligne écrite."""
+        return self.window(1)
+
+    def timestamps(self, n=None):
+        n, start, end = self._bounds(n)
+        return memoryview(self._timestamps)[start:end]
+
+    def matrix(self, n=None):
+        """Matrice numpy (n, cores) partageant le buffer, ou None sans numpy."""
+        if np is None:
+            return None
+        n, start, _ = self._bounds(n)
+        return np.frombuffer(self._data, dtype=np.float64, count=n * self.cores,
+                             offset=start * self.cores * 8).reshape(n, self.cores)
+
+    def group_bounds(self, groups):
+        """Indices de début de chaque groupe de cœurs consécutifs (tailles quasi égales)."""
+        groups = max(1, min(groups, self.cores))
+        return [g * self.cores // groups for g in range(groups)] + [self.cores]
+
+    def grouped(self, groups, n=None, stat='max'):
+        """
+        Agrège les cœurs en `groups` groupes consécutifs pour chaque tick.
+
+        Args:
+            groups: Nombre de groupes (lignes de la carte de chaleur)
+            n: Nombre de ticks
+            stat: 'max' (un cœur saturé reste visible) ou 'avg'
+
+        Returns:
+            Liste de `groups` séries de `n` valeurs (du plus ancien au plus récent)
+        """
+        bounds = self.group_bounds(groups)
+        starts = bounds[:-1]
+        matrix = self.matrix(n)
+        if matrix is not None:
+            if stat == 'max':
+                reduced = np.maximum.reduceat(matrix, starts, axis=1)
+            else:
+                sizes = np.diff(bounds)
+                reduced = np.add.reduceat(matrix, starts, axis=1) / sizes
+            return reduced.T.tolist()
+
+        window = self.window(n)
+        cores = self.cores
+        rows = len(window) // cores
+        result = []
+        for lo, hi in zip(starts, bounds[1:]):
+            series = []
+            for t in range(rows):
+                cells = window[t * cores + lo:t * cores + hi]
+                series.append(max(cells) if stat == 'max' else sum(cells) / (hi - lo))
+            result.append(series)
+        return result
+
+    def widen(self, cores):
+        """
+        Élargit chaque ligne à `cores` colonnes en conservant l'historique.
+
+        Une seule réallocation, les nouvelles colonnes valent 0. Utilisé par
+        DeviceHistory, dont la largeur double quand un périphérique apparaît.
+        """
+        if cores <= self.cores:
+            return
+        old, old_cores = self._data, self.cores
+        self._view.release()
+        self._data = array('d', bytes(8 * 2 * self.capacity * cores))
+        self._view = memoryview(self._data)
+        old_view = memoryview(old)
+        for row in range(2 * self.capacity):
+            self._view[row * cores:row * cores + old_cores] = old_view[row * old_cores:(row + 1) * old_cores]
+        old_view.release()
+        self.cores = cores
+
+    def clear_column(self, index):
+        """Remet une colonne à 0 sur tout l'historique (emplacement réattribué)."""
+        zeros = array('d', bytes(8 * 2 * self.capacity))
+        self._view[index::self.cores] = zeros
+
+    def hottest(self):
+        """(indice, valeur) du cœur le plus chargé au dernier tick."""
+        row = self.latest()
+        if np is not None:
+            values = np.frombuffer(row, dtype=np.float64)
+            index = int(values.argmax())
+            return index, float(values[index])
+        value = max(row)
+        return row.tolist().index(value), value
+
+
+class DeviceHistory:
+    """
+    Historique par périphérique (disque, interface réseau) à emplacements.
+
+    Chaque champ ('read_kbps', 'down_kbps'...) est un CoreHistory dont les
+    colonnes sont des emplacements attribués aux périphériques. Un
+    périphérique qui disparaît libère son emplacement après `grace` ticks
+    d'absence ; un nouveau périphérique reprend un emplacement libre, et la
+    largeur ne double que lorsqu'il n'en reste aucun : pas de réallocation
+    à chaque tick quand des clés USB ou des interfaces VPN vont et viennent.
+    """
+
+    def __init__(self, fields, capacity, slots=4, grace=5):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.grace = grace
+        self.width = max(1, slots)
+        self.slots = {}         # périphérique -> emplacement
+        self._missing = {}      # périphérique -> ticks d'absence consécutifs
+        self._free = list(range(self.width - 1, -1, -1))
+        self._data = {field: CoreHistory(self.width, capacity) for field in self.fields}
+
+    def __len__(self):
+        return len(self._data[self.fields[0]])
+
+    @property
+    def devices(self):
+        return list(self.slots)
+
+    def _assign(self, device):
+        if not self._free:
+            # Plus d'emplacement libre : la largeur double (coût amorti)
+            old = self.width
+            self.width *= 2
+            for history in self._data.values():
+                history.widen(self.width)
+            self._free = list(range(self.width - 1, old - 1, -1))
+        slot = self._free.pop()
+        for history in self._data.values():
+            history.clear_column(slot)
+        self.slots[device] = slot
+        return slot
+
+    def _release(self, device):
+        self._free.append(self.slots.pop(device))
+        self._missing.pop(device, None)
+
+    def append(self, devices, timestamp=None):
+        """
+        Ajoute un tick.
+
+        Args:
+            devices: Dict {périphérique: {champ: valeur}}
+            timestamp: Horodatage monotone (time.monotonic() par défaut)
+        """
+        for device in list(self.slots):
+            if device in devices:
+                self._missing.pop(device, None)
+                continue
+            self._missing[device] = self._missing.get(device, 0) + 1
+            if self._missing[device] > self.grace:
+                self._release(device)
+
+        for device in devices:
+            if device not in self.slots:
+                self._assign(device)
+
+        ts = time.monotonic() if timestamp is None else timestamp
+        for field, history in self._data.items():
+            row = [0.0] * self.width
+            for device, values in devices.items():
+                row[self.slots[device]] = values.get(field) or 0.0
+            history.append(row, ts)
+
+    def series(self, device, field, n=None):
+        """Vue (sans copie) sur l'historique d'un champ pour un périphérique, ou None."""
+        slot = self.slots.get(device)
+        if slot is None:
+            return None
+        return self._data[field].core(slot, n)
+
+    def timestamps(self, n=None):
+        return self._data[self.fields[0]].timestamps(n)
@@ -0,0 +1,440 @@
+"""
+Stockage persistant de l'historique des métriques pour Taskly.
+Segments append-only à enregistrements de taille fixe, lus via mmap.
+
+Format d'un segment (little-endian) :
+    en-tête   : magic (8 octets) | version (uint16) | nb colonnes (uint16) | taille en-tête (uint32)
+                puis les noms de colonnes en UTF-8 séparés par '\\0', complétés à un multiple de 8
+    données   : enregistrements de (1 + nb colonnes) float64 : timestamp Unix puis valeurs
+
+Un enregistrement partiel en fin de fichier (arrêt brutal) est simplement ignoré.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from utils import debug_log
+
+
+MAGIC = b'TASKLYTS'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sHHI')
+SEGMENT_SUFFIX = '.tsk'
+
+
+def _segment_name(first_timestamp):
+    return f"segment_{int(first_timestamp * 1000):015d}{SEGMENT_SUFFIX}"
+
+
+def _encode_header(columns):
+    names = '\0'.join(columns).encode('utf-8')
+    size = _HEADER.size + len(names)
+    size += -size % 8  # Aligne les enregistrements float64
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(columns), size) + names
+    return header.ljust(size, b'\0')
+
+
+class Segment:
+    """Segment sur disque, mappé en mémoire en lecture seule."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            raw = f.read(_HEADER.size)
+            magic, version, ncols, header_size = _HEADER.unpack(raw)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"Not a Taskly history segment: {self.path}")
+            names = f.read(header_size - _HEADER.size).rstrip(b'\0').decode('utf-8')
+
+        self.columns = tuple(names.split('\0')) if names else ()
+        self.header_size = header_size
+        self.stride = 1 + len(self.columns)
+        self.record_size = 8 * self.stride
+        self._index = {name: i + 1 for i, name in enumerate(self.columns)}
+        self._mmap = None
+        self._values = None
+        self.rows = 0
+
+    def open(self):
+        """(Re)mappe le fichier ; à rappeler si le segment a grandi."""
+        self.close()
+        size = self.path.stat().st_size
+        self.rows = max(0, (size - self.header_size) // self.record_size)
+        if not self.rows:
+            return self
+
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        end = self.header_size + self.rows * self.record_size
+        self._values = memoryview(self._mmap)[self.header_size:end].cast('d')
+        return self
+
+    def close(self):
+        if self._values is not None:
+            self._values.release()
+            self._values = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    @property
+    def size_bytes(self):
+        return self.header_size + self.rows * self.record_size
+
+    def timestamp(self, row):
+        return self._values[row * self.stride]
+
+    @property
+    def first_timestamp(self):
+        return self.timestamp(0) if self.rows else None
+
+    @property
+    def last_timestamp(self):
+        return self.timestamp(self.rows - 1) if self.rows else None
+
+    def bisect_left(self, timestamp):
+        """Premier enregistrement dont le timestamp est >= `timestamp`."""
+        lo, hi = 0, self.rows
+        values, stride = self._values, self.stride
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if values[mid * stride] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def timestamps(self, start_row=0, end_row=None):
+        """Vue (sans copie) sur la colonne timestamp des lignes [start_row, end_row)."""
+        end_row = self.rows if end_row is None else end_row
+        return self._values[start_row * self.stride:end_row * self.stride:self.stride]
+
+    def column(self, name, start_row=0, end_row=None):
+        """Vue (sans copie) sur une colonne, ou None si absente de ce segment."""
+        offset = self._index.get(name)
+        if offset is None:
+            return None
+        end_row = self.rows if end_row is None else end_row
+        return self._values[start_row * self.stride + offset:end_row * self.stride:self.stride]
+
+    def row(self, index):
+        """Retourne (timestamp, {colonne: valeur}) pour une ligne."""
+        base = index * self.stride
+        values = self._values
+        return values[base], {name: values[base + offset] for name, offset in self._index.items()}
+
+
+class SegmentSlice:
+    """Plage contiguë de lignes d'un segment, résultat d'une requête temporelle."""
+
+    def __init__(self, segment, start_row, end_row):
+        self.segment = segment
+        self.start_row = start_row
+        self.end_row = end_row
+
+    def __len__(self):
+        return self.end_row - self.start_row
+
+    @property
+    def timestamps(self):
+        return self.segment.timestamps(self.start_row, self.end_row)
+
+    def column(self, name):
+        return self.segment.column(name, self.start_row, self.end_row)
+
+    def rows(self):
+        for index in range(self.start_row, self.end_row):
+            yield self.segment.row(index)
+
+
+class HistoryStore:
+    """
+    Série temporelle persistante en segments append-only.
+
+    - Écriture : un enregistrement binaire de taille fixe par tick, le segment
+      actif est scellé au bout de `segment_records` lignes.
+    - Lecture : mmap des segments, recherche dichotomique sur les timestamps.
+    - Rétention : suppression des segments expirés puis des plus anciens tant
+      que la taille totale dépasse `max_bytes`.
+    - Compaction : fusion des petits segments consécutifs (redémarrages).
+    """
+
+    def __init__(self, directory, columns, segment_records=21600,
+                 retention_seconds=7 * 86400, max_bytes=256 * 1024**2, flush_every=10):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.columns = tuple(columns)
+        self.segment_records = segment_records
+        self.retention_seconds = retention_seconds
+        self.max_bytes = max_bytes
+        self.flush_every = flush_every
+
+        self._record = struct.Struct(f'<{1 + len(self.columns)}d')
+        self._header = _encode_header(self.columns)
+        self._file = None
+        self._active_path = None
+        self._active_rows = 0
+        self._pending = 0
+        # La collecte écrit, les exports lisent depuis un autre thread : toute
+        # modification de self.segments ou du fichier actif passe par ce verrou
+        # (réentrant : append -> flush, query -> _refresh_active -> flush...)
+        self._lock = threading.RLock()
+
+        self.segments = []
+        self._load_segments()
+        debug_log(f"HistoryStore opened: {self.directory} ({len(self.segments)} segments)")
+
+    # ------------------------------------------
+    # Segments
+    # ------------------------------------------
+    def _load_segments(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+        for path in sorted(self.directory.glob(f"segment_*{SEGMENT_SUFFIX}")):
+            try:
+                segment = Segment(path).open()
+            except (ValueError, OSError, struct.error) as e:
+                debug_log(f"Skipping unreadable history segment {path}: {e}", "WARNING")
+                continue
+            if segment.rows:
+                self.segments.append(segment)
+            else:
+                segment.close()
+
+    def _open_active(self, timestamp):
+        self._active_path = self.directory / _segment_name(timestamp)
+        self._file = open(self._active_path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(self._header)
+        self._active_rows = 0
+
+    def _seal_active(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self._pending = 0
+        self._load_segments()
+        self.enforce_retention()
+
+    # ------------------------------------------
+    # Écriture
+    # ------------------------------------------
+    def append(self, timestamp, values):
+        """Ajoute un enregistrement (timestamp Unix + valeurs par colonne)."""
+        with self._lock:
+            if self._file is None:
+                self._open_active(timestamp)
+
+            row = [timestamp]
+            for name in self.columns:
+                value = values.get(name)
+                row.append(value if value is not None else 0.0)
+            self._file.write(self._record.pack(*row))
+
+            self._active_rows += 1
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self.flush()
+            if self._active_rows >= self.segment_records:
+                self._seal_active()
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            for segment in self.segments:
+                segment.close()
+
+    # ------------------------------------------
+    # Lecture
+    # ------------------------------------------
+    def _refresh_active(self):
+        """Rend visibles les lignes du segment actif encore en tampon."""
+        if self._file is None:
+            return
+        self.flush()
+        for segment in self.segments:
+            if segment.path == self._active_path:
+                segment.open()
+                return
+        segment = Segment(self._active_path).open()
+        if segment.rows:
+            self.segments.append(segment)
+
+    def query(self, start=None, end=None):
+        """
+        Retourne les plages [start, end] (timestamps Unix) sous forme de SegmentSlice.
+
+        Chaque segment est localisé par dichotomie sur sa colonne timestamp.
+        """
+        with self._lock:
+            self._refresh_active()
+            start = float('-inf') if start is None else start
+            end = float('inf') if end is None else end
+
+            slices = []
+            for segment in self.segments:
+                if not segment.rows or segment.last_timestamp < start or segment.first_timestamp > end:
+                    continue
+                lo = segment.bisect_left(start)
+                hi = segment.bisect_left(end)
+                while hi < segment.rows and segment.timestamp(hi) <= end:
+                    hi += 1
+                if hi > lo:
+                    slices.append(SegmentSlice(segment, lo, hi))
+            return slices
+
+    def iter_range(self, start=None, end=None, chunk_rows=3600):
+        """
+        Parcourt [start, end] par blocs de `chunk_rows` lignes, pour les exports.
+
+        Seuls les chemins sont relevés sous verrou (query()) ; les segments
+        sont ensuite remappés à part : une rotation ou une rétention pendant
+        la lecture (thread de collecte) ne ferme pas les fichiers lus.
+
+        Yields:
+            (timestamps, {colonne: valeurs}) en listes ; colonnes absentes
+            d'un segment plus ancien à 0
+        """
+        paths = [piece.segment.path for piece in self.query(start, end)]
+        start = float('-inf') if start is None else start
+        end = float('inf') if end is None else end
+        for path in paths:
+            try:
+                segment = Segment(path).open()
+            except (ValueError, OSError, struct.error):
+                continue    # Segment supprimé entre-temps
+            try:
+                if not segment.rows:
+                    continue
+                lo = segment.bisect_left(start)
+                hi = segment.bisect_left(end)
+                while hi < segment.rows and segment.timestamp(hi) <= end:
+                    hi += 1
+                for first in range(lo, hi, chunk_rows):
+                    last = min(first + chunk_rows, hi)
+                    columns = {}
+                    for name in self.columns:
+                        view = segment.column(name, first, last)
+                        if view is None:
+                            columns[name] = [0.0] * (last - first)
+                            continue
+                        with view:  # Libérée avant la fermeture du mmap
+                            columns[name] = view.tolist()
+                    with segment.timestamps(first, last) as view:
+                        timestamps = view.tolist()
+                    yield timestamps, columns
+            finally:
+                segment.close()
+
+    def tail(self, n):
+        """Retourne les `n` derniers enregistrements [(timestamp, valeurs), ...]."""
+        with self._lock:
+            self._refresh_active()
+            rows = []
+            for segment in reversed(self.segments):
+                take = min(n - len(rows), segment.rows)
+                for index in range(segment.rows - 1, segment.rows - 1 - take, -1):
+                    rows.append(segment.row(index))
+                if len(rows) >= n:
+                    break
+            rows.reverse()
+            return rows
+
+    # ------------------------------------------
+    # Rétention & compaction
+    # ------------------------------------------
+    def _sealed(self):
+        return [s for s in self.segments if s.path != self._active_path]
+
+    def _remove(self, segment):
+        segment.close()
+        try:
+            segment.path.unlink()
+        except FileNotFoundError:
+            pass
+        self.segments.remove(segment)
+
+    def enforce_retention(self, now=None):
+        """Supprime les segments expirés puis les plus anciens au-delà de max_bytes."""
+        with self._lock:
+            now = time.time() if now is None else now
+            removed = 0
+
+            for segment in self._sealed():
+                if segment.last_timestamp < now - self.retention_seconds:
+                    self._remove(segment)
+                    removed += 1
+
+            total = sum(segment.size_bytes for segment in self.segments)
+            for segment in self._sealed():
+                if total <= self.max_bytes:
+                    break
+                total -= segment.size_bytes
+                self._remove(segment)
+                removed += 1
+
+            if removed:
+                debug_log(f"History retention removed {removed} segment(s)")
+            return removed
+
+    def compact(self, min_records=None):
+        """
+        Fusionne les petits segments scellés consécutifs (même schéma) en un seul.
+
+        Les segments courts viennent des redémarrages ; la fusion limite le
+        nombre de fichiers à mapper lors des requêtes.
+        """
+        with self._lock:
+            min_records = self.segment_records // 4 if min_records is None else min_records
+            groups, current = [], []
+            for segment in self._sealed():
+                small = segment.rows < min_records
+                same_schema = not current or current[0].columns == segment.columns
+                fits = sum(s.rows for s in current) + segment.rows <= self.segment_records
+                if small and same_schema and fits:
+                    current.append(segment)
+                    continue
+                if len(current) > 1:
+                    groups.append(current)
+                current = [segment] if small else []
+            if len(current) > 1:
+                groups.append(current)
+
+            for group in groups:
+                self._merge(group)
+            if groups:
+                self._load_segments()
+                debug_log(f"History compaction merged {sum(len(g) for g in groups)} segments into {len(groups)}")
+            return len(groups)
+
+    def _merge(self, group):
+        first = group[0]
+        target = first.path
+        tmp_path = target.with_suffix(target.suffix + '.tmp')
+        with open(first.path, 'rb') as f:
+            header = f.read(first.header_size)
+        with open(tmp_path, 'wb') as out:
+            out.write(header)
+            for segment in group:
+                out.write(segment._values.cast('B') if segment.rows else b'')
+        for segment in group:
+            segment.close()
+        os.replace(tmp_path, target)
+        for segment in group[1:]:
+            try:
+                segment.path.unlink()
+            except FileNotFoundError:
+                pass
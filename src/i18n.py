@@ -21,6 +21,8 @@ TRANSLATIONS = {
         "tooltip_alerts": "Basculer les alertes",
         "tooltip_info": "Basculer les infos système",
         "tooltip_language": "Changer la langue",
+        "tooltip_processes": "Afficher tous les processus",
+        "tooltip_record": "Enregistrer chaque tick",
         
         # Metric Cards
         "cpu_usage": "Utilisation CPU",
@@ -31,6 +33,7 @@ TRANSLATIONS = {
         
         # Charts
         "cpu_history": "Historique CPU",
+        "cpu_cores": "Cœurs CPU",
         "ram_history": "Historique RAM",
         "network_history": "Historique Réseau",
         
@@ -42,6 +45,9 @@ TRANSLATIONS = {
         "ram_percent": "RAM%",
         "sort_by_cpu": "Trier par CPU",
         "sort_by_ram": "Trier par RAM",
+        "all_processes": "Tous les processus",
+        "search_processes": "Nom, commande ou PID",
+        "command": "Commande",
         
         # System Info Panel
         "system_info": "Informations Système",
@@ -61,6 +67,8 @@ TRANSLATIONS = {
         # Export
         "export_success": "Données exportées avec succès",
         "export_error": "Erreur lors de l'export",
+        "recording_started": "Enregistrement démarré",
+        "recording_stopped": "Enregistrement terminé",
     },
     "en": {
         # Header
@@ -72,6 +80,8 @@ TRANSLATIONS = {
         "tooltip_alerts": "Toggle Alerts",
         "tooltip_info": "Toggle System Info",
         "tooltip_language": "Change Language",
+        "tooltip_processes": "Show All Processes",
+        "tooltip_record": "Record Every Tick",
         
         # Metric Cards
         "cpu_usage": "CPU Usage",
@@ -82,6 +92,7 @@ TRANSLATIONS = {
         
         # Charts
         "cpu_history": "CPU History",
+        "cpu_cores": "CPU Cores",
         "ram_history": "RAM History",
         "network_history": "Network History",
         
@@ -93,6 +104,9 @@ TRANSLATIONS = {
         "ram_percent": "RAM%",
         "sort_by_cpu": "Sort by CPU",
         "sort_by_ram": "Sort by RAM",
+        "all_processes": "All Processes",
+        "search_processes": "Name, command or PID",
+        "command": "Command",
         
         # System Info Panel
         "system_info": "System Information",
@@ -112,6 +126,8 @@ TRANSLATIONS = {
         # Export
         "export_success": "Data exported successfully",
         "export_error": "Error during export",
+        "recording_started": "Recording started",
+        "recording_stopped": "Recording saved",
     }
 }
 
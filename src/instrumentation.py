@@ -0,0 +1,140 @@
+"""
+Instrumentation du chemin chaud de Taskly.
+
+Chaque span (collecteur, mise à jour d'un graphique, page.update()...) garde
+ses INSTRUMENTATION_WINDOW dernières durées dans un tampon circulaire de
+taille fixe ; p50/p95/p99 ne sont calculés qu'à la lecture. Désactivée,
+l'instrumentation se réduit à un test de booléen et un contexte partagé
+sans effet.
+"""
+import threading
+import time
+from array import array
+from contextlib import nullcontext
+from constants import INSTRUMENTATION_ENABLED, INSTRUMENTATION_WINDOW
+
+_NOOP = nullcontext()
+
+
+class SpanStats:
+    """Durées récentes (secondes) d'un span, en mémoire fixe."""
+
+    __slots__ = ('samples', 'index', 'count', 'total', 'max')
+
+    def __init__(self, window=INSTRUMENTATION_WINDOW):
+        self.samples = array('d', bytes(8 * window))
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self):
+        """Statistiques en millisecondes sur la fenêtre glissante."""
+        filled = min(self.count, len(self.samples))
+        window = sorted(self.samples[:filled]) if filled else [0.0]
+
+        def pct(q):
+            return window[min(filled - 1, int(filled * q))] * 1000 if filled else 0.0
+
+        return {
+            'count': self.count,
+            'last_ms': self.samples[self.index - 1] * 1000 if filled else 0.0,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': pct(0.50),
+            'p95_ms': pct(0.95),
+            'p99_ms': pct(0.99),
+            'max_ms': self.max * 1000,
+        }
+
+
+class _Span:
+    __slots__ = ('owner', 'name', 'started')
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.owner.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Instrumentation:
+    """
+    Registre des spans chronométrés.
+
+    Usage :
+        with instruments.span('ui.page_update'):
+            page.update()
+    """
+
+    def __init__(self, enabled=INSTRUMENTATION_ENABLED, window=INSTRUMENTATION_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+
+    def span(self, name):
+        """Contexte chronométrant son bloc (sans effet si désactivé)."""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name)
+
+    def record(self, name, seconds):
+        stats = self._spans.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._spans.setdefault(name, SpanStats(self.window))
+        stats.add(seconds)
+
+    def wrap(self, name, func):
+        """
+        Enveloppe `func` dans un span.
+
+        L'état activé est lu à chaque appel : on peut activer l'instrumentation
+        après coup sans ré-envelopper.
+        """
+        def timed(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+        timed.__name__ = getattr(func, '__name__', name)
+        timed.__wrapped__ = func
+        return timed
+
+    def stats(self):
+        """Dict {span: statistiques en ms}, trié par nom."""
+        with self._lock:
+            spans = list(self._spans.items())
+        return {name: stats.summary() for name, stats in sorted(spans)}
+
+
+# Registre global partagé par le gestionnaire de données et l'interface
+instruments = Instrumentation()
+span = instruments.span
@@ -0,0 +1,603 @@
+"""
+Sources de métriques pour Taskly.
+
+SystemDataManager ne lit plus psutil directement : il consomme une source
+qui expose les mêmes primitives (cpu_percent, virtual_memory, net_io_counters...)
+et retourne des namedtuples aux champs de psutil.
+
+- PsutilSource    : machine réelle (psutil, chemin rapide /proc sous Linux)
+- SyntheticSource : générateur déterministe (graine), ex. 128 cœurs, 10 GbE, 50k processus
+- ReplaySource    : relecture d'un fichier NDJSON de snapshots (format taskly-agent)
+"""
+import json
+import random
+from abc import ABC, abstractmethod
+import threading
+import time
+from array import array
+from collections import namedtuple
+import psutil
+from utils import debug_log
+from process_table import ProcessCache, ProcessRows
+from procfs import ProcfsBackend, ProcScanner
+from constants import (
+    USE_PROCFS_FASTPATH, METRIC_SOURCE,
+    SYNTHETIC_SEED, SYNTHETIC_CPU_COUNT, SYNTHETIC_PROCESS_COUNT,
+    SYNTHETIC_MEMORY_GB, SYNTHETIC_LINK_MBPS,
+    REPLAY_PATH, REPLAY_SPEED, REPLAY_LOOP
+)
+
+
+# Mêmes champs que les namedtuples psutil utilisés par SystemDataManager
+svmem = namedtuple('svmem', ['total', 'available', 'percent', 'used', 'free'])
+sdiskusage = namedtuple('sdiskusage', ['total', 'used', 'free', 'percent'])
+sdiskio = namedtuple('sdiskio', ['read_count', 'write_count', 'read_bytes', 'write_bytes',
+                                 'read_time', 'write_time', 'read_merged_count',
+                                 'write_merged_count', 'busy_time'])
+snetio = namedtuple('snetio', ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                               'errin', 'errout', 'dropin', 'dropout'])
+scpufreq = namedtuple('scpufreq', ['current', 'min', 'max'])
+sbattery = namedtuple('sbattery', ['percent', 'secsleft', 'power_plugged'])
+sdiskpart = namedtuple('sdiskpart', ['device', 'mountpoint', 'fstype', 'opts'])
+
+
+class MetricSource(ABC):
+    """
+    Interface commune des sources de métriques.
+
+    Les méthodes suivent les signatures psutil utilisées par Taskly ;
+    process_rows() retourne directement la table compacte des processus.
+    Les méthodes abstraites doivent toutes être fournies : une source
+    incomplète échoue dès son instanciation.
+    """
+
+    name = 'base'
+    live = False  # True si les valeurs décrivent la machine réelle (persistées sur disque)
+
+    @abstractmethod
+    def cpu_percent(self, interval=None, percpu=False):
+        ...
+
+    @abstractmethod
+    def cpu_count(self, logical=True):
+        ...
+
+    @abstractmethod
+    def cpu_freq(self, percpu=False):
+        ...
+
+    @abstractmethod
+    def virtual_memory(self):
+        ...
+
+    @abstractmethod
+    def disk_usage(self, path):
+        ...
+
+    def disk_partitions(self, all=False):
+        return []
+
+    @abstractmethod
+    def disk_io_counters(self, perdisk=False):
+        ...
+
+    @abstractmethod
+    def net_io_counters(self, pernic=False):
+        ...
+
+    def sensors_battery(self):
+        return None
+
+    @abstractmethod
+    def boot_time(self):
+        ...
+
+    @abstractmethod
+    def process_rows(self, cpu_count, normalize_cpu=True):
+        """Table des processus du tick (ProcessRows)."""
+
+    def process_cmdlines(self, pids):
+        """Lignes de commande des PID demandés : dict {pid: str} (absents si inconnus)."""
+        return {}
+
+    def process_labels(self, pids, kind):
+        """
+        Attribut stable de chaque PID pour le regroupement.
+
+        Args:
+            kind: 'user' (propriétaire) ou 'cgroup' (chemin du cgroup)
+
+        Returns:
+            Dict {pid: str} (absents si inconnus)
+        """
+        return {}
+
+    def close(self):
+        pass
+
+
+# ==========================================
+# PSUTIL
+# ==========================================
+class PsutilSource(MetricSource):
+    """Machine réelle : psutil, avec le chemin rapide /proc sous Linux."""
+
+    name = 'psutil'
+    live = True
+
+    def __init__(self, fastpath=USE_PROCFS_FASTPATH):
+        # Chemin rapide Linux (/proc pré-ouvert), psutil en repli
+        self.procfs = ProcfsBackend.create() if fastpath else None
+        if self.procfs is not None:
+            self.cpu_percent = self.procfs.cpu_percent
+            self.virtual_memory = self.procfs.virtual_memory
+            self.net_io_counters = self.procfs.net_io_counters
+
+        # Table des processus : scanner /proc groupé sous Linux,
+        # sinon cache persistant de psutil.Process
+        self.proc_scanner = ProcScanner.create() if fastpath else None
+        self.process_cache = ProcessCache()
+
+    def cpu_percent(self, interval=None, percpu=False):
+        return psutil.cpu_percent(interval=interval, percpu=percpu)
+
+    def cpu_count(self, logical=True):
+        return psutil.cpu_count(logical=logical)
+
+    def cpu_freq(self, percpu=False):
+        return psutil.cpu_freq(percpu=percpu)
+
+    def virtual_memory(self):
+        return psutil.virtual_memory()
+
+    def disk_usage(self, path):
+        return psutil.disk_usage(path)
+
+    def disk_partitions(self, all=False):
+        return psutil.disk_partitions(all=all)
+
+    def disk_io_counters(self, perdisk=False):
+        return psutil.disk_io_counters(perdisk=perdisk)
+
+    def net_io_counters(self, pernic=False):
+        return psutil.net_io_counters(pernic=pernic)
+
+    def sensors_battery(self):
+        return psutil.sensors_battery()
+
+    def boot_time(self):
+        return psutil.boot_time()
+
+    def process_rows(self, cpu_count, normalize_cpu=True):
+        if self.proc_scanner is not None:
+            return self.proc_scanner.scan(cpu_count, normalize_cpu)
+        return self.process_cache.sample(cpu_count, normalize_cpu)
+
+    def process_cmdlines(self, pids):
+        if self.proc_scanner is not None:
+            return {pid: self.proc_scanner.cmdline(pid) for pid in pids}
+        cmdlines = {}
+        for pid in pids:
+            try:
+                cmdlines[pid] = " ".join(psutil.Process(pid).cmdline())
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                cmdlines[pid] = ''
+        return cmdlines
+
+    def process_labels(self, pids, kind):
+        if self.proc_scanner is not None:
+            read = self.proc_scanner.username if kind == 'user' else self.proc_scanner.cgroup
+            return {pid: read(pid) for pid in pids}
+        if kind != 'user':
+            return {}   # Pas de cgroup hors Linux
+        labels = {}
+        for pid in pids:
+            try:
+                labels[pid] = psutil.Process(pid).username()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                labels[pid] = ''
+        return labels
+
+    def close(self):
+        if self.procfs is not None:
+            self.procfs.close()
+
+
+# ==========================================
+# SYNTHÉTIQUE
+# ==========================================
+class SyntheticSource(MetricSource):
+    """
+    Générateur déterministe pour les tests de charge.
+
+    Les séries suivent des marches aléatoires bornées issues d'une graine
+    unique ; les compteurs cumulés (disque, réseau) progressent selon le
+    temps écoulé réel, pour que les débits calculés restent cohérents.
+    """
+
+    name = 'synthetic'
+    _NAMES = ("python", "chrome", "postgres", "nginx", "java", "node", "bash",
+              "sshd", "redis", "kworker", "containerd", "envoy")
+    _DISKS = ("nvme0n1", "nvme1n1", "nvme2n1", "nvme3n1")
+    _NICS = ("eth0", "eth1")    # eth1 : interface d'administration à 1 Gb/s
+
+    def __init__(self, seed=SYNTHETIC_SEED, cpu_count=SYNTHETIC_CPU_COUNT,
+                 process_count=SYNTHETIC_PROCESS_COUNT, memory_gb=SYNTHETIC_MEMORY_GB,
+                 link_mbps=SYNTHETIC_LINK_MBPS, churn=0.002, clock=time.monotonic):
+        self.rng = random.Random(seed)
+        self.cores = cpu_count
+        self.process_count = process_count
+        self.memory_total = int(memory_gb * 1024**3)
+        self.link_bytes = link_mbps * 1e6 / 8
+        self.churn = churn
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._boot_time = time.time() - 12 * 86400
+
+        self.core_loads = [self.rng.uniform(5, 60) for _ in range(self.cores)]
+        self._mem_used = self.memory_total * 0.55
+        # Compteurs cumulés par périphérique, avancés selon le temps écoulé
+        self._link_usage = {nic: [0.2, 0.4] for nic in self._NICS}     # Fraction du lien (émission, réception)
+        self._net = {nic: [0] * 8 for nic in self._NICS}                # Champs de snetio
+        self._disk = {disk: [0] * 9 for disk in self._DISKS}            # Champs de sdiskio
+        self._last_io = self.clock()
+
+        self._next_pid = 1
+        self._pids = array('l')
+        self._names = []
+        self._cpu = array('d')              # % d'un cœur (peut dépasser 100)
+        self._memory = array('d')
+        self._ppids = array('l')
+        for _ in range(process_count):
+            self._spawn()
+
+    @staticmethod
+    def _walk(rng, value, step, low, high):
+        return min(max(value + rng.gauss(0, step), low), high)
+
+    def _advance_io(self):
+        """Fait progresser tous les compteurs disque/réseau jusqu'à maintenant (verrou tenu)."""
+        now = self.clock()
+        elapsed = now - self._last_io
+        if elapsed <= 0:
+            return
+        self._last_io = now
+        rng, walk = self.rng, self._walk
+
+        for disk, counters in self._disk.items():
+            reads, writes = rng.randint(0, 5000), rng.randint(0, 4000)
+            counters[0] += int(reads * elapsed)
+            counters[1] += int(writes * elapsed)
+            counters[2] += int(reads * 64 * 1024 * elapsed)
+            counters[3] += int(writes * 32 * 1024 * elapsed)
+            counters[4] += int(reads * elapsed * rng.uniform(0.05, 0.4))    # ms d'attente
+            counters[5] += int(writes * elapsed * rng.uniform(0.02, 0.2))
+            counters[8] += int(elapsed * 1000 * rng.uniform(0.05, 0.9))    # ms occupés
+
+        for nic, counters in self._net.items():
+            link = self.link_bytes if nic == self._NICS[0] else 125e6
+            usage = self._link_usage[nic]
+            for i in range(2):
+                usage[i] = walk(rng, usage[i], 0.05, 0.0, 1.0)
+            sent = int(usage[0] * link * elapsed)
+            recv = int(usage[1] * link * elapsed)
+            counters[0] += sent
+            counters[1] += recv
+            counters[2] += sent // 1500
+            counters[3] += recv // 1500
+
+    def _spawn(self, index=None):
+        rng = self.rng
+        pid = self._next_pid
+        self._next_pid += 1
+        name = rng.choice(self._NAMES)
+        cpu = rng.expovariate(1.0) * 8
+        memory = rng.expovariate(1.0) * 200 / self.process_count
+        # Les 32 premiers processus jouent le rôle de services parents
+        ppid = self._pids[pid % 32] if len(self._pids) > 32 else 1
+        if index is None:
+            self._ppids.append(ppid)
+            self._pids.append(pid)
+            self._names.append(name)
+            self._cpu.append(cpu)
+            self._memory.append(memory)
+        else:
+            self._pids[index] = pid
+            self._names[index] = name
+            self._cpu[index] = cpu
+            self._memory[index] = memory
+            self._ppids[index] = ppid
+
+    # ------------------------------------------
+    # CPU / mémoire
+    # ------------------------------------------
+    def cpu_percent(self, interval=None, percpu=False):
+        with self._lock:
+            rng, walk = self.rng, self._walk
+            loads = self.core_loads
+            for i in range(len(loads)):
+                loads[i] = walk(rng, loads[i], 6.0, 0.0, 100.0)
+            if percpu:
+                return list(loads)
+            return round(sum(loads) / len(loads), 1)
+
+    def cpu_count(self, logical=True):
+        return self.cores if logical else max(1, self.cores // 2)
+
+    def cpu_freq(self, percpu=False):
+        if percpu:
+            # Fréquence proportionnelle à la charge de chaque cœur
+            return [scpufreq(1200.0 + load * 25.0, 1200.0, 3700.0) for load in self.core_loads]
+        return scpufreq(1200.0 + sum(self.core_loads) / self.cores * 25.0, 1200.0, 3700.0)
+
+    def virtual_memory(self):
+        with self._lock:
+            total = self.memory_total
+            self._mem_used = self._walk(self.rng, self._mem_used, total * 0.01, total * 0.05, total * 0.98)
+            used = int(self._mem_used)
+        available = total - used
+        return svmem(total, available, round(used / total * 100, 1), used, int(available * 0.6))
+
+    # ------------------------------------------
+    # Disque / réseau
+    # ------------------------------------------
+    # (périphérique, point de montage, type, taille en To, taux de remplissage)
+    _MOUNTS = (
+        ("/dev/nvme0n1p2", "/", "ext4", 0.5, 0.41),
+        ("/dev/md0", "/data", "xfs", 32, 0.87),
+        ("/dev/nvme1n1", "/var/lib/docker", "xfs", 4, 0.63),
+        ("nas:/export/backup", "/mnt/backup", "nfs4", 64, 0.95),
+    )
+
+    def disk_usage(self, path):
+        size, fill = next(((s, f) for _, m, _, s, f in self._MOUNTS if m == path), (8, 0.62))
+        total = int(size * 1024**4)
+        fill = self._walk(self.rng, fill, 0.002, 0.0, 1.0)
+        used = int(total * fill)
+        return sdiskusage(total, used, total - used, round(fill * 100, 1))
+
+    def disk_partitions(self, all=False):
+        return [sdiskpart(device, mountpoint, fstype, "rw") for device, mountpoint, fstype, _, _ in self._MOUNTS]
+
+    def disk_io_counters(self, perdisk=False):
+        with self._lock:
+            self._advance_io()
+            if perdisk:
+                return {disk: sdiskio(*counters) for disk, counters in self._disk.items()}
+            return sdiskio(*[sum(column) for column in zip(*self._disk.values())])
+
+    def net_io_counters(self, pernic=False):
+        with self._lock:
+            self._advance_io()
+            if pernic:
+                return {nic: snetio(*counters) for nic, counters in self._net.items()}
+            return snetio(*[sum(column) for column in zip(*self._net.values())])
+
+    def boot_time(self):
+        return self._boot_time
+
+    # ------------------------------------------
+    # Processus
+    # ------------------------------------------
+    def process_rows(self, cpu_count, normalize_cpu=True):
+        with self._lock:
+            rng = self.rng
+            size = len(self._pids)
+            if size:
+                for index in rng.sample(range(size), int(size * self.churn)):
+                    self._spawn(index)
+                cpu = self._cpu
+                for index in rng.sample(range(size), max(1, size // 50)):
+                    cpu[index] = rng.expovariate(1.0) * 8
+
+            if normalize_cpu:
+                cpu = array('d', [min(value / cpu_count, 100.0) for value in self._cpu])
+            else:
+                cpu = array('d', self._cpu)
+            return ProcessRows.from_columns(
+                array('l', self._pids), list(self._names), cpu, array('d', self._memory),
+                array('l', self._ppids)
+            )
+
+    def process_cmdlines(self, pids):
+        with self._lock:
+            names = dict(zip(self._pids, self._names))
+        return {pid: f"/usr/bin/{names[pid]} --worker={pid}" for pid in pids if pid in names}
+
+    _SERVICES = {'postgres': 'postgres', 'nginx': 'www-data', 'redis': 'redis',
+                 'sshd': 'root', 'kworker': 'root', 'containerd': 'root'}
+
+    def process_labels(self, pids, kind):
+        with self._lock:
+            names = dict(zip(self._pids, self._names))
+        labels = {}
+        for pid in pids:
+            name = names.get(pid)
+            if name is None:
+                continue
+            service = self._SERVICES.get(name)
+            if kind == 'user':
+                labels[pid] = service or f"user{pid % 4}"
+            elif service:
+                labels[pid] = f"/system.slice/{name}.service"
+            else:
+                labels[pid] = f"/kubepods/pod{pid % 8}/{name}"
+        return labels
+
+
+# ==========================================
+# RELECTURE
+# ==========================================
+class ReplaySource(MetricSource):
+    """
+    Relit un enregistrement NDJSON : une ligne par snapshot au format de
+    taskly-agent ({'timestamp', 'metrics', 'top_processes'}).
+
+    Le snapshot courant est choisi selon le temps écoulé depuis le début de
+    la relecture (multiplié par `speed`), quelle que soit la cadence des
+    collecteurs. Le fichier est lu en flux ; les lignes invalides sont
+    ignorées. En boucle, les compteurs cumulés restent croissants.
+    """
+
+    name = 'replay'
+    _COUNTERS = ('net_total_sent', 'net_total_recv', 'disk_read', 'disk_write')
+
+    def __init__(self, path=REPLAY_PATH, speed=REPLAY_SPEED, loop=REPLAY_LOOP, clock=time.monotonic):
+        if not path:
+            raise ValueError("ReplaySource requires a recording path")
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._file = None
+        self._base = dict.fromkeys(self._COUNTERS, 0)
+        self._open()
+        if self._frame is None:
+            raise ValueError(f"No snapshot found in {path}")
+
+    def _open(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, 'r', encoding='utf-8')
+        self._frame = self._read_frame()
+        self._next = self._read_frame()
+        self._first = self._frame
+        self._started = self.clock()
+
+    def _read_frame(self):
+        for line in self._file:
+            try:
+                frame = json.loads(line)
+                if isinstance(frame.get('metrics'), dict):
+                    frame.setdefault('timestamp', 0.0)
+                    return frame
+            except (ValueError, AttributeError):
+                pass
+        return None
+
+    def _current(self):
+        """Snapshot correspondant à l'instant de relecture courant."""
+        with self._lock:
+            elapsed = (self.clock() - self._started) * self.speed
+            origin = self._first['timestamp']
+            while self._next is not None and self._next['timestamp'] - origin <= elapsed:
+                self._frame, self._next = self._next, self._read_frame()
+
+            duration = self._frame['timestamp'] - origin
+            if self._next is None and self.loop and 0 < duration < elapsed:
+                first, last = self._first['metrics'], self._frame['metrics']
+                for key in self._COUNTERS:
+                    self._base[key] += (last.get(key) or 0) - (first.get(key) or 0)
+                debug_log(f"Replay: restarting {self.path}")
+                self._open()
+            return self._frame
+
+    def _metric(self, key, default=0):
+        value = self._current()['metrics'].get(key)
+        return default if value is None else value
+
+    def _counter(self, key):
+        return self._metric(key) + self._base[key]
+
+    def cpu_percent(self, interval=None, percpu=False):
+        if percpu:
+            # Enregistrements sans détail par cœur : un seul « cœur » agrégé
+            return self._metric('cpu_per_core', None) or [self._metric('cpu_percent', 0.0)]
+        return self._metric('cpu_percent', 0.0)
+
+    def cpu_count(self, logical=True):
+        key = 'cpu_count_logical' if logical else 'cpu_count'
+        return self._metric(key, 1) or 1
+
+    def cpu_freq(self, percpu=False):
+        if percpu:
+            freqs = self._metric('cpu_freq_per_core', None) or [self._metric('cpu_freq', 0.0)]
+            return [scpufreq(freq, 0.0, freq) for freq in freqs]
+        freq = self._metric('cpu_freq', 0.0)
+        return scpufreq(freq, 0.0, freq)
+
+    def virtual_memory(self):
+        metrics = self._current()['metrics']
+        total = int((metrics.get('ram_total_gb') or 0) * 1024**3)
+        used = int((metrics.get('ram_used_gb') or 0) * 1024**3)
+        available = int((metrics.get('ram_available_gb') or 0) * 1024**3)
+        return svmem(total, available, metrics.get('ram_percent') or 0.0, used, available)
+
+    def disk_usage(self, path):
+        metrics = self._current()['metrics']
+        total = int((metrics.get('disk_total_gb') or 0) * 1024**3)
+        used = int((metrics.get('disk_used_gb') or 0) * 1024**3)
+        return sdiskusage(total, used, total - used, metrics.get('disk_percent') or 0.0)
+
+    def disk_io_counters(self, perdisk=False):
+        # Les enregistrements ne contiennent que des débits par périphérique
+        if perdisk:
+            return {}
+        return sdiskio(0, 0, self._counter('disk_read'), self._counter('disk_write'), 0, 0, 0, 0, 0)
+
+    def net_io_counters(self, pernic=False):
+        if pernic:
+            return {}
+        return snetio(self._counter('net_total_sent'), self._counter('net_total_recv'), 0, 0, 0, 0, 0, 0)
+
+    def sensors_battery(self):
+        metrics = self._current()['metrics']
+        if not metrics.get('battery_percent'):
+            return None
+        secsleft = metrics.get('battery_time_left')
+        return sbattery(
+            metrics['battery_percent'],
+            psutil.POWER_TIME_UNLIMITED if secsleft is None else secsleft,
+            bool(metrics.get('battery_plugged')),
+        )
+
+    def boot_time(self):
+        return time.time() - self._metric('uptime', 0)
+
+    def process_rows(self, cpu_count, normalize_cpu=True):
+        """
+        Union des classements CPU et mémoire enregistrés.
+
+        Les valeurs CPU sont relues telles qu'enregistrées (déjà normalisées
+        ou non selon la configuration de l'enregistrement).
+        """
+        rankings = self._current().get('top_processes') or {}
+        rows = ProcessRows()
+        seen = set()
+        for ranking in (rankings.get('cpu') or [], rankings.get('memory') or []):
+            for proc in ranking:
+                pid = proc.get('pid')
+                if pid is None or pid in seen:
+                    continue
+                seen.add(pid)
+                rows.append(pid, proc.get('name') or "Unknown",
+                            proc.get('cpu_percent') or 0.0, proc.get('memory_percent') or 0.0)
+        return rows
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+SOURCES = {
+    PsutilSource.name: PsutilSource,
+    SyntheticSource.name: SyntheticSource,
+    ReplaySource.name: ReplaySource,
+}
+
+
+def create_source(name=METRIC_SOURCE, **kwargs):
+    """
+    Instancie une source par son nom ('psutil', 'synthetic', 'replay').
+
+    Raises:
+        ValueError: Si la source est inconnue
+    """
+    try:
+        source_cls = SOURCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown metric source '{name}' (expected one of: {', '.join(SOURCES)})")
+    debug_log(f"Metric source: {name}")
+    return source_cls(**kwargs)
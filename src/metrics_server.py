@@ -0,0 +1,260 @@
+"""
+Exposition OpenMetrics (Prometheus) pour Taskly.
+
+Un abonné du bus de snapshots rend le texte OpenMetrics une fois par tick
+et le met en cache avec ses en-têtes HTTP : chaque scrape de /metrics
+n'envoie que ces octets, sans jamais déclencher de collecte. Le serveur
+écoute sur localhost (TCP) ou sur un socket Unix.
+
+    python src/agent.py --metrics-port 9466
+    curl -s http://127.0.0.1:9466/metrics
+"""
+import http.server
+import math
+import socketserver
+import threading
+from pathlib import Path
+
+from constants import METRICS_SERVER_HOST, METRICS_SERVER_PORT, METRICS_MIN_INTERVAL
+from device_metrics import DISK_FIELDS, NIC_FIELDS
+from utils import debug_log, logger, prepare_socket_path, bind_private_socket
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+GIB = 1024 ** 3
+
+# (clé de get_metrics(), famille, unité/aide, facteur)
+GAUGES = (
+    ('cpu_percent', 'taskly_cpu_percent', "CPU usage (%)", 1),
+    ('cpu_freq', 'taskly_cpu_freq_mhz', "CPU frequency (MHz)", 1),
+    ('cpu_count', 'taskly_cpu_count', "Physical cores", 1),
+    ('cpu_count_logical', 'taskly_cpu_count_logical', "Logical cores", 1),
+    ('ram_percent', 'taskly_ram_percent', "RAM usage (%)", 1),
+    ('ram_used_gb', 'taskly_ram_used_bytes', "RAM used (bytes)", GIB),
+    ('ram_available_gb', 'taskly_ram_available_bytes', "RAM available (bytes)", GIB),
+    ('ram_total_gb', 'taskly_ram_total_bytes', "RAM total (bytes)", GIB),
+    ('disk_percent', 'taskly_disk_percent', "Main disk usage (%)", 1),
+    ('disk_used_gb', 'taskly_disk_used_bytes', "Main disk used (bytes)", GIB),
+    ('disk_total_gb', 'taskly_disk_total_bytes', "Main disk size (bytes)", GIB),
+    ('net_up', 'taskly_net_up_kbps', "Upload rate (KB/s)", 1),
+    ('net_down', 'taskly_net_down_kbps', "Download rate (KB/s)", 1),
+    ('battery_percent', 'taskly_battery_percent', "Battery level (%)", 1),
+    ('battery_plugged', 'taskly_battery_plugged', "On AC power (0/1)", 1),
+    ('uptime', 'taskly_uptime_seconds', "System uptime (s)", 1),
+)
+COUNTERS = (
+    ('disk_read', 'taskly_disk_read_bytes', "Bytes read from disks"),
+    ('disk_write', 'taskly_disk_written_bytes', "Bytes written to disks"),
+    ('net_total_sent', 'taskly_net_sent_bytes', "Bytes sent"),
+    ('net_total_recv', 'taskly_net_received_bytes', "Bytes received"),
+)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+def _family(lines, name, kind, help_text, samples):
+    """Ajoute une famille et ses échantillons ((suffixe d'étiquettes, valeur)) si elle en a."""
+    samples = [(labels, value) for labels, value in samples if value is not None]
+    if not samples:
+        return
+    lines.append(f"# TYPE {name} {kind}")
+    lines.append(f"# HELP {name} {help_text}")
+    sample_name = name + {'counter': '_total', 'info': '_info'}.get(kind, '')
+    lines.extend(f"{sample_name}{labels} {_number(value)}" for labels, value in samples)
+
+
+def render_openmetrics(snapshot):
+    """
+    Texte OpenMetrics d'un snapshot du bus.
+
+    Returns:
+        bytes UTF-8 terminés par '# EOF'
+    """
+    metrics = snapshot.metrics
+    lines = []
+    _family(lines, 'taskly_snapshot_version', 'gauge', "Snapshot version (one per tick)",
+            [('', snapshot.version)])
+    _family(lines, 'taskly_snapshot_timestamp_seconds', 'gauge', "Snapshot collection time (Unix)",
+            [('', snapshot.timestamp)])
+
+    for key, name, help_text, factor in GAUGES:
+        value = metrics.get(key)
+        _family(lines, name, 'gauge', help_text, [('', value * factor if value is not None else None)])
+    for key, name, help_text in COUNTERS:
+        _family(lines, name, 'counter', help_text, [('', metrics.get(key))])
+
+    # Cœurs, disques, interfaces et montages : une série par périphérique
+    for key, name, help_text in (('cpu_per_core', 'taskly_cpu_core_percent', "Usage per core (%)"),
+                                 ('cpu_freq_per_core', 'taskly_cpu_core_freq_mhz', "Frequency per core (MHz)")):
+        _family(lines, name, 'gauge', help_text,
+                [(_labels(core=index), value) for index, value in enumerate(metrics.get(key) or ())])
+    disks = metrics.get('disks') or {}
+    for field in DISK_FIELDS:
+        _family(lines, f'taskly_diskio_{field}', 'gauge', f"Per-disk {field}",
+                [(_labels(device=device), values.get(field)) for device, values in disks.items()])
+    nics = metrics.get('nics') or {}
+    for field in NIC_FIELDS:
+        _family(lines, f'taskly_nic_{field}', 'gauge', f"Per-interface {field}",
+                [(_labels(interface=nic), values.get(field)) for nic, values in nics.items()])
+    mounts = [(_labels(mountpoint=mount.get('mountpoint', ''), fstype=mount.get('fstype', '')), mount)
+              for mount in metrics.get('mounts') or ()]
+    _family(lines, 'taskly_mount_percent', 'gauge', "Mount usage (%)",
+            [(labels, mount.get('percent')) for labels, mount in mounts])
+    _family(lines, 'taskly_mount_used_bytes', 'gauge', "Mount used (bytes)",
+            [(labels, mount.get('used_gb', 0) * GIB) for labels, mount in mounts])
+    _family(lines, 'taskly_mount_total_bytes', 'gauge', "Mount size (bytes)",
+            [(labels, mount.get('total_gb', 0) * GIB) for labels, mount in mounts])
+    _family(lines, 'taskly_collector_stale', 'gauge', "Collector past its timeout (1)",
+            [(_labels(collector=name), 1) for name in metrics.get('stale') or ()])
+
+    # Top-N des processus (ou des groupes) : une série par (classement, rang), quel
+    # que soit le processus qui l'occupe. pid et nom, qui changent d'un tick à l'autre,
+    # ne sont portés que par taskly_process_info (à joindre sur ranking et rank).
+    ranked = [
+        (ranking, rank, proc)
+        for ranking, procs in snapshot.top_processes.items()
+        for rank, proc in enumerate(procs or (), 1)
+    ]
+    _family(lines, 'taskly_process', 'info', "Process holding each rank",
+            [(_labels(ranking=ranking, rank=rank, pid=proc.get('pid', ''), name=proc.get('name', '')), 1)
+             for ranking, rank, proc in ranked])
+    ranked = [(_labels(ranking=ranking, rank=rank), proc) for ranking, rank, proc in ranked]
+    _family(lines, 'taskly_process_cpu_percent', 'gauge', "Top process CPU usage (%)",
+            [(labels, proc.get('cpu_percent')) for labels, proc in ranked])
+    _family(lines, 'taskly_process_memory_percent', 'gauge', "Top process RAM usage (%)",
+            [(labels, proc.get('memory_percent')) for labels, proc in ranked])
+
+    lines.append('# EOF\n')
+    return '\n'.join(lines).encode('utf-8')
+
+
+def _response(status, body, content_type=CONTENT_TYPE):
+    """Réponse HTTP complète (en-têtes compris), prête à être envoyée telle quelle."""
+    head = (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+_NOT_READY = _response("503 Service Unavailable", b"no snapshot yet\n", "text/plain; charset=utf-8")
+_NOT_FOUND = _response("404 Not Found", b"not found\n", "text/plain; charset=utf-8")
+
+
+# ==========================================
+# SERVEUR HTTP
+# ==========================================
+class _MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Sert la réponse en cache : un scrape = un envoi d'octets."""
+
+    protocol_version = 'HTTP/1.1'   # Connexions keep-alive de Prometheus
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.wfile.write(_NOT_FOUND)
+            return
+        self.wfile.write(self.server.exporter.response or _NOT_READY)
+
+    def log_message(self, format, *args):
+        # client_address est vide sur un socket Unix : pas d'address_string()
+        debug_log(f"Metrics scrape: {format % args}", "DEBUG")
+
+
+class _TCPMetricsServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixMetricsServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+    """
+    Endpoint /metrics alimenté par le bus de snapshots.
+
+    Le rendu a lieu sur le thread d'un abonné 'latest' : ni la collecte ni
+    les scrapes ne l'attendent, et un scrape ne lit qu'une référence.
+    """
+
+    def __init__(self, bus, host=METRICS_SERVER_HOST, port=METRICS_SERVER_PORT, socket_path=None,
+                 min_interval=METRICS_MIN_INTERVAL):
+        self.bus = bus
+        self.host = host
+        self.port = port
+        self.socket_path = Path(socket_path).expanduser() if socket_path else None
+        self.min_interval = min_interval
+        self.response = None    # Réponse HTTP du dernier tick (remplacée en bloc)
+        self._subscription = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self):
+        """Adresse d'écoute effective (port réel si `port=0`)."""
+        if self.socket_path is not None:
+            return str(self.socket_path)
+        if self._server is not None:
+            return "%s:%d" % self._server.server_address[:2]
+        return f"{self.host}:{self.port}"
+
+    def render(self, snapshot):
+        """Abonné du bus : rend et met en cache la réponse du tick."""
+        self.response = _response("200 OK", render_openmetrics(snapshot))
+
+    def start(self):
+        """Ouvre le socket d'écoute et s'abonne au bus (idempotent)."""
+        if self._server is not None:
+            return
+        if self.socket_path is not None:
+            # Un endpoint encore à l'écoute n'est jamais supprimé (RuntimeError)
+            prepare_socket_path(self.socket_path, "metrics endpoint")
+            # ✅ SÉCURITÉ : socket accessible uniquement par l'utilisateur courant
+            self._server = bind_private_socket(
+                self.socket_path, lambda path: _UnixMetricsServer(path, _MetricsRequestHandler),
+                "metrics endpoint")
+        else:
+            self._server = _TCPMetricsServer((self.host, self.port), _MetricsRequestHandler)
+        self._server.exporter = self
+
+        latest = self.bus.latest()
+        if latest is not None:
+            self.render(latest)
+        self._subscription = self.bus.subscribe(self.render, mode='thread', policy='latest',
+                                                min_interval=self.min_interval, name='openmetrics')
+        self._thread = threading.Thread(target=self._server.serve_forever, name="taskly-metrics-server",
+                                        daemon=True)
+        self._thread.start()
+        logger.info(f"OpenMetrics endpoint listening on {self.address}")
+
+    def stop(self):
+        """Se désabonne du bus et ferme le serveur."""
+        if self._subscription is not None:
+            self._subscription.unsubscribe()
+            self._subscription = None
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self.socket_path is not None:
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+        debug_log("OpenMetrics endpoint stopped")
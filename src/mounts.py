@@ -0,0 +1,184 @@
+"""
+Surveillance de l'espace disque de tous les points de montage pour Taskly.
+
+Les appels statvfs (disk_usage) s'exécutent sur un pool de threads dédié,
+piloté par un Scheduler : chaque montage a sa propre cadence, et un montage
+qui ne répond pas (NFS, FUSE bloqué) est marqué comme tel sans jamais
+bloquer le tick de collecte, qui ne lit qu'un instantané en mémoire.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from scheduler import Scheduler
+from utils import debug_log
+from constants import (
+    MOUNT_INTERVAL, MOUNT_NETWORK_INTERVAL, MOUNT_TIMEOUT, MOUNT_REFRESH_INTERVAL,
+    MOUNT_WORKERS, MOUNT_EXCLUDE_FSTYPES, MOUNT_NETWORK_FSTYPES
+)
+
+
+class MountMonitor:
+    """
+    Collecteur d'arrière-plan de l'occupation de chaque système de fichiers.
+
+    - La liste des montages (disk_partitions) est relue toutes les
+      MOUNT_REFRESH_INTERVAL secondes ; les types de MOUNT_EXCLUDE_FSTYPES
+      (pseudo-systèmes, images squashfs...) sont ignorés.
+    - Les montages réseau sont interrogés moins souvent que les disques locaux.
+    - Un appel qui dépasse MOUNT_TIMEOUT marque le montage comme bloqué : sa
+      dernière valeur reste servie et il n'est pas relancé tant que l'appel
+      en cours n'est pas revenu (un thread au plus par montage bloqué).
+    """
+
+    def __init__(self, source, timeout=MOUNT_TIMEOUT, workers=MOUNT_WORKERS):
+        self.source = source
+        self.timeout = timeout
+        self.scheduler = Scheduler()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="taskly-mount")
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self._mounts = {}       # point de montage -> partition psutil
+        self._usage = {}        # point de montage -> dict d'occupation
+        self._started = {}      # point de montage -> début de l'appel en cours
+        self._in_flight = set()
+        self._hung = set()
+
+        self.scheduler.add_job('refresh', MOUNT_REFRESH_INTERVAL, self._refresh_partitions)
+
+    # ------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="taskly-mounts", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        # Un appel bloqué sur un montage mort ne doit pas bloquer l'arrêt
+        self._executor.shutdown(wait=False)
+
+    def _loop(self):
+        debug_log("Mount monitor started")
+        while not self._stop_event.is_set():
+            try:
+                self.scheduler.run_pending()
+                self._check_timeouts()
+            except Exception as e:
+                debug_log(f"Mount monitor error: {e}", "ERROR")
+            # Réveil au plus tard à l'échéance d'un appel en cours
+            wait = self.scheduler.time_until_next()
+            self._stop_event.wait(min(wait if wait is not None else self.timeout, self.timeout))
+        debug_log("Mount monitor stopped")
+
+    # ------------------------------------------
+    # Montages
+    # ------------------------------------------
+    def _refresh_partitions(self):
+        """Synchronise les tâches planifiées avec la liste des montages."""
+        partitions = {}
+        for part in self.source.disk_partitions(all=False):
+            if part.fstype.lower() in MOUNT_EXCLUDE_FSTYPES:
+                continue
+            partitions.setdefault(part.mountpoint, part)
+
+        for mountpoint in self._mounts.keys() - partitions.keys():
+            self.scheduler.remove_job(('mount', mountpoint))
+            with self._lock:
+                self._usage.pop(mountpoint, None)
+                self._hung.discard(mountpoint)
+
+        for mountpoint in partitions.keys() - self._mounts.keys():
+            part = partitions[mountpoint]
+            network = part.fstype.lower() in MOUNT_NETWORK_FSTYPES or part.fstype.lower().startswith('fuse')
+            interval = MOUNT_NETWORK_INTERVAL if network else MOUNT_INTERVAL
+            self.scheduler.add_job(('mount', mountpoint), interval, partial(self._submit, mountpoint))
+
+        if partitions.keys() != self._mounts.keys():
+            debug_log(f"Mount monitor: {len(partitions)} filesystems")
+        self._mounts = partitions
+
+    def _submit(self, mountpoint):
+        with self._lock:
+            if mountpoint in self._in_flight:
+                return  # Appel précédent toujours en cours (montage bloqué)
+            self._in_flight.add(mountpoint)
+        try:
+            self._executor.submit(self._poll, mountpoint)
+        except RuntimeError:
+            # Pool arrêté (stop() en cours)
+            with self._lock:
+                self._in_flight.discard(mountpoint)
+
+    def _poll(self, mountpoint):
+        """Exécuté sur le pool : statvfs du montage (peut bloquer)."""
+        with self._lock:
+            self._started[mountpoint] = time.monotonic()
+        try:
+            usage = self.source.disk_usage(mountpoint)
+        except Exception as e:
+            debug_log(f"disk_usage({mountpoint}) failed: {e}", "WARNING")
+            usage = None
+        finally:
+            with self._lock:
+                self._in_flight.discard(mountpoint)
+                self._started.pop(mountpoint, None)
+
+        part = self._mounts.get(mountpoint)
+        with self._lock:
+            if mountpoint in self._hung:
+                self._hung.discard(mountpoint)
+                debug_log(f"Mount {mountpoint} responding again")
+            if usage is None or part is None:
+                return
+            self._usage[mountpoint] = {
+                'mountpoint': mountpoint,
+                'device': part.device,
+                'fstype': part.fstype,
+                'total_gb': usage.total / (1024**3),
+                'used_gb': usage.used / (1024**3),
+                'free_gb': usage.free / (1024**3),
+                'percent': usage.percent,
+                'updated': time.time(),
+                'stale': False,
+            }
+
+    def _check_timeouts(self):
+        now = time.monotonic()
+        with self._lock:
+            for mountpoint, started in self._started.items():
+                if now - started > self.timeout and mountpoint not in self._hung:
+                    self._hung.add(mountpoint)
+                    if mountpoint in self._usage:
+                        self._usage[mountpoint]['stale'] = True
+                    debug_log(f"Mount {mountpoint} not responding (>{self.timeout}s)", "WARNING")
+
+    # ------------------------------------------
+    # Lecture
+    # ------------------------------------------
+    def snapshot(self):
+        """
+        Occupation connue de chaque montage, du plus plein au moins plein.
+
+        Lecture en mémoire uniquement : ne bloque jamais.
+        """
+        with self._lock:
+            mounts = [dict(usage) for usage in self._usage.values()]
+            for mountpoint in self._hung - self._usage.keys():
+                part = self._mounts.get(mountpoint)
+                mounts.append({
+                    'mountpoint': mountpoint, 'device': part.device if part else '',
+                    'fstype': part.fstype if part else '', 'total_gb': 0, 'used_gb': 0,
+                    'free_gb': 0, 'percent': 0, 'updated': None, 'stale': True,
+                })
+        mounts.sort(key=lambda mount: mount['percent'], reverse=True)
+        return mounts
+
+    @property
+    def hung(self):
+        with self._lock:
+            return sorted(self._hung)
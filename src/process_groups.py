@@ -0,0 +1,143 @@
+"""
+Regroupement incrémental des processus pour Taskly.
+
+Cumule CPU et RAM par application (nom), arbre de processus (ancêtre le
+plus haut sous init), utilisateur ou cgroup. Les groupes sont tenus à jour
+par deltas à chaque scan : un processus connu ne fait que corriger la somme
+de son groupe, seuls les nouveaux processus sont rattachés (et leur
+utilisateur/cgroup lu une fois), les processus terminés sont retirés.
+"""
+import heapq
+
+GROUP_KEYS = ('name', 'parent', 'user', 'cgroup')
+
+# PID racines : init et kthreadd ne forment pas un groupe à eux seuls
+_ROOT_PIDS = (0, 1, 2)
+
+
+class ProcessGrouper:
+    """
+    Agrégats CPU/RAM par groupe, maintenus par deltas.
+
+    Un membre est identifié par (pid, nom) ; pour l'arbre de processus, le
+    PID parent en fait partie (un processus rattaché à init après la mort de
+    son parent change de groupe).
+    """
+
+    def __init__(self, key='name', source=None):
+        if key not in GROUP_KEYS:
+            raise ValueError(f"Unknown group key: {key}")
+        self.key = key
+        self.source = source    # Utilisateurs et cgroups (process_labels)
+        self._members = {}      # pid -> [identité, groupe, cpu, mémoire]
+        self._groups = {}       # groupe -> [cpu, mémoire, nombre de processus]
+
+    def __len__(self):
+        return len(self._groups)
+
+    def _join(self, group, cpu, memory):
+        totals = self._groups.get(group)
+        if totals is None:
+            self._groups[group] = [cpu, memory, 1]
+        else:
+            totals[0] += cpu
+            totals[1] += memory
+            totals[2] += 1
+
+    def _leave(self, group, cpu, memory):
+        totals = self._groups[group]
+        if totals[2] <= 1:
+            del self._groups[group]    # Groupe vide : aucune dérive d'arrondi ne subsiste
+        else:
+            totals[0] -= cpu
+            totals[1] -= memory
+            totals[2] -= 1
+
+    def _labels(self, rows, new):
+        """Groupe de chaque nouvel indice de ligne."""
+        if self.key == 'name':
+            return {index: rows.names[index] for index in new}
+
+        if self.key == 'parent':
+            parents = dict(zip(rows.pids, zip(rows.ppids, rows.names)))
+            labels = {}
+            for index in new:
+                pid = rows.pids[index]
+                # Remonte jusqu'à l'ancêtre dont le parent est init (ou inconnu)
+                seen = set()
+                while pid not in seen:
+                    seen.add(pid)
+                    ppid = parents[pid][0]
+                    if ppid in _ROOT_PIDS or ppid not in parents:
+                        break
+                    pid = ppid
+                labels[index] = f"{parents[pid][1]} ({pid})"
+            return labels
+
+        pids = [rows.pids[index] for index in new]
+        found = self.source.process_labels(pids, self.key) if self.source is not None else {}
+        return {index: found.get(pid) or "?" for index, pid in zip(new, pids)}
+
+    def update(self, rows):
+        """
+        Applique le scan du tick (ProcessRows).
+
+        Returns:
+            (nombre de processus apparus, nombre de processus disparus)
+        """
+        members = self._members
+        groups = self._groups
+        ppids = rows.ppids
+        parent_tree = self.key == 'parent'
+        new = []
+        for index, (pid, name, cpu, memory) in enumerate(zip(rows.pids, rows.names, rows.cpu, rows.memory)):
+            identity = (name, ppids[index]) if parent_tree else name
+            member = members.get(pid)
+            if member is not None and member[0] == identity:
+                totals = groups[member[1]]
+                totals[0] += cpu - member[2]
+                totals[1] += memory - member[3]
+                member[2] = cpu
+                member[3] = memory
+                continue
+            if member is not None:
+                # PID réutilisé ou processus re-parenté : quitte l'ancien groupe
+                self._leave(member[1], member[2], member[3])
+                del members[pid]
+            new.append(index)
+
+        gone = members.keys() - set(rows.pids)
+        for pid in gone:
+            _, group, cpu, memory = members.pop(pid)
+            self._leave(group, cpu, memory)
+
+        if new:
+            labels = self._labels(rows, new)
+            for index in new:
+                pid, cpu, memory = rows.pids[index], rows.cpu[index], rows.memory[index]
+                identity = (rows.names[index], rows.ppids[index]) if parent_tree else rows.names[index]
+                group = labels[index]
+                members[pid] = [identity, group, cpu, memory]
+                self._join(group, cpu, memory)
+        return len(new), len(gone)
+
+    def top(self, limit, sort_by='cpu'):
+        """
+        Groupes les plus gourmands.
+
+        Returns:
+            Liste de dicts (group, name, count, cpu_percent, memory_percent)
+        """
+        column = 0 if sort_by == 'cpu' else 1
+        best = heapq.nlargest(limit, self._groups.items(), key=lambda item: item[1][column])
+        return [
+            {
+                'group': group,
+                # Libellé court : dernier segment d'un chemin de cgroup
+                'name': (group.rstrip('/').rsplit('/', 1)[-1] or group) if self.key == 'cgroup' else group,
+                'count': totals[2],
+                'cpu_percent': max(totals[0], 0.0),
+                'memory_percent': max(totals[1], 0.0),
+            }
+            for group, totals in best
+        ]
@@ -0,0 +1,217 @@
+"""
+Index en mémoire de la table complète des processus pour Taskly.
+
+Alimenté à chaque scan par la table ProcessRows déjà collectée pour le
+classement : recherche par sous-chaîne (nom, ligne de commande), accès
+direct par PID et tri par colonne sans nouveau parcours de /proc.
+Les structures dérivées ne sont construites qu'à la première requête qui
+en a besoin, puis réutilisées jusqu'au tick suivant.
+"""
+import bisect
+import threading
+from array import array
+from itertools import accumulate
+from process_table import ProcessRows
+from constants import PROCESS_PAGE_SIZE
+
+SORT_COLUMNS = ('name', 'pid', 'cpu', 'memory')
+
+
+def _haystack(values):
+    """
+    Concatène des chaînes en minuscules séparées par '\\0'.
+
+    Returns:
+        (texte, array des débuts de chaque valeur)
+    """
+    text = "\0".join(values)
+    if text.isascii():
+        text = text.lower()
+    else:
+        # Hors ASCII, la mise en minuscules peut changer la longueur d'une valeur
+        values = [value.lower() for value in values]
+        text = "\0".join(values)
+    starts = array('l', accumulate(map(len, values), lambda offset, size: offset + size + 1, initial=0))
+    starts.pop()
+    return text + "\0", starts
+
+
+def _find(haystack, needle):
+    """Indices (croissants) des valeurs contenant `needle` (déjà en minuscules)."""
+    text, starts = haystack
+    hits = []
+    last = len(starts) - 1
+    pos = text.find(needle)
+    while pos != -1:
+        index = bisect.bisect_right(starts, pos) - 1
+        hits.append(index)
+        if index >= last:
+            break
+        # Une seule occurrence par valeur : on reprend à la valeur suivante
+        pos = text.find(needle, starts[index + 1])
+    return hits
+
+
+class ProcessIndex:
+    """
+    Vue indexée de la dernière table des processus.
+
+    Thread-safe : mise à jour par la boucle de collecte, requêtes depuis
+    les événements de l'interface.
+    """
+
+    def __init__(self, source=None):
+        self.source = source        # Lignes de commande (optionnel)
+        self._lock = threading.Lock()
+        self._cmdlines = {}         # pid -> (nom, ligne de commande), conservé entre les ticks
+        self._set_rows(ProcessRows())
+
+    def _set_rows(self, rows):
+        self._rows = rows
+        self._pid_index = None      # pid -> indice de ligne
+        self._names = None          # Texte concaténé des noms
+        self._commands = None       # Texte concaténé des lignes de commande
+        self._orders = {}           # colonne -> ordre croissant des lignes
+        self._last_search = None    # (requête, indices)
+
+    def update(self, rows):
+        """Remplace la table indexée (O(1) : l'index est reconstruit à la demande)."""
+        with self._lock:
+            self._set_rows(rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    # ------------------------------------------
+    # Structures dérivées (verrou tenu)
+    # ------------------------------------------
+    def _pids(self):
+        if self._pid_index is None:
+            self._pid_index = {pid: index for index, pid in enumerate(self._rows.pids)}
+        return self._pid_index
+
+    def _order(self, column):
+        order = self._orders.get(column)
+        if order is None:
+            rows = self._rows
+            if column == 'name':
+                keys = [name.lower() for name in rows.names]
+            elif column == 'pid':
+                keys = rows.pids
+            else:
+                keys = rows.column(column)
+            order = array('l', sorted(range(len(rows)), key=keys.__getitem__))
+            self._orders[column] = order
+        return order
+
+    def _cmdline(self, pid, name):
+        cached = self._cmdlines.get(pid)
+        if cached is not None and cached[0] == name:
+            return cached[1]
+        return None
+
+    def _fetch_cmdlines(self, pids, names):
+        """Complète le cache des lignes de commande pour les PID nouveaux ou réutilisés."""
+        if self.source is None:
+            return
+        cache = self._cmdlines
+        missing = [pid for pid, name in zip(pids, names) if cache.get(pid, (None,))[0] != name]
+        if not missing:
+            return
+        fetched = self.source.process_cmdlines(missing)
+        for pid, name in zip(pids, names):
+            if pid in fetched:
+                self._cmdlines[pid] = (name, fetched[pid])
+
+    def _command_haystack(self):
+        if self._commands is None:
+            rows = self._rows
+            self._fetch_cmdlines(rows.pids, rows.names)
+            cache = self._cmdlines
+            kept = {}       # Le cache oublie les processus disparus
+            commands = []
+            for pid, name in zip(rows.pids, rows.names):
+                cached = cache.get(pid)
+                if cached is not None and cached[0] == name:
+                    kept[pid] = cached
+                    commands.append(cached[1])
+                else:
+                    commands.append('')
+            self._cmdlines = kept
+            self._commands = _haystack(commands)
+        return self._commands
+
+    def _search(self, query):
+        """Indices des lignes dont le nom ou la ligne de commande contient `query` (ou PID exact)."""
+        if self._last_search is not None and self._last_search[0] == query:
+            return self._last_search[1]
+
+        needle = query.lower()
+        if self._names is None:
+            self._names = _haystack(self._rows.names)
+        matches = set(_find(self._names, needle))
+        if self.source is not None:
+            matches.update(_find(self._command_haystack(), needle))
+        if query.isdigit():
+            index = self._pids().get(int(query))
+            if index is not None:
+                matches.add(index)
+
+        self._last_search = (query, matches)
+        return matches
+
+    # ------------------------------------------
+    # Requêtes
+    # ------------------------------------------
+    def lookup(self, pid):
+        """Ligne d'un PID (dict), ou None s'il n'est pas dans la table."""
+        with self._lock:
+            index = self._pids().get(pid)
+            return self._rows.row(index) if index is not None else None
+
+    def search(self, query):
+        """Lignes (dicts) correspondant à `query`, dans l'ordre de la table."""
+        with self._lock:
+            return [self._rows.row(index) for index in sorted(self._search(query))]
+
+    def view(self, query='', sort_by='cpu', descending=True, offset=0, limit=PROCESS_PAGE_SIZE):
+        """
+        Fenêtre visible de la table filtrée et triée.
+
+        Args:
+            query: Sous-chaîne du nom ou de la ligne de commande, ou PID ('' = tout)
+            sort_by: Colonne de SORT_COLUMNS
+            offset, limit: Fenêtre à retourner
+
+        Returns:
+            (nombre total de lignes correspondantes, liste de dicts de la fenêtre,
+            avec 'cmdline' si la source les fournit)
+        """
+        with self._lock:
+            rows = self._rows
+            order = self._order(sort_by if sort_by in SORT_COLUMNS else 'cpu')
+            total = len(order)
+            if query:
+                matches = self._search(query)
+                total = len(matches)
+                if descending:
+                    order = reversed(order)
+                selected = []
+                end = offset + limit
+                for index in order:
+                    if index in matches:
+                        selected.append(index)
+                        if len(selected) >= end:
+                            break
+                window = selected[offset:end]
+            elif descending:
+                window = order[max(total - offset - limit, 0):max(total - offset, 0)][::-1]
+            else:
+                window = order[offset:offset + limit]
+
+            page = [rows.row(index) for index in window]
+            if self.source is not None:
+                self._fetch_cmdlines([row['pid'] for row in page], [row['name'] for row in page])
+                for row in page:
+                    row['cmdline'] = self._cmdline(row['pid'], row['name']) or ''
+            return total, page
@@ -0,0 +1,198 @@
+"""
+Table des processus persistante pour Taskly.
+Réutilise les objets psutil.Process d'un tick à l'autre au lieu de tout reconstruire.
+"""
+import heapq
+from array import array
+import psutil
+from utils import debug_log
+
+
+class ProcessRows:
+    """
+    Table compacte des processus d'un tick : une colonne par attribut.
+
+    Les valeurs numériques sont stockées dans des array, les noms dans une
+    liste ; aucun dict n'est créé par processus, seulement pour les lignes
+    finalement retenues.
+    """
+
+    __slots__ = ('pids', 'names', 'cpu', 'memory', 'ppids')
+
+    def __init__(self):
+        self.pids = array('l')
+        self.names = []
+        self.cpu = array('d')
+        self.memory = array('d')
+        self.ppids = array('l')     # PID parent (0 si inconnu)
+
+    @classmethod
+    def from_columns(cls, pids, names, cpu, memory, ppids=None):
+        """Construit une table à partir de colonnes déjà remplies (sans copie)."""
+        rows = cls()
+        rows.pids = pids
+        rows.names = names
+        rows.cpu = cpu
+        rows.memory = memory
+        rows.ppids = ppids if ppids is not None else array('l', bytes(pids.itemsize * len(pids)))
+        return rows
+
+    def __len__(self):
+        return len(self.pids)
+
+    def frozen(self):
+        """Copie en lecture seule (publiée avec les snapshots) : colonnes figées, noms en tuple."""
+        def freeze(column):
+            view = memoryview(column)
+            return memoryview(view.tobytes()).cast(view.format)
+
+        return ProcessRows.from_columns(freeze(self.pids), tuple(self.names), freeze(self.cpu),
+                                        freeze(self.memory), freeze(self.ppids))
+
+    def append(self, pid, name, cpu_pct, mem_pct, ppid=0):
+        self.pids.append(pid)
+        self.names.append(name)
+        self.cpu.append(cpu_pct)
+        self.memory.append(mem_pct)
+        self.ppids.append(ppid)
+
+    def column(self, sort_by):
+        """Colonne de tri : 'cpu' ou 'memory'."""
+        return self.cpu if sort_by == 'cpu' else self.memory
+
+    def row(self, index):
+        """Ligne au format dict attendu par l'UI."""
+        return {
+            'pid': self.pids[index],
+            'name': self.names[index],
+            'cpu_percent': self.cpu[index],
+            'memory_percent': self.memory[index],
+        }
+
+
+class ProcessCache:
+    """
+    Cache des processus indexé par (pid, create_time).
+
+    À chaque tick, seuls les nouveaux PID sont instanciés et les PID disparus
+    sont retirés ; les objets psutil.Process existants sont réutilisés, ce qui
+    conserve aussi leur état interne pour cpu_percent(). Un PID réattribué à
+    un autre processus (create_time différent) est évincé puis ré-ajouté.
+    """
+
+    def __init__(self):
+        self._entries = {}  # (pid, create_time) -> (psutil.Process, name)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add(self, pid):
+        """Instancie un processus ; retourne sa clé (None s'il a déjà disparu)."""
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                key = (pid, proc.create_time())
+                name = proc.name() or "Unknown"
+            # Premier appel : amorce le calcul CPU (retourne toujours 0.0)
+            proc.cpu_percent(None)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+        self._entries[key] = (proc, name)
+        return key
+
+    def _recheck(self, key, name):
+        """
+        Le nom lu dans le oneshot diffère du cache : exec() du même processus
+        ou PID réattribué. Seul ce cas coûte un nouveau psutil.Process, dont le
+        create_time tranche (psutil mémoïse create_time() dans l'objet en cache).
+
+        Returns:
+            Clé à échantillonner pour ce PID (None s'il a disparu)
+        """
+        pid, create_time = key
+        try:
+            reused = psutil.Process(pid).create_time() != create_time
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            del self._entries[key]
+            return None
+        if not reused:
+            self._entries[key] = (self._entries[key][0], name)
+            return key
+        del self._entries[key]
+        debug_log(f"Process cache: PID {pid} reused", "DEBUG")
+        return self._add(pid)
+
+    def refresh(self):
+        """Synchronise le cache avec la liste courante des PID (sans appel par processus)."""
+        current = set(psutil.pids())
+
+        # Un PID absent d'un scan est évincé : s'il réapparaît, il est ré-instancié
+        dead = [key for key in self._entries if key[0] not in current]
+        for key in dead:
+            del self._entries[key]
+
+        new = current - {pid for pid, _ in self._entries}
+        for pid in new:
+            self._add(pid)
+
+        if dead or new:
+            debug_log(f"Process cache: +{len(new)} / -{len(dead)} ({len(self._entries)} cached)", "DEBUG")
+
+    def sample(self, cpu_count=1, normalize_cpu=True):
+        """
+        Met à jour le cache puis échantillonne CPU/RAM de chaque processus.
+
+        Returns:
+            ProcessRows
+        """
+        self.refresh()
+        rows = ProcessRows()
+        gone = []
+
+        pending = list(self._entries)
+        for key in pending:
+            proc, name = self._entries[key]
+            pid = key[0]
+            try:
+                with proc.oneshot():
+                    # Lu dans le oneshot, donc sans appel système de plus
+                    current = proc.name() or "Unknown"
+                    if current == name:
+                        cpu_pct = proc.cpu_percent(None) or 0.0
+                        mem_pct = proc.memory_percent() or 0.0
+                        ppid = proc.ppid() or 0
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                gone.append(key)
+                continue
+            except psutil.AccessDenied:
+                continue
+
+            if current != name:
+                key = self._recheck(key, current)
+                if key is not None:
+                    pending.append(key)
+                continue
+
+            if normalize_cpu and cpu_pct > 0:
+                cpu_pct = min(cpu_pct / cpu_count, 100)
+
+            rows.append(pid, name, cpu_pct, mem_pct, ppid)
+
+        for key in gone:
+            self._entries.pop(key, None)
+
+        return rows
+
+
+def top_k(rows, limit, sort_by='cpu'):
+    """
+    Sélectionne les `limit` processus les plus gourmands avec un tas borné.
+
+    O(n log k) au lieu du tri complet O(n log n) de toute la table.
+
+    Returns:
+        Liste de dicts (pid, name, cpu_percent, memory_percent)
+    """
+    column = rows.column(sort_by)
+    indices = heapq.nlargest(limit, range(len(rows)), key=column.__getitem__)
+    return [rows.row(i) for i in indices]
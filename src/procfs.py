@@ -0,0 +1,330 @@
+"""
+Collecteurs Linux rapides basés sur /proc pour Taskly.
+Fichiers gardés ouverts et relus par pread dans un buffer réutilisé.
+
+Optionnel : PsutilSource retombe sur psutil hors Linux ou en cas d'erreur.
+"""
+import os
+import sys
+import time
+try:
+    import pwd
+except ImportError:     # Windows : le scanner /proc n'y est jamais créé
+    pwd = None
+from collections import namedtuple
+from utils import debug_log
+from process_table import ProcessRows
+
+
+# Mêmes champs que les namedtuples psutil utilisés par Taskly
+svmem = namedtuple('svmem', ['total', 'available', 'percent', 'used', 'free'])
+snetio = namedtuple('snetio', ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                               'errin', 'errout', 'dropin', 'dropout'])
+
+
+class ProcFile:
+    """Fichier /proc ouvert une seule fois, relu depuis l'offset 0 à chaque tick."""
+
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buf = bytearray(size)
+
+    def read(self):
+        """Relit le fichier dans le buffer et retourne le nombre d'octets lus."""
+        while True:
+            n = os.preadv(self.fd, [self.buf], 0)
+            if n < len(self.buf):
+                return n
+            # Contenu plus grand que le buffer : on l'agrandit une fois pour toutes
+            self.buf = bytearray(len(self.buf) * 2)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ProcfsBackend:
+    """
+    Remplace psutil.cpu_percent / virtual_memory / net_io_counters sous Linux.
+
+    Seuls les champs utilisés par Taskly sont extraits, en suivant les
+    formules de psutil pour que les valeurs restent comparables.
+    """
+
+    _MEMINFO_KEYS = (b'MemTotal:', b'MemFree:', b'MemAvailable:')
+
+    def __init__(self, root='/proc'):
+        self.stat = ProcFile(f"{root}/stat", 8192)
+        self.meminfo = ProcFile(f"{root}/meminfo", 8192)
+        self.net_dev = ProcFile(f"{root}/net/dev", 4096)
+        self._last_cpu = self._read_cpu_times()
+
+    @classmethod
+    def create(cls):
+        """Retourne un backend prêt à l'emploi, ou None si /proc n'est pas exploitable."""
+        if not sys.platform.startswith('linux') or not hasattr(os, 'preadv'):
+            return None
+        try:
+            backend = cls()
+            backend.virtual_memory()
+            backend.net_io_counters()
+            debug_log("Linux /proc fast path enabled")
+            return backend
+        except (OSError, ValueError, IndexError) as e:
+            debug_log(f"Linux /proc fast path unavailable: {e}", "WARNING")
+            return None
+
+    def close(self):
+        for proc_file in (self.stat, self.meminfo, self.net_dev):
+            proc_file.close()
+
+    # ------------------------------------------
+    # CPU
+    # ------------------------------------------
+    def _read_cpu_times(self):
+        """(total, idle) de la ligne agrégée 'cpu' puis de chaque ligne 'cpuN'."""
+        buf = self.stat.buf
+        n = self.stat.read()
+        times = []
+        start = 0
+        while buf.startswith(b'cpu', start):
+            end = buf.find(b'\n', start, n)
+            # "cpuN user nice system idle iowait irq softirq steal guest guest_nice"
+            fields = [int(x) for x in buf[start:end].split()[1:]]
+            guest = sum(fields[8:10])
+            total = sum(fields) - guest
+            idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+            times.append((total, idle))
+            start = end + 1
+        return times
+
+    @staticmethod
+    def _busy_percent(current, last):
+        total_delta = current[0] - last[0]
+        if total_delta <= 0:
+            return 0.0
+        busy_delta = total_delta - (current[1] - last[1])
+        return round(min(max(busy_delta / total_delta * 100, 0.0), 100.0), 1)
+
+    def cpu_percent(self, interval=None, percpu=False):
+        """
+        Équivalent de psutil.cpu_percent(interval=None) : usage depuis l'appel précédent.
+
+        Une seule lecture de /proc/stat fournit le total et chaque cœur.
+        """
+        times = self._read_cpu_times()
+        last = self._last_cpu
+        self._last_cpu = times
+        if len(last) != len(times):
+            last = times  # Cœur ajouté/retiré : on repart de zéro
+
+        if percpu:
+            return [self._busy_percent(c, l) for c, l in zip(times[1:], last[1:])]
+        return self._busy_percent(times[0], last[0])
+
+    # ------------------------------------------
+    # Mémoire
+    # ------------------------------------------
+    def virtual_memory(self):
+        buf = self.meminfo.buf
+        n = self.meminfo.read()
+        values = []
+        for key in self._MEMINFO_KEYS:
+            pos = buf.find(key, 0, n)
+            # Début de ligne uniquement
+            while pos > 0 and buf[pos - 1] != 0x0A:
+                pos = buf.find(key, pos + 1, n)
+            if pos < 0:
+                values.append(0)
+                continue
+            end = buf.find(b'\n', pos, n)
+            values.append(int(buf[pos + len(key):end].split()[0]) * 1024)
+
+        total, free, available = values
+        # Formules de psutil (Linux) ; noyaux sans MemAvailable : repli sur MemFree
+        if not available:
+            available = free
+        used = total - available
+        percent = round((total - available) / total * 100, 1) if total else 0.0
+        return svmem(total, available, percent, used, free)
+
+    # ------------------------------------------
+    # Réseau
+    # ------------------------------------------
+    def net_io_counters(self, pernic=False):
+        """Équivalent de psutil.net_io_counters : total, ou dict {interface: snetio} si pernic."""
+        buf = self.net_dev.buf
+        n = self.net_dev.read()
+        totals = [0] * 8
+        per_nic = {}
+
+        # Les deux premières lignes sont des en-têtes
+        start = buf.find(b'\n', buf.find(b'\n', 0, n) + 1, n) + 1
+        while start < n:
+            end = buf.find(b'\n', start, n)
+            if end < 0:
+                end = n
+            colon = buf.find(b':', start, end)
+            if colon > 0:
+                fields = buf[colon + 1:end].split()
+                counters = (
+                    int(fields[8]), int(fields[0]), int(fields[9]), int(fields[1]),
+                    int(fields[2]), int(fields[10]), int(fields[3]), int(fields[11]),
+                )
+                if pernic:
+                    per_nic[bytes(buf[start:colon]).strip().decode()] = snetio(*counters)
+                else:
+                    for i, value in enumerate(counters):
+                        totals[i] += value
+            start = end + 1
+
+        return per_nic if pernic else snetio(*totals)
+
+
+class ProcScanner:
+    """
+    Scanner groupé de la table des processus via /proc.
+
+    Un seul passage os.scandir('/proc') lit /proc/[pid]/stat et statm pour
+    chaque PID, sans objet psutil.Process ni dict d'attributs. Le CPU% est
+    calculé à partir du delta utime+stime depuis le scan précédent, la RAM%
+    à partir des pages RSS.
+    """
+
+    def __init__(self, root='/proc'):
+        self.root = root
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.mem_total = self._read_mem_total()
+        self._previous = {}     # pid -> (starttime, utime+stime)
+        self._users = {}        # uid -> nom d'utilisateur
+        self._previous_time = None
+
+    @classmethod
+    def create(cls):
+        """Retourne un scanner prêt à l'emploi, ou None hors Linux."""
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            scanner = cls()
+            scanner.scan()
+            debug_log("Linux /proc process scanner enabled")
+            return scanner
+        except (OSError, ValueError, IndexError) as e:
+            debug_log(f"Linux /proc process scanner unavailable: {e}", "WARNING")
+            return None
+
+    def _read_mem_total(self):
+        with open(f"{self.root}/meminfo", 'rb') as f:
+            for line in f:
+                if line.startswith(b'MemTotal:'):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    @staticmethod
+    def _read(path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.read(fd, 4096)
+        finally:
+            os.close(fd)
+
+    def cmdline(self, pid):
+        """Ligne de commande (arguments séparés par des espaces, 4 Ko au plus), '' si illisible."""
+        try:
+            raw = self._read(f"{self.root}/{pid}/cmdline")
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            return ''
+        return raw.rstrip(b'\0').replace(b'\0', b' ').decode('utf-8', 'replace')
+
+    def username(self, pid):
+        """Propriétaire du processus (uid de /proc/[pid]), '' si inaccessible."""
+        try:
+            uid = os.stat(f"{self.root}/{pid}").st_uid
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            return ''
+        name = self._users.get(uid)
+        if name is None:
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)
+            self._users[uid] = name
+        return name
+
+    def cgroup(self, pid):
+        """Chemin du cgroup (hiérarchie unifiée v2 en priorité), '' si illisible."""
+        try:
+            raw = self._read(f"{self.root}/{pid}/cgroup")
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            return ''
+        path = ''
+        for line in raw.decode('utf-8', 'replace').splitlines():
+            parts = line.split(':', 2)
+            if len(parts) < 3:
+                continue
+            if parts[0] == '0' and parts[1] == '':
+                return parts[2]
+            if not path or 'name=systemd' in parts[1]:
+                path = parts[2]
+        return path
+
+    def scan(self, cpu_count=1, normalize_cpu=True):
+        """
+        Parcourt /proc une fois et retourne la table des processus.
+
+        Returns:
+            ProcessRows
+        """
+        now = time.monotonic()
+        elapsed = now - self._previous_time if self._previous_time is not None else 0.0
+        tick_scale = 100.0 / (self.clock_ticks * elapsed) if elapsed > 0 else 0.0
+        mem_scale = self.page_size * 100.0 / self.mem_total if self.mem_total else 0.0
+        if normalize_cpu:
+            tick_scale /= cpu_count
+
+        previous = self._previous
+        current = {}
+        rows = ProcessRows()
+        read = self._read
+        root = self.root
+
+        with os.scandir(root) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.isdigit():
+                    continue
+                try:
+                    stat = read(f"{root}/{name}/stat")
+                    statm = read(f"{root}/{name}/statm")
+                except (FileNotFoundError, ProcessLookupError, PermissionError):
+                    continue  # Processus terminé entre-temps
+
+                # Le nom (comm) peut contenir espaces et parenthèses : on coupe sur la dernière ')'
+                rparen = stat.rfind(b')')
+                fields = stat[rparen + 2:].split()
+                if len(fields) < 20:
+                    continue
+                ppid = int(fields[1])
+                ticks = int(fields[11]) + int(fields[12])   # utime + stime
+                start = int(fields[19])                     # starttime (identité du PID)
+
+                pid = int(name)
+                current[pid] = (start, ticks)
+                last = previous.get(pid)
+                if last is not None and last[0] == start:
+                    cpu_pct = (ticks - last[1]) * tick_scale
+                    if normalize_cpu and cpu_pct > 100:
+                        cpu_pct = 100.0
+                else:
+                    cpu_pct = 0.0  # Nouveau processus : pas encore de delta
+
+                comm = stat[stat.find(b'(') + 1:rparen].decode('utf-8', 'replace') or "Unknown"
+                rss_pages = int(statm.split(None, 2)[1])
+                rows.append(pid, comm, cpu_pct, rss_pages * mem_scale, ppid)
+
+        self._previous = current
+        self._previous_time = now
+        return rows
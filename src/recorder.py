@@ -0,0 +1,313 @@
+"""
+Enregistrement continu des métriques pour Taskly.
+
+Chaque tick est ajouté à un fichier NDJSON (format des snapshots de
+taskly-agent, relisible par ReplaySource), CSV « long » (timestamp,
+metric, value) ou colonnaire compressé (.tkc, voir columnar_format). L'encodage et les écritures disque se font sur un thread
+dédié : le tick ne fait que déposer le snapshot dans une file bornée, sans
+jamais attendre le disque. Les lignes sont écrites par lots, les fichiers
+tournent par taille, par durée ou (.tkc) à l'apparition d'une colonne, et une
+dernière ligne tronquée (arrêt brutal) est ignorée à la relecture.
+"""
+import csv
+import io
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+
+from constants import (
+    EXPORT_DIRECTORY, RECORD_FORMAT, RECORD_MAX_BYTES, RECORD_MAX_SECONDS,
+    RECORD_FLUSH_RECORDS, RECORD_FLUSH_INTERVAL, RECORD_QUEUE_SIZE
+)
+from utils import debug_log, logger, json_default
+
+RECORD_FORMATS = ('ndjson', 'csv', 'tkc')
+CSV_HEADER = ('timestamp', 'metric', 'value')
+
+_STOP = object()
+
+
+def freeze_snapshot(snapshot):
+    """
+    Copie d'un snapshot sûre pour un autre thread.
+
+    Les historiques (vues sur les anneaux du gestionnaire de données, réécrits
+    au tick suivant) sont retirés : chaque ligne porte déjà la valeur du tick.
+    """
+    metrics = snapshot.get('metrics', {})
+    frozen = dict(snapshot)
+    frozen['metrics'] = {key: value for key, value in metrics.items() if not hasattr(value, 'tolist')}
+    return frozen
+
+
+def flatten_metrics(metrics, prefix=''):
+    """
+    Valeurs numériques d'un dict de métriques, à plat.
+
+    Yields:
+        (nom pointé, valeur) ; ex. ('disks.nvme0n1.read_kbps', 12.5)
+    """
+    for key, value in metrics.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, bool):
+            yield name, int(value)
+        elif isinstance(value, (int, float)):
+            yield name, value
+        elif isinstance(value, Mapping):
+            yield from flatten_metrics(value, f"{name}.")
+        elif isinstance(value, (list, tuple)):
+            for index, item in enumerate(value):
+                if isinstance(item, Mapping):
+                    # Points de montage : clé stable plutôt que la position
+                    label = item.get('mountpoint') or item.get('name') or index
+                    yield from flatten_metrics(item, f"{name}.{label}.")
+                elif isinstance(item, (int, float)) and not isinstance(item, bool):
+                    yield f"{name}.{index}", item
+
+
+def _encode_ndjson(snapshot):
+    return json.dumps(snapshot, separators=(',', ':'), default=json_default) + '\n'
+
+
+def _encode_columns(snapshot):
+    return snapshot.get('timestamp', 0.0), dict(flatten_metrics(snapshot.get('metrics', {})))
+
+
+def _encode_csv(snapshot):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    timestamp = f"{snapshot.get('timestamp', 0.0):.3f}"
+    writer.writerows(
+        (timestamp, name, f"{value:.6g}" if isinstance(value, float) else value)
+        for name, value in flatten_metrics(snapshot.get('metrics', {}))
+    )
+    return buffer.getvalue()
+
+
+class MetricsRecorder:
+    """
+    Enregistreur tamponné et rotatif, alimenté une fois par tick.
+
+    `record()` ne bloque jamais : si le thread d'écriture a pris trop de
+    retard (disque saturé), le snapshot est abandonné et compté dans `dropped`.
+    """
+
+    def __init__(self, directory=EXPORT_DIRECTORY, fmt=RECORD_FORMAT, max_bytes=RECORD_MAX_BYTES,
+                 max_seconds=RECORD_MAX_SECONDS, flush_records=RECORD_FLUSH_RECORDS,
+                 flush_interval=RECORD_FLUSH_INTERVAL, queue_size=RECORD_QUEUE_SIZE):
+        if fmt not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format: {fmt}")
+        self.directory = Path(directory)
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self.files = []         # Fichiers écrits, du plus ancien au plus récent
+        self.written = 0        # Snapshots écrits
+        self.dropped = 0        # Snapshots abandonnés (file pleine)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._encode = {'ndjson': _encode_ndjson, 'csv': _encode_csv, 'tkc': _encode_columns}[fmt]
+        self._thread = None
+        self._file = None
+        self._file_bytes = 0
+        self._file_started = 0.0
+
+    @property
+    def recording(self):
+        return self._thread is not None
+
+    @property
+    def current_file(self):
+        return self.files[-1] if self.files else None
+
+    def start(self):
+        """Démarre le thread d'écriture (idempotent)."""
+        if self._thread is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._write_loop, name="taskly-recorder", daemon=True)
+            self._thread.start()
+            debug_log(f"Recording started ({self.fmt}) in {self.directory}")
+
+    def stop(self, timeout=5.0):
+        """Vide la file, écrit le dernier lot et ferme le fichier courant."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        debug_log(f"Recording stopped: {self.written} snapshot(s), {self.dropped} dropped")
+
+    def record(self, snapshot):
+        """Dépose le snapshot du tick pour écriture (sans attente)."""
+        if self._thread is None:
+            return False
+        try:
+            self._queue.put_nowait(freeze_snapshot(snapshot))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    # ------------------------------------------
+    # Thread d'écriture
+    # ------------------------------------------
+    def _open(self, columns=()):
+        name = f"taskly_record_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(self.files)}.{self.fmt}"
+        path = self.directory / name
+        self._file_bytes = 0
+        self._file_started = time.monotonic()
+        self.files.append(str(path))
+        if self.fmt == 'tkc':
+            from columnar_format import ColumnarWriter
+            self._file = ColumnarWriter(path, columns)
+            return
+        self._file = open(path, 'a', encoding='utf-8', newline='')
+        if self.fmt == 'csv':
+            header = ','.join(CSV_HEADER) + '\n'
+            self._file.write(header)
+            self._file_bytes += len(header)
+
+    def _close(self):
+        # Même durabilité pour tous les formats (le .tkc écrit son dernier bloc au flush)
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def _flush(self, lines):
+        """Écrit un lot de lignes complètes, en changeant de fichier si besoin."""
+        if self._file is not None and (
+            self._file_bytes >= self.max_bytes
+            or time.monotonic() - self._file_started >= self.max_seconds
+        ):
+            self._close()
+        if self.fmt == 'tkc':
+            self._flush_columns(lines)
+            return
+        if self._file is None:
+            self._open()
+        chunk = ''.join(lines)
+        self._file.write(chunk)
+        self._file.flush()
+        self._file_bytes += len(chunk)
+
+    def _flush_columns(self, lines):
+        """
+        Ajoute un lot au fichier colonnaire.
+
+        Le schéma d'un .tkc est figé à l'ouverture : une clé inconnue (disque,
+        interface ou montage apparu en cours de route) fait changer de fichier,
+        avec les colonnes précédentes suivies des nouvelles.
+        """
+        for timestamp, values in lines:
+            columns = self._file.columns if self._file is not None else ()
+            new = [name for name in values if name not in columns]
+            if new:
+                if self._file is not None:
+                    debug_log(f"Recorder: {len(new)} new column(s) ({', '.join(new[:3])}...), new file")
+                    self._close()
+                self._open(columns + tuple(new))
+            # Les lignes rejoignent le bloc en cours, compressé tous les COLUMNAR_CHUNK_ROWS
+            self._file.append(timestamp, values)
+        self._file_bytes = self._file.bytes_written
+
+    def _write_loop(self):
+        lines = []
+        deadline = time.monotonic() + self.flush_interval
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                running = False
+            elif item is not None:
+                try:
+                    lines.append(self._encode(item))
+                    self.written += 1
+                except (TypeError, ValueError) as e:
+                    logger.warning("Recorder: snapshot skipped (%s)", e)
+
+            if lines and (not running or len(lines) >= self.flush_records or time.monotonic() >= deadline):
+                try:
+                    self._flush(lines)
+                except OSError as e:
+                    logger.error("Recorder: write failed (%s)", e)
+                lines = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        try:
+            self._close()
+        except OSError as e:
+            logger.error("Recorder: close failed (%s)", e)
+
+
+# ==========================================
+# RELECTURE
+# ==========================================
+def _complete_lines(f):
+    """Lignes terminées par '\\n' : une ligne coupée en cours d'écriture n'est jamais lue."""
+    for line in f:
+        if line.endswith('\n'):
+            yield line
+
+
+def read_ndjson(path):
+    """
+    Snapshots d'un enregistrement NDJSON, dans l'ordre.
+
+    Les lignes illisibles (dernière ligne tronquée par un arrêt brutal) sont ignorées.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in _complete_lines(f):
+            try:
+                snapshot = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(snapshot, dict):
+                yield snapshot
+
+
+def read_long_csv(path):
+    """
+    Lignes (timestamp, metric, value) d'un enregistrement CSV long.
+
+    Les lignes incomplètes ou non numériques (en-tête) sont ignorées.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        for row in csv.reader(_complete_lines(f)):
+            if len(row) != 3:
+                continue
+            try:
+                yield float(row[0]), row[1], float(row[2])
+            except ValueError:
+                continue
+
+
+def _read_columnar(path):
+    from columnar_format import ColumnarReader
+    with ColumnarReader(path) as reader:
+        yield from reader.rows()
+
+
+def read_recording(path):
+    """
+    Relit un enregistrement selon son extension.
+
+    Yields:
+        snapshots (NDJSON), (timestamp, metric, value) (CSV long) ou
+        (timestamp, {métrique: valeur}) (.tkc)
+    """
+    if str(path).endswith('.csv'):
+        return read_long_csv(path)
+    if str(path).endswith('.tkc'):
+        return _read_columnar(path)
+    return read_ndjson(path)
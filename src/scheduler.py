@@ -0,0 +1,160 @@
+"""
+Planificateur à échéances pour Taskly.
+Exécute des tâches périodiques sur une horloge monotone, sans dérive.
+"""
+import time
+from utils import logger
+
+
+class Job:
+    """Tâche périodique et ses statistiques de ponctualité."""
+
+    def __init__(self, name, interval, callback, first_deadline):
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.deadline = first_deadline
+
+        self.runs = 0
+        self.missed = 0
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+        self.total_lateness = 0.0
+        self.total_jitter = 0.0
+        self.last_duration = 0.0
+
+    def _record(self, lateness, duration):
+        if self.runs:
+            self.total_jitter += abs(lateness - self.last_lateness)
+        self.runs += 1
+        self.last_lateness = lateness
+        self.total_lateness += lateness
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+        self.last_duration = duration
+
+    def stats(self):
+        runs = self.runs or 1
+        return {
+            'interval': self.interval,
+            'runs': self.runs,
+            'missed': self.missed,
+            'lateness_avg_ms': self.total_lateness / runs * 1000,
+            'lateness_max_ms': self.max_lateness * 1000,
+            'jitter_ms': self.total_jitter / max(self.runs - 1, 1) * 1000,
+            'last_duration_ms': self.last_duration * 1000,
+        }
+
+
+class Scheduler:
+    """
+    Planificateur périodique à échéances absolues.
+
+    L'échéance suivante est calculée à partir de l'échéance précédente et non
+    de l'heure de fin : la durée de la tâche ne décale pas la période. Si une
+    ou plusieurs échéances sont manquées, la tâche n'est exécutée qu'une fois
+    puis réalignée sur sa grille (pas de rafale de rattrapage) et les
+    échéances sautées sont comptabilisées.
+    """
+
+    def __init__(self, clock=time.monotonic, slack=0.05):
+        self.clock = clock
+        self.slack = slack  # Avance tolérée (s) pour considérer une tâche due
+        self.jobs = {}
+
+    def add_job(self, name, interval, callback, start=None):
+        """
+        Déclare une tâche périodique.
+
+        Args:
+            name: Identifiant de la tâche
+            interval: Période en secondes
+            callback: Fonction appelée sans argument
+            start: Première échéance (maintenant par défaut)
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        first = self.clock() if start is None else start
+        job = Job(name, interval, callback, first)
+        self.jobs[name] = job
+        return job
+
+    def remove_job(self, name):
+        self.jobs.pop(name, None)
+
+    def set_interval(self, name, interval):
+        """Change la période d'une tâche à partir de sa prochaine échéance."""
+        job = self.jobs[name]
+        job.deadline = job.deadline - job.interval + interval if job.runs else job.deadline
+        job.interval = interval
+
+    def next_deadline(self):
+        """Échéance la plus proche parmi toutes les tâches (None si aucune)."""
+        if not self.jobs:
+            return None
+        return min(job.deadline for job in self.jobs.values())
+
+    def time_until_next(self, now=None):
+        deadline = self.next_deadline()
+        if deadline is None:
+            return None
+        now = self.clock() if now is None else now
+        return max(0.0, deadline - now)
+
+    def is_due(self, name, now=None):
+        now = self.clock() if now is None else now
+        return now + self.slack >= self.jobs[name].deadline
+
+    def _advance(self, job, now):
+        next_deadline = job.deadline + job.interval
+        if next_deadline <= now:
+            # Échéances manquées : on se réaligne sur la grille sans rafale
+            skipped = int((now - job.deadline) // job.interval)
+            job.missed += skipped
+            next_deadline = job.deadline + (skipped + 1) * job.interval
+            logger.warning(
+                f"Scheduler: job '{job.name}' missed {skipped} deadline(s) "
+                f"({(now - job.deadline) * 1000:.0f} ms late)"
+            )
+        job.deadline = next_deadline
+
+    def run_pending(self, now=None):
+        """
+        Exécute les tâches dues, par ordre d'échéance.
+
+        L'échéance est avancée même si la tâche lève une exception, pour
+        qu'une erreur répétée ne se transforme pas en boucle active.
+
+        Returns:
+            Liste des noms de tâches exécutées
+        """
+        now = self.clock() if now is None else now
+        due = [job for job in self.jobs.values() if now + self.slack >= job.deadline]
+        due.sort(key=lambda job: job.deadline)
+
+        executed = []
+        for job in due:
+            started = self.clock()
+            lateness = max(0.0, started - job.deadline)
+            try:
+                job.callback()
+            finally:
+                finished = self.clock()
+                job._record(lateness, finished - started)
+                self._advance(job, finished)
+            executed.append(job.name)
+        return executed
+
+    def wait(self, stop_event=None):
+        """Attend la prochaine échéance (interrompue si stop_event est levé)."""
+        timeout = self.time_until_next()
+        if timeout is None or timeout <= 0:
+            return
+        if stop_event is not None:
+            stop_event.wait(timeout)
+        else:
+            time.sleep(timeout)
+
+    def get_stats(self):
+        """Statistiques de ponctualité par tâche."""
+        return {name: job.stats() for name, job in self.jobs.items()}
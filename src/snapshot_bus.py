@@ -0,0 +1,331 @@
+"""
+Bus de snapshots pour Taskly : un producteur, plusieurs abonnés.
+
+La boucle de collecte publie un snapshot immuable et versionné par tick ;
+interface, alertes, enregistrement, agent ou exposition HTTP s'y abonnent
+au lieu de rappeler get_metrics() (qui échantillonne à nouveau et fait
+avancer l'historique et les compteurs de débit).
+
+Modes d'abonnement :
+    sync    -> appelé dans le thread du producteur (traitements très courts)
+    thread  -> thread dédié à l'abonné
+    async   -> coroutine (ou fonction) exécutée sur une boucle asyncio
+Politiques (thread/async) :
+    latest  -> seul le dernier snapshot en attente est conservé
+    queue   -> file bornée ; pleine, le plus ancien snapshot est abandonné
+Un abonné lent ne retarde jamais la publication : il perd des snapshots.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from constants import SNAPSHOT_QUEUE_SIZE
+from utils import debug_log, logger
+
+SUBSCRIBER_MODES = ('sync', 'thread', 'async')
+SUBSCRIBER_POLICIES = ('latest', 'queue')
+
+
+def _freeze(value):
+    """
+    Copie profonde en lecture seule d'une valeur de métriques.
+
+    Les historiques deviennent des memoryview figées (leurs anneaux sont
+    réécrits au tick suivant), les dicts des vues MappingProxyType sur une
+    copie, les listes des tuples.
+    """
+    if isinstance(value, (str, bytes, int, float, type(None))):
+        return value
+    if hasattr(value, 'tolist'):
+        view = memoryview(value)
+        return memoryview(view.tobytes()).cast(view.format)
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Inverse de _freeze pour la sérialisation : dicts et listes modifiables."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class Snapshot(Mapping):
+    """
+    Métriques d'un tick, immuables et versionnées.
+
+    Se lit comme le dict historique des snapshots de l'agent
+    (`snapshot['metrics']`, `snapshot['timestamp']`...). Le contenu est figé
+    en profondeur (voir _freeze) : un abonné peut le conserver ou le lire
+    depuis n'importe quel thread.
+
+    `processes` (table complète du dernier scan, ProcessRows en lecture seule)
+    et `series` (séries d'affichage du dashboard) sont des attributs
+    seulement : ils ne font pas partie du format sérialisé.
+    """
+
+    __slots__ = ('version', 'timestamp', 'metrics', 'top_processes', 'top_groups', 'processes', 'series')
+    _KEYS = ('version', 'timestamp', 'metrics', 'top_processes', 'top_groups')
+
+    def __init__(self, version, timestamp, metrics, top_processes=None, top_groups=None,
+                 processes=None, series=None):
+        set_attr = object.__setattr__
+        set_attr(self, 'version', version)
+        set_attr(self, 'timestamp', timestamp)
+        set_attr(self, 'metrics', _freeze(metrics))
+        set_attr(self, 'top_processes', _freeze(top_processes or {}))
+        set_attr(self, 'top_groups', _freeze(top_groups or {}))
+        set_attr(self, 'processes', processes)
+        set_attr(self, 'series', _freeze(series or {}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return f"Snapshot(version={self.version}, timestamp={self.timestamp:.3f})"
+
+    def to_dict(self):
+        """Copie sérialisable (format des snapshots de taskly-agent)."""
+        return {
+            'timestamp': self.timestamp,
+            'metrics': _thaw(self.metrics),
+            'top_processes': _thaw(self.top_processes),
+            'top_groups': _thaw(self.top_groups),
+            'version': self.version,
+        }
+
+
+class Subscription:
+    """Abonnement au bus ; `dropped` compte les snapshots perdus par cet abonné."""
+
+    def __init__(self, bus, callback, name, policy, min_interval, maxsize):
+        if policy not in SUBSCRIBER_POLICIES:
+            raise ValueError(f"Unknown subscriber policy: {policy}")
+        self.bus = bus
+        self.callback = callback
+        self.name = name
+        self.policy = policy
+        self.min_interval = min_interval
+        self.delivered = 0
+        self.dropped = 0
+        self.active = True
+        self._last_delivery = float('-inf')
+        self._pending = deque(maxlen=1 if policy == 'latest' else maxsize)
+
+    def _enqueue(self, snapshot):
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append(snapshot)
+
+    def _invoke(self, snapshot):
+        try:
+            self.callback(snapshot)
+            self.delivered += 1
+        except Exception as e:
+            logger.error("Snapshot subscriber '%s' failed: %s", self.name, e, exc_info=True)
+
+    def deliver(self, snapshot):
+        """Appelé par le producteur : synchrone et immédiat."""
+        now = time.monotonic()
+        if now - self._last_delivery < self.min_interval:
+            self.dropped += 1
+            return
+        self._last_delivery = now
+        self._invoke(snapshot)
+
+    def unsubscribe(self):
+        self.bus.unsubscribe(self)
+
+    def close(self):
+        self.active = False
+
+
+class ThreadSubscription(Subscription):
+    """Abonné servi par son propre thread : le producteur ne fait que déposer le snapshot."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"taskly-bus-{self.name}", daemon=True)
+        self._thread.start()
+
+    def deliver(self, snapshot):
+        with self._cond:
+            self._enqueue(snapshot)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or not self.active)
+                if not self.active:
+                    return
+            wait = self._last_delivery + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)    # Cadence propre : la politique décide de ce qui s'accumule
+            with self._cond:
+                if not self._pending:
+                    continue
+                snapshot = self._pending.popleft()
+            self._last_delivery = time.monotonic()
+            self._invoke(snapshot)
+
+    def close(self):
+        with self._cond:
+            self.active = False
+            self._cond.notify()
+
+
+class AsyncSubscription(Subscription):
+    """Abonné exécuté sur une boucle asyncio ; le callback peut être une coroutine."""
+
+    def __init__(self, *args, loop):
+        super().__init__(*args)
+        self.loop = loop
+        self._task = None
+
+    def deliver(self, snapshot):
+        try:
+            self.loop.call_soon_threadsafe(self._push, snapshot)
+        except RuntimeError:
+            self.dropped += 1   # Boucle fermée
+
+    def _push(self, snapshot):
+        self._enqueue(snapshot)
+        if self._task is None or self._task.done():
+            self._task = self.loop.create_task(self._drain())
+
+    async def _drain(self):
+        while self._pending and self.active:
+            wait = self._last_delivery + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                if not self._pending:
+                    break
+            snapshot = self._pending.popleft()
+            self._last_delivery = time.monotonic()
+            try:
+                result = self.callback(snapshot)
+                if asyncio.iscoroutine(result):
+                    await result
+                self.delivered += 1
+            except Exception as e:
+                logger.error("Snapshot subscriber '%s' failed: %s", self.name, e, exc_info=True)
+
+
+class SnapshotBus:
+    """
+    Publication d'un snapshot par tick à tous les abonnés.
+
+    `publish()` fige les métriques une seule fois puis les remet à chaque
+    abonné selon son mode ; seuls les abonnés `sync` s'exécutent dans le
+    thread du producteur.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = ()
+        self._latest = None
+        self._version = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def latest(self):
+        """Dernier snapshot publié, ou None avant le premier tick."""
+        return self._latest
+
+    def publish(self, metrics, top_processes=None, timestamp=None, top_groups=None,
+                processes=None, series=None):
+        """
+        Fige et diffuse les métriques d'un tick.
+
+        Args:
+            top_processes: Classements des processus {'cpu': [...], 'memory': [...]}
+            top_groups: Classements des groupes {clé de regroupement: {'cpu': [...], 'memory': [...]}}
+            processes: Table complète du dernier scan, déjà figée (ProcessRows.frozen())
+            series: Séries d'affichage {nom: valeurs}
+
+        Returns:
+            Le Snapshot publié
+        """
+        with self._lock:
+            self._version += 1
+            snapshot = Snapshot(self._version, time.time() if timestamp is None else timestamp,
+                                metrics, top_processes, top_groups, processes, series)
+            self._latest = snapshot
+            subscriptions = self._subscriptions
+        for subscription in subscriptions:
+            subscription.deliver(snapshot)
+        return snapshot
+
+    def subscribe(self, callback, mode='sync', policy='latest', min_interval=0.0,
+                  maxsize=SNAPSHOT_QUEUE_SIZE, name=None, loop=None):
+        """
+        Abonne `callback(snapshot)` au bus.
+
+        Args:
+            mode: 'sync', 'thread' ou 'async' (avec `loop`, boucle asyncio cible)
+            policy: 'latest' ou 'queue' (ignoré en mode sync)
+            min_interval: Secondes minimales entre deux livraisons à cet abonné
+            maxsize: Taille de la file pour la politique 'queue'
+
+        Returns:
+            Subscription (à passer à unsubscribe())
+        """
+        if mode not in SUBSCRIBER_MODES:
+            raise ValueError(f"Unknown subscriber mode: {mode}")
+        name = name or getattr(callback, '__qualname__', 'subscriber')
+        args = (self, callback, name, policy, min_interval, maxsize)
+        if mode == 'thread':
+            subscription = ThreadSubscription(*args)
+        elif mode == 'async':
+            if loop is None:
+                raise ValueError("An asyncio loop is required for async subscribers")
+            subscription = AsyncSubscription(*args, loop=loop)
+        else:
+            subscription = Subscription(*args)
+        with self._lock:
+            # Tuple remplacé (copy-on-write) : publish() itère sans verrou
+            self._subscriptions = self._subscriptions + (subscription,)
+        debug_log(f"Snapshot bus: '{name}' subscribed ({mode}, {policy})")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+        subscription.close()
+
+    def close(self):
+        """Termine tous les abonnés (threads compris)."""
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, ()
+        for subscription in subscriptions:
+            subscription.close()
+
+    def stats(self):
+        """Livraisons et pertes par abonné."""
+        return {
+            s.name: {'delivered': s.delivered, 'dropped': s.dropped}
+            for s in self._subscriptions
+        }
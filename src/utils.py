@@ -2,6 +2,11 @@
 Fonctions utilitaires pour Taskly.
 """
 import logging
+import os
+import shutil
+import socket
+import tempfile
+from collections.abc import Mapping
 from datetime import datetime
 from config import DEBUG, VERBOSE
 
@@ -57,12 +62,16 @@ def debug_log(message, level="INFO"):
     logger.log(level_map.get(level, logging.INFO), message)
 
 
-def verbose_log(message):
+def verbose_log(message, *args):
     """
     Fonction de compatibilité.
     DEPRECATED: Utiliser logger.debug()
+
+    Les arguments sont formatés à la manière de logging (`%s`) et seulement
+    si le niveau DEBUG est actif : passer les valeurs en arguments plutôt
+    qu'une f-string, évaluée même quand les logs sont coupés.
     """
-    logger.debug(message)
+    logger.debug(message, *args)
 
 
 # ==========================================
@@ -97,3 +106,75 @@ def format_uptime(seconds):
         return f"{int(hours)}h {int(minutes)}m"
     else:
         return f"{int(minutes)}m"
+
+
+def json_default(obj):
+    """
+    Sérialiseur JSON pour les types non natifs (json.dump(..., default=json_default)).
+    Convertit les vues d'historique (memoryview/array) en listes.
+    """
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if isinstance(obj, Mapping):
+        return dict(obj)    # Snapshot et vues en lecture seule du bus
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# ==========================================
+# SOCKETS UNIX
+# ==========================================
+def prepare_socket_path(path, owner="taskly"):
+    """
+    Crée le dossier du socket (0700) et supprime un socket orphelin.
+
+    Un socket sur lequel un processus écoute encore n'est jamais supprimé :
+    la connexion de test réussit et l'on lève RuntimeError.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    if not path.exists():
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        debug_log(f"Removing stale {owner} socket: {path}", "WARNING")
+        path.unlink()
+    else:
+        raise RuntimeError(f"Another {owner} is already listening on {path}")
+    finally:
+        probe.close()
+
+
+def bind_private_socket(path, bind, owner="taskly"):
+    """
+    Lie un socket Unix accessible uniquement par l'utilisateur courant.
+
+    Le bind a lieu dans un dossier temporaire 0700 voisin (l'umask du processus,
+    partagé par tous les threads, n'est pas touché) ; le socket, passé en 0600,
+    est ensuite lié à son chemin définitif, qui ne doit pas exister.
+
+    Args:
+        bind: Appelé avec le chemin temporaire, retourne le serveur lié
+
+    Returns:
+        Le serveur retourné par `bind`
+    """
+    staging = tempfile.mkdtemp(prefix='.tk', dir=path.parent)
+    staged = os.path.join(staging, 's')
+    try:
+        server = bind(staged)
+        try:
+            os.chmod(staged, 0o600)
+            os.link(staged, path)
+        except FileExistsError:
+            server.server_close()
+            raise RuntimeError(f"Another {owner} is already listening on {path}") from None
+        except OSError:
+            server.server_close()
+            raise
+        return server
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,7 @@
+"""
+Configuration pytest : les modules de Taskly sont à plat dans src/.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,71 @@
+"""
+Tests de l'agent headless (collecte partagée, protocole du socket Unix).
+"""
+import json
+import socket
+import stat
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from agent import AgentClient, CollectorAgent
+from metric_sources import create_source
+
+
+@pytest.fixture
+def agent():
+    # Chemin court : les sockets Unix sont limités à ~107 octets
+    with tempfile.TemporaryDirectory(prefix='tk') as directory:
+        agent = CollectorAgent(Path(directory) / 'agent.sock', interval=0.05, process_limit=3,
+                               source=create_source('synthetic', seed=1))
+        agent.start()
+        try:
+            yield agent
+        finally:
+            agent.stop()
+
+
+def _command(path, command):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5.0)
+        sock.connect(str(path))
+        sock.sendall(command + b'\n')
+        with sock.makefile('rb') as stream:
+            return json.loads(stream.readline())
+
+
+def test_snapshot_and_ping(agent):
+    snapshot = AgentClient(agent.socket_path).get_snapshot()
+
+    assert snapshot['version'] >= 1
+    assert 'cpu_percent' in snapshot['metrics']
+    assert stat.S_IMODE(agent.socket_path.stat().st_mode) == 0o600
+
+    pong = _command(agent.socket_path, b'ping')
+    assert pong['ok'] is True and pong['version'] >= snapshot['version']
+    assert _command(agent.socket_path, b'bogus') == {'error': 'unknown command'}
+
+
+def test_subscribers_share_the_same_ticks(agent):
+    streams = [AgentClient(agent.socket_path).iter_snapshots() for _ in range(2)]
+    first = [next(stream) for stream in streams]
+    versions = [[snapshot['version']] + [next(stream)['version'] for _ in range(3)]
+                for snapshot, stream in zip(first, streams)]
+    for stream in streams:
+        stream.close()
+
+    for seen in versions:
+        assert seen == sorted(set(seen))    # Un snapshot par tick, sans doublon
+    # Une seule collecte par tick, quel que soit le nombre de clients
+    assert agent.data_manager.bus.latest().version >= max(max(seen) for seen in versions)
+
+
+def test_second_agent_refuses_a_live_socket(agent):
+    other = CollectorAgent(agent.socket_path, source=create_source('synthetic', seed=1))
+    try:
+        with pytest.raises(RuntimeError):
+            other.start()
+    finally:
+        other.data_manager.close()
+    assert AgentClient(agent.socket_path).get_snapshot()['version'] >= 1
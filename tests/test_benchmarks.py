@@ -0,0 +1,35 @@
+"""
+Tests de la suite de benchmarks (exécutée dans un sous-processus : elle
+remplace psutil par le substitut synthétique).
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'benchmarks' / 'run_benchmarks.py'
+
+
+def _run(*args):
+    return subprocess.run([sys.executable, str(SCRIPT), '--sizes', '50', '--ticks', '2', *args],
+                          capture_output=True, text=True, timeout=120)
+
+
+def test_results_json_and_regression_exit_code(tmp_path):
+    output = tmp_path / 'results.json'
+    run = _run('--output', str(output))
+    assert run.returncode == 0, run.stderr
+
+    results = json.loads(output.read_text())
+    cases = results['results']['50']
+    assert {'get_metrics', 'update_tick', 'get_top_processes.cpu', 'collector.cpu'} <= set(cases)
+    assert all(stats['min_ms'] <= stats['median_ms'] <= stats['max_ms'] for stats in cases.values())
+
+    # Référence irréalistement rapide : chaque cas est une régression
+    for stats in cases.values():
+        stats['median_ms'] /= 1000
+    output.write_text(json.dumps(results))
+    run = _run('--compare', str(output))
+    assert run.returncode == 1
+    assert 'REGRESSION update_tick @ 50' in run.stderr
+    assert json.loads(run.stdout)['regressions']
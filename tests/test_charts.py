@@ -0,0 +1,51 @@
+"""
+Tests des mises à jour incrémentales des graphiques (fenêtre glissante, quantification).
+"""
+from components.charts import CPUHeatmap, CPULineChart, NetworkLineChart, quantize, window_shift
+
+
+def test_quantize_and_window_shift():
+    assert quantize(None) == 0.0
+    assert quantize(250.0) == 100.0
+    assert quantize(10.0, scale=0.5) == 5.0
+    assert quantize(40.2) == quantize(40.1)     # Écart invisible à l'écran
+
+    assert window_shift([1, 2, 3, 4], [1, 2, 3, 4], 2) == 0
+    assert window_shift([1, 2, 3, 4], [3, 4, 5, 6], 2) == 2
+    assert window_shift([1, 2, 3, 4], [9, 9, 9, 9], 2) is None
+
+
+def test_sliding_chart_sends_only_new_points():
+    chart = CPULineChart()
+    n = chart.max_points
+    history = [float(i % 50) for i in range(n)]
+    assert chart.update_chart(history) == n - 1     # Premier remplissage (le premier point vaut déjà 0)
+    assert chart.update_chart(history) == 0        # Rien de visible n'a changé
+
+    points = chart.chart.data_series[0].data_points
+    kept = points[1]
+    assert chart.update_chart(history[1:] + [42.0]) == 1
+    assert points[0] is kept and points[-1].y == 42.0     # Points existants conservés
+    assert (chart.chart.min_x, chart.chart.max_x) == (1, n + 1)
+
+    # Historique sans rapport (changement de palier) : seules les ordonnées modifiées
+    replaced = [values.y for values in points]
+    replaced[3] = 77.0
+    assert chart.update_chart(replaced) == 1
+    assert points[3].y == 77.0
+
+
+def test_network_chart_shifts_both_series_together():
+    chart = NetworkLineChart()
+    n = chart.max_points
+    down, up = [0.0] * n, [0.0] * n
+    chart.update_chart(down, up)
+    assert chart.update_chart(down[1:] + [500.0], up[1:] + [100.0]) == 2
+
+
+def test_heatmap_touches_only_cells_that_change_level():
+    heatmap = CPUHeatmap(cores=2, max_points=4)
+    assert heatmap.update_heatmap([[0, 0, 0, 90], [0, 0, 0, 0]]) == 1
+    assert heatmap.update_heatmap([[0, 0, 0, 91], [0, 0, 0, 1]]) == 0      # Même niveau de couleur
+    assert heatmap.update_heatmap([[50], [0]]) == 1     # Série courte : alignée à droite
+    assert heatmap.cells[0][3].bgcolor == CPUHeatmap.LEVELS[3]
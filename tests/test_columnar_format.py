@@ -0,0 +1,51 @@
+"""
+Tests du format colonnaire .tkc (aller-retour, bloc final tronqué).
+"""
+import math
+
+import pytest
+
+from columnar_format import CODECS, ColumnarReader, ColumnarWriter
+
+
+def _write(path, rows, codec='zlib', chunk_rows=4):
+    with ColumnarWriter(path, ('cpu', 'ram'), codec=codec, chunk_rows=chunk_rows) as writer:
+        for timestamp, values in rows:
+            writer.append(timestamp, values)
+    return path
+
+
+ROWS = [(1000.0 + i * 0.5, {'cpu': float(i), 'ram': 100.0 - i}) for i in range(10)]
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_round_trip(tmp_path, codec):
+    path = _write(tmp_path / 'run.tkc', ROWS + [(1005.0, {'cpu': 1.5})], codec=codec)
+
+    with ColumnarReader(path) as reader:
+        assert reader.columns == ('cpu', 'ram')
+        assert len(reader) == 11 and len(reader.chunks) == 3
+        assert reader.first_timestamp == 1000.0 and reader.last_timestamp == 1005.0
+        rows = list(reader.rows())
+        assert rows[:10] == ROWS
+        assert rows[10] == (1005.0, {'cpu': 1.5})    # NaN omis
+        assert math.isnan(reader.column('ram')[10])
+
+        # Plage à cheval sur deux blocs
+        assert list(reader.column('cpu', 1001.5, 1002.5)) == [3.0, 4.0, 5.0]
+        assert list(reader.timestamps(1001.5, 1002.5)) == [1001.5, 1002.0, 1002.5]
+
+
+def test_truncated_trailing_chunk_is_ignored(tmp_path):
+    path = _write(tmp_path / 'run.tkc', ROWS)
+    size = path.stat().st_size
+    with ColumnarReader(path) as reader:
+        last_chunk_start = reader.chunks[-1].offsets[0][0]
+
+    # Arrêt brutal au milieu des colonnes du dernier bloc
+    with open(path, 'r+b') as f:
+        f.truncate(last_chunk_start + (size - last_chunk_start) // 2)
+
+    with ColumnarReader(path) as reader:
+        assert len(reader) == 8
+        assert list(reader.rows()) == ROWS[:8]
@@ -0,0 +1,70 @@
+"""
+Tests de l'export en arrière-plan du dernier snapshot publié.
+"""
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+from data_exporter import DataExporter
+from data_manager import SystemDataManager
+from metric_sources import create_source
+
+
+@pytest.fixture
+def manager():
+    manager = SystemDataManager(create_source('synthetic', seed=3))
+    manager.get_metrics()
+    yield manager
+    manager.close()
+
+
+def test_export_async_writes_the_published_tick_without_collecting(manager, tmp_path):
+    exporter = DataExporter(tmp_path, data_manager=manager)
+    snapshot = manager.latest_snapshot()
+    version, net_state = manager.bus.version, (manager.last_net_io, manager.last_time)
+    done = []
+
+    files = exporter.export_async(snapshot, on_done=lambda *result: done.append(result)).result(5.0)
+    exporter.close()
+
+    # Aucune collecte : ni nouveau tick, ni état de débit réseau modifié
+    assert manager.bus.version == version
+    assert (manager.last_net_io, manager.last_time) == net_state
+    assert done == [(files, None)]
+
+    stamp = datetime.fromtimestamp(snapshot.timestamp).strftime('%Y%m%d_%H%M%S')
+    assert sorted(path.rsplit('.', 1)[1] for path in files) == ['csv', 'json']
+    assert all(stamp in path for path in files)
+    with open(files[0], encoding='utf-8') as f:
+        exported = json.load(f)
+    assert exported['metrics']['cpu']['percent'] == snapshot.metrics['cpu_percent']
+
+
+def test_export_async_absorbs_clicks_while_running(manager, tmp_path):
+    exporter = DataExporter(tmp_path)
+    release = threading.Event()
+    real_export = exporter.export_to_json
+
+    def slow_export(*args, **kwargs):
+        release.wait(5.0)
+        return real_export(*args, **kwargs)
+
+    exporter.export_to_json = slow_export
+    first = exporter.export_async(manager.latest_snapshot())
+    assert exporter.export_async(manager.latest_snapshot()) is first
+    release.set()
+    first.result(5.0)
+    assert exporter.export_async(manager.latest_snapshot()) is not first
+    exporter.close()
+
+
+def test_export_async_reports_missing_snapshot(tmp_path):
+    exporter = DataExporter(tmp_path)
+    done = []
+    future = exporter.export_async(None, on_done=lambda *result: done.append(result))
+    with pytest.raises(RuntimeError):
+        future.result(5.0)
+    exporter.close()
+    assert done[0][0] is None and isinstance(done[0][1], RuntimeError)
@@ -0,0 +1,105 @@
+"""
+Tests du gestionnaire de données sur la source synthétique.
+"""
+import threading
+import time
+
+import pytest
+
+import data_manager
+from data_manager import SystemDataManager
+from metric_sources import SyntheticSource, create_source
+
+
+@pytest.fixture
+def manager():
+    manager = SystemDataManager(create_source('synthetic', seed=3))
+    yield manager
+    manager.close()
+
+
+class HungBatterySource(SyntheticSource):
+    """Batterie qui ne répond qu'une fois `release` levé (capteur bloqué)."""
+
+    def __init__(self):
+        super().__init__(seed=3)
+        self.release = threading.Event()
+        self.calls = 0
+
+    def sensors_battery(self):
+        self.calls += 1
+        self.release.wait(5.0)
+        return None
+
+
+def test_hung_collector_is_served_stale_without_blocking(monkeypatch):
+    monkeypatch.setattr(data_manager, 'COLLECTOR_TIMEOUT', 0.1)
+    source = HungBatterySource()
+    manager = SystemDataManager(source)
+    try:
+        started = time.monotonic()
+        metrics = manager.get_metrics()
+        assert time.monotonic() - started < 1.0
+        assert metrics['stale'] == ['battery']
+        assert metrics['cpu_count_logical'] == source.cpu_count()   # Les autres collecteurs ont répondu
+
+        # Toujours en cours : pas relancé, et le tick suivant ne l'attend pas
+        manager.collectors.jobs['battery'].deadline = 0.0
+        started = time.monotonic()
+        assert manager.get_metrics()['stale'] == ['battery']
+        assert time.monotonic() - started < 0.5
+        assert source.calls == 1
+
+        source.release.set()
+        time.sleep(0.05)
+        assert manager.get_metrics()['stale'] == []
+    finally:
+        source.release.set()
+        manager.close()
+
+
+def test_snapshot_publishes_both_rankings_whatever_the_sort(manager):
+    top = manager.get_top_processes(limit=5, sort_by='memory')
+    manager.get_metrics()
+    snapshot = manager.latest_snapshot()
+
+    assert set(snapshot.top_processes) == {'cpu', 'memory'}
+    assert [proc['pid'] for proc in snapshot.top_processes['memory']] == [proc['pid'] for proc in top]
+    cpu = [proc['cpu_percent'] for proc in snapshot.top_processes['cpu']]
+    assert cpu == sorted(cpu, reverse=True) and len(cpu) == 5
+    assert snapshot.top_groups == {}
+
+
+def test_groups_are_published_under_their_own_key(manager):
+    groups = manager.get_top_groups('name', limit=5, sort_by='cpu')
+    manager.get_metrics()
+    snapshot = manager.latest_snapshot()
+
+    assert set(snapshot.top_processes) == {'cpu', 'memory'}
+    assert 'group' not in snapshot.top_processes['cpu'][0]
+    assert [group['group'] for group in snapshot.top_groups['name']['cpu']] == [group['group'] for group in groups]
+    assert set(snapshot.top_groups['name']) == {'cpu', 'memory'}
+
+    # Retour à la liste des processus : plus de groupes publiés
+    manager.get_top_processes(limit=5)
+    manager.get_metrics()
+    assert manager.latest_snapshot().top_groups == {}
+
+
+def test_snapshot_carries_the_frozen_table_and_display_series(manager):
+    manager.publish_series = True
+    manager.get_top_processes(limit=5)
+    manager.get_metrics()
+    snapshot = manager.latest_snapshot()
+
+    processes = snapshot.processes
+    assert len(processes) > 5
+    with pytest.raises(TypeError):
+        processes.cpu[0] = 0.0
+    assert {f"cpu_{tier}" for tier in manager.history.tiers} <= set(snapshot.series)
+    assert 'core_heatmap' in snapshot.series
+    assert 'processes' not in snapshot.to_dict() and 'series' not in snapshot.to_dict()
+
+    # Sans nouveau scan, le snapshot suivant partage la même table figée
+    manager.get_metrics()
+    assert manager.latest_snapshot().processes is processes
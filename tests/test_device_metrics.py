@@ -0,0 +1,51 @@
+"""
+Tests des débits par disque et par interface, et de leur historique à emplacements.
+"""
+from collections import namedtuple
+
+from device_metrics import DISK_FIELDS, NIC_FIELDS, DeviceRates, disk_rates, nic_rates
+from history import DeviceHistory
+
+sdiskio = namedtuple('sdiskio', ['read_count', 'write_count', 'read_bytes', 'write_bytes',
+                                 'read_time', 'write_time', 'busy_time'])
+snetio = namedtuple('snetio', ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                               'errin', 'errout', 'dropin', 'dropout'])
+
+
+def test_disk_and_nic_rates_from_cumulative_counters():
+    rates = DeviceRates(disk_rates, DISK_FIELDS, exclude=('loop',))
+    first = rates.update({'sda': sdiskio(0, 0, 0, 0, 0, 0, 0), 'loop0': sdiskio(0, 0, 0, 0, 0, 0, 0)}, now=10.0)
+    assert first == {'sda': dict.fromkeys(DISK_FIELDS, 0.0)}    # Premier échantillon, loop exclu
+
+    sda = rates.update({'sda': sdiskio(10, 30, 4096, 8192, 60, 140, 500)}, now=12.0)['sda']
+    assert sda['read_kbps'] == 2.0 and sda['write_kbps'] == 4.0
+    assert sda['read_iops'] == 5.0 and sda['write_iops'] == 15.0
+    assert sda['util_percent'] == 25.0     # 500 ms occupés sur 2 s
+    assert sda['await_ms'] == 5.0          # 200 ms d'attente pour 40 E/S
+
+    nics = DeviceRates(nic_rates, NIC_FIELDS)
+    nics.update({'eth0': snetio(1024, 2048, 0, 0, 0, 0, 0, 0)}, now=0.0)
+    # Compteur remis à zéro (interface recréée) : pas de débit négatif
+    eth0 = nics.update({'eth0': snetio(0, 4096, 4, 8, 1, 0, 0, 1)}, now=1.0)['eth0']
+    assert eth0 == {'down_kbps': 2.0, 'up_kbps': 0.0, 'packets_in': 8.0, 'packets_out': 4.0, 'errors': 2.0}
+
+
+def test_device_history_reuses_slots_and_widens_once():
+    history = DeviceHistory(('kbps',), capacity=4, slots=2, grace=1)
+    history.append({'sda': {'kbps': 1.0}, 'sdb': {'kbps': 2.0}}, timestamp=0.0)
+    assert history.width == 2
+
+    # Troisième périphérique : la largeur double, l'historique est conservé
+    history.append({'sda': {'kbps': 3.0}, 'sdb': {'kbps': 4.0}, 'usb': {'kbps': 5.0}}, timestamp=1.0)
+    assert history.width == 4
+    assert history.series('sda', 'kbps', 2).tolist() == [1.0, 3.0]
+    assert history.series('usb', 'kbps', 2).tolist() == [0.0, 5.0]
+
+    # Absent au-delà du délai de grâce : emplacement libéré puis réattribué, remis à zéro
+    history.append({'sda': {'kbps': 6.0}}, timestamp=2.0)
+    history.append({'sda': {'kbps': 7.0}}, timestamp=3.0)
+    assert set(history.devices) == {'sda'}
+    assert history.series('usb', 'kbps') is None
+    history.append({'sda': {'kbps': 8.0}, 'nvme': {'kbps': 9.0}}, timestamp=4.0)
+    assert history.width == 4
+    assert history.series('nvme', 'kbps').tolist() == [0.0, 0.0, 0.0, 9.0]
@@ -0,0 +1,135 @@
+"""
+Tests de l'historique en mémoire (buffer circulaire, paliers, exports).
+"""
+import threading
+
+import pytest
+
+import history as history_module
+from history import CoreHistory, MetricHistory, RollupTier, TieredHistory
+
+
+def test_view_stays_contiguous_after_wraparound():
+    history = MetricHistory(('a',), capacity=4)
+    for i in range(10):
+        history.append({'a': float(i)}, timestamp=float(i))
+
+    assert len(history) == 4
+    view = history.view('a')
+    assert view.contiguous and view.tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert history.view('a', 2).tolist() == [8.0, 9.0]
+    assert history.timestamps().tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert history.latest('a') == 9.0
+
+
+def test_view_of_a_partial_buffer_is_zero_padded():
+    history = MetricHistory(('a',), capacity=4)
+    history.append({'a': 5.0}, timestamp=1.0)
+    history.append({}, timestamp=2.0)
+
+    assert history.view('a').tolist() == [0.0, 0.0, 5.0, 0.0]
+
+
+def test_rollup_flushes_on_bucket_boundary():
+    tier = RollupTier('1m', 60, capacity=10, columns=('cpu',), wall_offset=0.0)
+    for timestamp, value in ((0.0, 10.0), (30.0, 30.0), (59.999, 20.0)):
+        tier.add({'cpu': value}, timestamp)
+    assert len(tier) == 0    # Intervalle en cours : rien d'écrit
+
+    tier.add({'cpu': 99.0}, 60.0)    # Premier point de l'intervalle suivant
+    assert len(tier) == 1
+    assert tier.view('cpu', 'min', 1).tolist() == [10.0]
+    assert tier.view('cpu', 'avg', 1).tolist() == [20.0]
+    assert tier.view('cpu', 'max', 1).tolist() == [30.0]
+    assert tier.timestamps(1).tolist() == [0.0]
+
+    # Intervalle sauté : le suivant repart de zéro
+    tier.add({'cpu': 1.0}, 185.0)
+    assert tier.view('cpu', 'avg', 2).tolist() == [20.0, 99.0]
+    assert tier.timestamps(1).tolist() == [60.0]
+
+
+def test_rollup_buckets_follow_wall_clock():
+    # Horloge monotone décalée de 50 s : les minutes pleines tombent à t = 10, 70...
+    tier = RollupTier('1m', 60, capacity=10, columns=('cpu',), wall_offset=50.0)
+    tier.add({'cpu': 1.0}, 9.0)
+    tier.add({'cpu': 2.0}, 10.0)
+    assert tier.view('cpu', 'max', 1).tolist() == [1.0]
+    assert tier.timestamps(1).tolist() == [-50.0]
+
+
+def test_tiered_history_feeds_every_tier():
+    history = TieredHistory(('cpu',), raw_capacity=5, tiers=(('10s', 10, 4), ('1m', 60, 4)))
+    history.wall_offset = 0.0
+    for tier in history.tiers.values():
+        tier.wall_offset = 0.0
+    for second in range(65):
+        history.append({'cpu': float(second)}, timestamp=float(second))
+
+    assert history.tier_names == ('raw', '10s', '1m')
+    assert history.series('cpu', 'raw').tolist() == [60.0, 61.0, 62.0, 63.0, 64.0]
+    # 6 intervalles de 10 s terminés, 4 gardés ; la minute en cours n'est pas écrite
+    assert history.series('cpu', '10s', 'avg').tolist() == [24.5, 34.5, 44.5, 54.5]
+    assert history.series('cpu', '10s', 'max', 1).tolist() == [59.0]
+    assert history.series('cpu', '1m', 'avg', 1).tolist() == [29.5]
+    assert history.series_timestamps('1m', 1).tolist() == [0.0]
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_core_heatmap_groups_cores_by_max_and_avg(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(history_module, 'np', None)
+    elif history_module.np is None:
+        pytest.skip("numpy absent")
+    cores = CoreHistory(cores=5, capacity=3)
+    cores.append([10, 20, 30, 40, 50, 99])    # Cœur en trop : tronqué
+    cores.append([0, 0, 100, 0])               # Cœur hors ligne : 0
+    for row in range(2):
+        cores.append([1, 2, 3, 4, 5])
+
+    assert len(cores) == 3
+    assert cores.core(2).tolist() == [100.0, 3.0, 3.0]
+    assert cores.group_bounds(2) == [0, 2, 5]
+    assert cores.grouped(2, n=3, stat='max') == [[0.0, 2.0, 2.0], [100.0, 5.0, 5.0]]
+    assert cores.grouped(2, n=1, stat='avg') == [[1.5], [4.0]]
+    assert cores.grouped(9, n=1) == [[1.0], [2.0], [3.0], [4.0], [5.0]]    # Pas plus de lignes que de cœurs
+    assert cores.hottest() == (4, 5.0)
+
+
+def test_iter_range_is_consistent_with_concurrent_appends():
+    history = MetricHistory(('a', 'b'), capacity=5000)
+    history.wall_offset = 0.0
+    for i in range(5000):
+        history.append({'a': float(i), 'b': -float(i)}, timestamp=float(i))
+
+    stop = threading.Event()
+
+    def writer():
+        i = 5000
+        while not stop.is_set():
+            history.append({'a': float(i), 'b': -float(i)}, timestamp=float(i))
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(50):
+            for timestamps, columns in history.iter_range(chunk_rows=700):
+                # Chaque valeur reste alignée sur son horodatage, dans toutes les colonnes
+                assert columns['a'] == timestamps
+                assert columns['b'] == [-t for t in timestamps]
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_iter_range_bounds_and_chunks():
+    history = MetricHistory(('a',), capacity=100)
+    history.wall_offset = 1000.0
+    for i in range(30):
+        history.append({'a': float(i)}, timestamp=float(i))
+
+    chunks = list(history.iter_range(1010.0, 1019.0, chunk_rows=4))
+    assert [len(timestamps) for timestamps, _ in chunks] == [4, 4, 2]
+    assert chunks[0][0][0] == 1010.0
+    assert chunks[-1][1]['a'][-1] == 19.0
@@ -0,0 +1,98 @@
+"""
+Tests des segments persistants (troncature, rétention, lecture concurrente).
+"""
+import threading
+
+from history_store import HistoryStore, Segment
+
+COLUMNS = ('cpu', 'ram')
+
+
+def _fill(store, count, start=1000.0):
+    for i in range(count):
+        store.append(start + i, {'cpu': float(i), 'ram': 2.0 * i})
+
+
+def test_query_sees_unflushed_rows(tmp_path):
+    store = HistoryStore(tmp_path, COLUMNS, flush_every=100)
+    _fill(store, 5)
+    pieces = store.query(1001.0, 1003.0)
+    assert [list(piece.column('cpu')) for piece in pieces] == [[1.0, 2.0, 3.0]]
+    store.close()
+
+
+def test_truncated_trailing_record_is_ignored(tmp_path):
+    store = HistoryStore(tmp_path, COLUMNS)
+    _fill(store, 4)
+    store.close()
+
+    path = next(tmp_path.glob('segment_*.tsk'))
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * 13)     # Enregistrement à moitié écrit (arrêt brutal)
+
+    segment = Segment(path).open()
+    assert segment.rows == 4
+    assert segment.last_timestamp == 1003.0
+    segment.close()
+
+    reopened = HistoryStore(tmp_path, COLUMNS)
+    assert [timestamp for timestamp, _ in reopened.tail(10)] == [1000.0, 1001.0, 1002.0, 1003.0]
+    reopened.close()
+
+
+def test_segments_seal_after_segment_records(tmp_path):
+    store = HistoryStore(tmp_path, COLUMNS, segment_records=10, retention_seconds=1e12)
+    _fill(store, 25)
+    assert len(list(tmp_path.glob('segment_*.tsk'))) == 3
+    assert sum(len(piece) for piece in store.query()) == 25
+    store.close()
+
+
+def test_retention_drops_expired_segments(tmp_path):
+    store = HistoryStore(tmp_path, COLUMNS, segment_records=10, retention_seconds=1e12)
+    _fill(store, 30)
+    store.retention_seconds = 15
+    assert store.enforce_retention(now=1029.0) == 1     # 1000-1009 expiré ; le segment actif est conservé
+    assert store.query()[0].timestamps[0] == 1010.0
+    store.close()
+
+
+def test_retention_enforces_max_bytes(tmp_path):
+    store = HistoryStore(tmp_path, COLUMNS, segment_records=10, retention_seconds=1e12)
+    _fill(store, 40)
+    sizes = [segment.size_bytes for segment in store.segments]
+    store.max_bytes = sum(sizes[-2:])
+    store.enforce_retention(now=1040.0)
+    assert [segment.first_timestamp for segment in store.segments] == [1020.0, 1030.0]
+    store.close()
+
+
+def test_iter_range_while_writing(tmp_path):
+    store = HistoryStore(tmp_path, COLUMNS, segment_records=50, retention_seconds=1e12, flush_every=1)
+    _fill(store, 200)
+    errors = []
+    done = threading.Event()
+
+    def writer():
+        try:
+            _fill(store, 2000, start=1200.0)
+        except Exception as e:     # pragma: no cover - remonté par l'assertion
+            errors.append(e)
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    exported = 0
+    try:
+        while not done.is_set():
+            for timestamps, columns in store.iter_range(None, None, chunk_rows=64):
+                assert len(columns['cpu']) == len(timestamps)
+                assert timestamps == sorted(timestamps)
+                exported += len(timestamps)
+    except Exception as e:
+        errors.append(e)
+    thread.join()
+    store.close()
+    assert not errors
+    assert exported > 0
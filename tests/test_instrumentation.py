@@ -0,0 +1,54 @@
+"""
+Tests de l'instrumentation du chemin chaud (spans, fenêtre glissante).
+"""
+import pytest
+
+from instrumentation import Instrumentation, SpanStats
+
+
+def test_window_percentiles_and_lifetime_totals():
+    stats = SpanStats(window=4)
+    for seconds in (0.010, 0.020, 0.030, 0.040, 0.100):
+        stats.add(seconds)
+
+    summary = stats.summary()
+    assert summary['count'] == 5
+    assert summary['last_ms'] == pytest.approx(100.0)
+    assert summary['mean_ms'] == pytest.approx(40.0)    # Sur toute la durée de vie
+    assert summary['p50_ms'] == pytest.approx(40.0)     # Fenêtre : 20, 30, 40, 100 ms
+    assert summary['p99_ms'] == pytest.approx(100.0)
+    assert summary['max_ms'] == pytest.approx(100.0)
+    assert SpanStats(window=4).summary()['p95_ms'] == 0.0
+
+
+def test_disabled_spans_record_nothing_and_wrap_follows_the_switch():
+    instruments = Instrumentation(enabled=False, window=8)
+    calls = []
+    timed = instruments.wrap('collector.cpu', lambda value: calls.append(value) or value)
+
+    with instruments.span('ui.page_update'):
+        pass
+    assert timed(1) == 1
+    assert instruments.stats() == {}
+
+    instruments.enable()
+    with instruments.span('ui.page_update'):
+        pass
+    assert timed(2) == 2
+    assert list(instruments.stats()) == ['collector.cpu', 'ui.page_update']
+    assert instruments.stats()['collector.cpu']['count'] == 1
+
+    instruments.reset()
+    assert instruments.stats() == {}
+    assert calls == [1, 2]
+
+
+def test_failing_wrapped_call_is_still_timed():
+    instruments = Instrumentation(enabled=True, window=8)
+
+    def fail():
+        raise OSError("boom")
+
+    with pytest.raises(OSError):
+        instruments.wrap('collector.disk', fail)()
+    assert instruments.stats()['collector.disk']['count'] == 1
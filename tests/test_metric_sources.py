@@ -0,0 +1,59 @@
+"""
+Tests de l'interface des sources de métriques.
+"""
+import json
+
+import pytest
+
+from metric_sources import MetricSource, ReplaySource, SyntheticSource, create_source
+
+
+def test_incomplete_source_fails_at_instantiation():
+    class PartialSource(MetricSource):
+        def cpu_percent(self, interval=None, percpu=False):
+            return 0.0
+
+    with pytest.raises(TypeError, match="abstract"):
+        PartialSource()
+
+
+def test_synthetic_source_is_deterministic():
+    first, second = SyntheticSource(seed=7), SyntheticSource(seed=7)
+    assert first.cpu_count() == second.cpu_count()
+    assert first.cpu_percent(percpu=True) == second.cpu_percent(percpu=True)
+    first.close()
+    second.close()
+
+
+def test_unknown_source_is_rejected():
+    with pytest.raises(ValueError):
+        create_source('nope')
+
+
+def test_replay_follows_the_recording_clock_and_loops(tmp_path):
+    path = tmp_path / 'run.ndjson'
+    frames = [
+        {'timestamp': 100.0 + i, 'metrics': {'cpu_percent': 10.0 * (i + 1), 'net_total_sent': 1000 * (i + 1)},
+         'top_processes': {'cpu': [{'pid': 7, 'name': 'a', 'cpu_percent': 5.0}],
+                           'memory': [{'pid': 7, 'name': 'a'}, {'pid': 8, 'name': 'b', 'memory_percent': 2.0}]}}
+        for i in range(3)
+    ]
+    path.write_text(json.dumps(frames[0]) + "\nnot json\n" + "\n".join(map(json.dumps, frames[1:])) + "\n")
+    now = [0.0]
+    source = ReplaySource(str(path), speed=1.0, loop=True, clock=lambda: now[0])
+    try:
+        assert source.cpu_percent() == 10.0
+        rows = source.process_rows(cpu_count=1)
+        assert list(rows.pids) == [7, 8]    # Union des classements, sans doublon
+
+        now[0] = 1.5
+        assert source.cpu_percent() == 20.0
+        now[0] = 2.0
+        assert source.net_io_counters().bytes_sent == 3000
+
+        # Fin de l'enregistrement : reprise au début, compteurs toujours croissants
+        now[0] = 2.5
+        assert source.cpu_percent() == 10.0
+        assert source.net_io_counters().bytes_sent == 3000
+    finally:
+        source.close()
@@ -0,0 +1,134 @@
+"""
+Tests de l'endpoint OpenMetrics (texte rendu, socket Unix).
+"""
+import socket
+import stat
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from metrics_server import MetricsServer, render_openmetrics
+from snapshot_bus import SnapshotBus
+
+
+@pytest.fixture
+def socket_path():
+    # Chemin court : les sockets Unix sont limités à ~107 octets
+    with tempfile.TemporaryDirectory(prefix='tk') as directory:
+        yield Path(directory) / 'run' / 'metrics.sock'
+
+
+def _render(metrics, top_processes=None):
+    bus = SnapshotBus()
+    return render_openmetrics(bus.publish(metrics, top_processes, timestamp=1700000000.0)).decode('utf-8')
+
+
+def test_text_ends_with_eof_and_types_every_family():
+    text = _render({'cpu_percent': 12.5, 'ram_used_gb': 2.0, 'battery_plugged': True})
+    lines = text.split('\n')
+
+    assert text.endswith('# EOF\n') and text.count('# EOF') == 1
+    assert 'taskly_cpu_percent 12.5' in lines
+    assert f'taskly_ram_used_bytes {float(2 * 1024 ** 3)!r}' in lines
+    assert 'taskly_battery_plugged 1' in lines
+    assert 'taskly_snapshot_version 1' in lines
+    # Une famille sans valeur n'apparaît pas du tout
+    assert 'taskly_net_up_kbps' not in text
+    families = {line.split()[2] for line in lines if line.startswith('# TYPE')}
+    samples = {line.split('{')[0].split()[0] for line in lines if line and not line.startswith('#')}
+    assert samples <= families
+
+
+def test_counters_use_total_suffix():
+    lines = _render({'disk_read': 4096, 'net_total_sent': 10}).split('\n')
+
+    assert '# TYPE taskly_disk_read_bytes counter' in lines
+    assert 'taskly_disk_read_bytes_total 4096' in lines
+    assert 'taskly_net_sent_bytes_total 10' in lines
+    assert not any(line.startswith('taskly_disk_read_bytes ') for line in lines)
+
+
+def test_labels_are_escaped():
+    text = _render({'cpu_per_core': [1.0, 2.0], 'mounts': [{'mountpoint': '/mnt/we"ird\\dir\n',
+                                                            'fstype': 'ext4', 'percent': 3.0}]})
+
+    assert 'taskly_cpu_core_percent{core="1"} 2.0' in text
+    assert 'taskly_mount_percent{mountpoint="/mnt/we\\"ird\\\\dir\\n",fstype="ext4"} 3.0' in text
+
+
+def test_top_processes_are_labelled_by_rank_only():
+    ticks = [
+        _render({}, {'cpu': [{'pid': pid, 'name': name, 'cpu_percent': 9.0, 'memory_percent': 1.0}]})
+        for pid, name in ((7, 'make'), (8, 'cc1'))
+    ]
+    series = [{line.rsplit(' ', 1)[0] for line in text.split('\n') if line.startswith('taskly_process_cpu')}
+              for text in ticks]
+
+    # Le même rang garde la même série quand un autre processus l'occupe
+    assert series[0] == series[1] == {'taskly_process_cpu_percent{ranking="cpu",rank="1"}'}
+    assert '# TYPE taskly_process info' in ticks[1]
+    assert 'taskly_process_info{ranking="cpu",rank="1",pid="8",name="cc1"} 1' in ticks[1]
+
+
+def test_non_finite_values_use_openmetrics_spelling():
+    lines = _render({'cpu_percent': float('nan'), 'net_up': float('inf'),
+                     'net_down': float('-inf')}).split('\n')
+
+    assert 'taskly_cpu_percent NaN' in lines
+    assert 'taskly_net_up_kbps +Inf' in lines
+    assert 'taskly_net_down_kbps -Inf' in lines
+
+
+def _scrape(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(path))
+        client.sendall(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        chunks = []
+        while chunk := client.recv(65536):
+            chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def test_unix_socket_is_private_from_bind(socket_path):
+    bus = SnapshotBus()
+    bus.publish({'cpu_percent': 5.0})
+    server = MetricsServer(bus, socket_path=socket_path)
+    server.start()
+    try:
+        assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+        assert stat.S_IMODE(socket_path.parent.stat().st_mode) == 0o700
+        assert list(socket_path.parent.iterdir()) == [socket_path]     # Dossier de bind retiré
+        assert b"taskly_cpu_percent 5.0" in _scrape(socket_path)
+    finally:
+        server.stop()
+    assert not socket_path.exists()
+
+
+def test_live_socket_is_never_unlinked(socket_path):
+    bus = SnapshotBus()
+    first = MetricsServer(bus, socket_path=socket_path)
+    first.start()
+    try:
+        with pytest.raises(RuntimeError):
+            MetricsServer(bus, socket_path=socket_path).start()
+        # Le premier endpoint répond toujours sur le même chemin
+        assert _scrape(socket_path).startswith(b"HTTP/1.1 503")
+    finally:
+        first.stop()
+
+
+def test_stale_socket_is_replaced(socket_path):
+    socket_path.parent.mkdir(mode=0o700)
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(socket_path))
+    stale.close()    # Fichier laissé sans processus à l'écoute
+
+    bus = SnapshotBus()
+    bus.publish({'cpu_percent': 1.0})
+    server = MetricsServer(bus, socket_path=socket_path)
+    server.start()
+    try:
+        assert b"taskly_cpu_percent 1.0" in _scrape(socket_path)
+    finally:
+        server.stop()
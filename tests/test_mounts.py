@@ -0,0 +1,80 @@
+"""
+Tests de la surveillance des montages (cadences, montage bloqué).
+"""
+import threading
+import time
+from collections import namedtuple
+
+from mounts import MountMonitor
+
+sdiskpart = namedtuple('sdiskpart', ['device', 'mountpoint', 'fstype', 'opts'])
+sdiskusage = namedtuple('sdiskusage', ['total', 'used', 'free', 'percent'])
+GIB = 1024 ** 3
+
+
+class FakeMounts:
+    """Montages factices ; statvfs de /mnt/nfs bloqué jusqu'à `release`."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.partitions = [
+            sdiskpart('/dev/sda1', '/', 'ext4', 'rw'),
+            sdiskpart('/dev/sdb1', '/data', 'xfs', 'rw'),
+            sdiskpart('tmpfs', '/run', 'tmpfs', 'rw'),
+            sdiskpart('server:/export', '/mnt/nfs', 'nfs4', 'rw'),
+        ]
+
+    def disk_partitions(self, all=False):
+        return self.partitions
+
+    def disk_usage(self, path):
+        if path == '/mnt/nfs':
+            self.release.wait(5.0)
+        return sdiskusage(100 * GIB, {'/': 50, '/data': 90}.get(path, 10) * GIB, 0, {'/': 50.0, '/data': 90.0}.get(path, 10.0))
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def test_hung_mount_is_reported_without_blocking_others():
+    source = FakeMounts()
+    monitor = MountMonitor(source, timeout=0.1)
+    monitor.start()
+    try:
+        _wait_for(lambda: monitor.hung == ['/mnt/nfs'])
+        mounts = monitor.snapshot()
+        # Du plus plein au moins plein ; tmpfs ignoré ; le montage bloqué reste listé
+        assert [mount['mountpoint'] for mount in mounts] == ['/data', '/', '/mnt/nfs']
+        assert mounts[0]['used_gb'] == 90.0 and not mounts[0]['stale']
+        assert mounts[-1]['stale'] is True and mounts[-1]['updated'] is None
+
+        source.release.set()
+        _wait_for(lambda: monitor.hung == [])
+        nfs = next(mount for mount in monitor.snapshot() if mount['mountpoint'] == '/mnt/nfs')
+        assert nfs['percent'] == 10.0 and not nfs['stale']
+    finally:
+        source.release.set()
+        monitor.stop()
+
+
+def test_unmounted_filesystem_is_dropped():
+    source = FakeMounts()
+    source.release.set()
+    monitor = MountMonitor(source, timeout=1.0)     # Sans start() : le test pilote le planificateur
+    try:
+        monitor.scheduler.run_pending()
+        monitor.scheduler.run_pending()     # Premières échéances des montages découverts
+        _wait_for(lambda: len(monitor.snapshot()) == 3)
+
+        source.partitions = source.partitions[:1]
+        monitor.scheduler.jobs['refresh'].deadline = 0.0
+        monitor.scheduler.run_pending()
+        assert [mount['mountpoint'] for mount in monitor.snapshot()] == ['/']
+        assert set(monitor.scheduler.jobs) == {'refresh', ('mount', '/')}
+    finally:
+        monitor.stop()
@@ -0,0 +1,77 @@
+"""
+Tests du regroupement incrémental des processus (deltas par scan).
+"""
+from array import array
+
+import pytest
+
+from process_groups import ProcessGrouper
+from process_table import ProcessRows
+
+
+def _rows(*procs):
+    """Table de processus : (pid, nom, cpu, mémoire[, ppid])."""
+    procs = [proc + (1,) if len(proc) == 4 else proc for proc in procs]
+    return ProcessRows.from_columns(
+        array('l', [proc[0] for proc in procs]), [proc[1] for proc in procs],
+        array('d', [proc[2] for proc in procs]), array('d', [proc[3] for proc in procs]),
+        array('l', [proc[4] for proc in procs]),
+    )
+
+
+def _totals(grouper):
+    return {group['group']: (group['count'], group['cpu_percent'], group['memory_percent'])
+            for group in grouper.top(10)}
+
+
+def test_join_update_and_leave_adjust_group_totals():
+    grouper = ProcessGrouper('name')
+    assert grouper.update(_rows((10, 'web', 5.0, 1.0), (11, 'web', 3.0, 2.0), (12, 'db', 1.0, 4.0))) == (3, 0)
+    assert _totals(grouper) == {'web': (2, 8.0, 3.0), 'db': (1, 1.0, 4.0)}
+
+    # Processus connu : seul son delta est appliqué ; 11 part, 13 arrive
+    assert grouper.update(_rows((10, 'web', 7.0, 1.5), (12, 'db', 1.0, 4.0), (13, 'web', 2.0, 1.0))) == (1, 1)
+    count, cpu, memory = _totals(grouper)['web']
+    assert count == 2
+    assert cpu == pytest.approx(9.0) and memory == pytest.approx(2.5)
+
+    # Dernier membre parti : le groupe disparaît
+    grouper.update(_rows((10, 'web', 7.0, 1.5), (13, 'web', 2.0, 1.0)))
+    assert 'db' not in _totals(grouper) and len(grouper) == 1
+
+
+def test_reused_pid_moves_to_its_new_group():
+    grouper = ProcessGrouper('name')
+    grouper.update(_rows((10, 'web', 5.0, 1.0), (11, 'web', 1.0, 1.0)))
+    assert grouper.update(_rows((10, 'cron', 2.0, 0.5), (11, 'web', 1.0, 1.0))) == (1, 0)
+    assert _totals(grouper) == {'web': (1, 1.0, 1.0), 'cron': (1, 2.0, 0.5)}
+
+
+def test_reparented_process_changes_tree_group():
+    grouper = ProcessGrouper('parent')
+    grouper.update(_rows((20, 'shell', 1.0, 1.0, 1), (21, 'make', 2.0, 1.0, 20)))
+    assert _totals(grouper) == {'shell (20)': (2, 3.0, 2.0)}
+
+    # Le parent meurt : l'enfant est rattaché à init et forme son propre groupe
+    grouper.update(_rows((21, 'make', 2.0, 1.0, 1)))
+    assert _totals(grouper) == {'make (21)': (1, 2.0, 1.0)}
+
+
+def test_user_labels_are_read_once_per_new_process():
+    class Labels:
+        def __init__(self):
+            self.requested = []
+
+        def process_labels(self, pids, kind):
+            self.requested.append((kind, sorted(pids)))
+            return {10: 'root', 11: 'alice'}
+
+    source = Labels()
+    grouper = ProcessGrouper('user', source=source)
+    grouper.update(_rows((10, 'sshd', 1.0, 1.0), (11, 'vim', 2.0, 1.0), (12, 'ghost', 0.5, 0.5)))
+    grouper.update(_rows((10, 'sshd', 3.0, 1.0), (11, 'vim', 2.0, 1.0), (12, 'ghost', 0.5, 0.5)))
+
+    assert source.requested == [('user', [10, 11, 12])]
+    assert _totals(grouper) == {'root': (1, 3.0, 1.0), 'alice': (1, 2.0, 1.0), '?': (1, 0.5, 0.5)}
+    with pytest.raises(ValueError):
+        ProcessGrouper('host')
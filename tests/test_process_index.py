@@ -0,0 +1,120 @@
+"""
+Tests de l'index de la table complète et du tableau paginé.
+"""
+import sys
+import threading
+from array import array
+from types import SimpleNamespace
+
+from components.process_browser import ProcessBrowser
+from process_index import ProcessIndex
+from process_table import ProcessRows
+
+
+class Commands:
+    """Source des lignes de commande ; compte les PID demandés."""
+
+    def __init__(self, cmdlines):
+        self.cmdlines = cmdlines
+        self.requested = []
+
+    def process_cmdlines(self, pids):
+        self.requested.extend(pids)
+        return {pid: self.cmdlines[pid] for pid in pids if pid in self.cmdlines}
+
+
+def _rows(*procs):
+    """(pid, nom, cpu, mémoire)"""
+    return ProcessRows.from_columns(
+        array('l', [proc[0] for proc in procs]), [proc[1] for proc in procs],
+        array('d', [proc[2] for proc in procs]), array('d', [proc[3] for proc in procs]),
+    )
+
+
+TABLE = _rows((10, 'Python', 5.0, 3.0), (20, 'bash', 50.0, 1.0), (30, 'nginx', 20.0, 2.0), (40, 'python3', 1.0, 9.0))
+
+
+def test_view_sorts_pages_and_searches_names_commands_and_pids():
+    source = Commands({10: 'python -m http.server', 20: 'bash', 30: 'nginx: worker', 40: 'python3 job.py'})
+    index = ProcessIndex(source)
+    index.update(TABLE)
+
+    total, page = index.view(sort_by='cpu', offset=1, limit=2)
+    assert total == 4 and [row['pid'] for row in page] == [30, 10]
+    assert page[0]['cmdline'] == 'nginx: worker'
+    assert [row['pid'] for row in index.view(sort_by='name', descending=False)[1]] == [20, 30, 10, 40]
+
+    assert [row['pid'] for row in index.search('PYTHON')] == [10, 40]
+    assert [row['pid'] for row in index.search('worker')] == [30]     # Ligne de commande
+    assert [row['pid'] for row in index.search('30')] == [30]         # PID exact
+    assert index.view('python', sort_by='memory')[1][0]['pid'] == 40
+    assert index.lookup(20)['name'] == 'bash' and index.lookup(99) is None
+
+    # Tick suivant : seules les lignes de commande des PID nouveaux ou réutilisés sont relues
+    source.requested.clear()
+    index.update(_rows((10, 'Python', 5.0, 3.0), (40, 'other', 1.0, 1.0), (50, 'sshd', 0.0, 0.5)))
+    index.search('x')
+    assert sorted(source.requested) == [40, 50]
+
+
+def _browser(rows, page_size=2):
+    index = ProcessIndex()
+    index.update(rows)
+    browser = ProcessBrowser(index, page_size=page_size)
+    browser.update = lambda: None     # Hors page Flet
+    browser.refresh()
+    return browser
+
+
+def _shown(browser):
+    return [int(row.cells[1].content.value) for row in browser.data_table.rows]
+
+
+def test_browser_pages_and_searches():
+    browser = _browser(TABLE)
+    assert _shown(browser) == [20, 30] and browser.range_text.value == "1–2 / 4"
+    assert browser.prev_btn.disabled and not browser.next_btn.disabled
+
+    browser._move(1)
+    assert _shown(browser) == [10, 40] and browser.next_btn.disabled
+    browser._move(1)     # Pas de page au-delà de la dernière
+    assert browser.offset == 2
+
+    browser._handle_search(SimpleNamespace(control=SimpleNamespace(value=' python ')))
+    assert browser.offset == 0 and _shown(browser) == [10, 40]
+    browser._handle_sort(SimpleNamespace(column_index=3))      # RAM, décroissant
+    assert _shown(browser) == [40, 10]
+
+    # La page courante disparaît : retour à la dernière page existante
+    browser._handle_search(SimpleNamespace(control=SimpleNamespace(value='')))
+    browser._move(1)
+    browser.index.update(_rows((1, 'a', 1.0, 1.0)))
+    browser.refresh()
+    assert browser.offset == 0 and _shown(browser) == [1]
+
+
+def test_browser_state_is_consistent_across_render_and_event_threads():
+    browser = _browser(_rows(*[(pid, f"p{pid}", float(pid), 1.0) for pid in range(1, 40)]), page_size=5)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)     # Bascules fréquentes entre les deux threads
+    stop = threading.Event()
+
+    def navigate():
+        while not stop.is_set():
+            browser._move(1)
+            browser._handle_sort(SimpleNamespace(column_index=1))
+
+    thread = threading.Thread(target=navigate)
+    thread.start()
+    try:
+        for _ in range(2000):
+            browser.refresh()
+            with browser._lock:
+                # Page affichée cohérente avec l'état de navigation
+                shown = _shown(browser)
+                expected = browser.index.view('', browser.sort_by, browser.descending, browser.offset, 5)[1]
+                assert shown == [row['pid'] for row in expected]
+    finally:
+        stop.set()
+        thread.join()
+        sys.setswitchinterval(interval)
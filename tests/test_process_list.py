@@ -0,0 +1,76 @@
+"""
+Tests de la réutilisation des lignes du tableau des processus.
+"""
+import sys
+import threading
+
+from components.process_list import ProcessList
+
+
+def _procs(*pids):
+    return [{'pid': pid, 'name': f"p{pid}", 'cpu_percent': float(pid), 'memory_percent': 1.0} for pid in pids]
+
+
+def _process_list():
+    process_list = ProcessList(on_sort_change=lambda sort: None, on_group_change=lambda group: None)
+    process_list.pid_col.update = lambda: None     # Hors page Flet
+    return process_list
+
+
+def test_rows_are_kept_by_pid_and_recycled():
+    process_list = _process_list()
+    process_list.update_processes(_procs(1, 2, 3))
+    rows = {pid: process_list._rows[pid] for pid in (1, 2, 3)}
+
+    # Changement de rang : la même ligne est déplacée, pas recréée
+    process_list.update_processes(_procs(3, 1, 4))
+    assert process_list._rows[3] is rows[3] and process_list._rows[1] is rows[1]
+    assert process_list._spare == [rows[2]]     # Ligne du PID sorti, mise en réserve
+    assert process_list.data_table.rows == [rows[3].row, rows[1].row, process_list._rows[4].row]
+
+    # Nouveau venu au tick suivant : il reprend la ligne en réserve
+    process_list.update_processes(_procs(3, 1, 5))
+    assert process_list._rows[5] is rows[2]
+    assert rows[2].texts[0].value == "p5"
+
+    # Valeurs identiques : aucun texte réécrit
+    assert rows[3].set("p3", 3, 3.0, 1.0) is False
+
+
+def test_grouped_view_uses_group_keys():
+    process_list = _process_list()
+    process_list.update_processes(_procs(1, 2))
+    process_list._change_group('name')
+    assert process_list._rows == {} and len(process_list._spare) == 2
+
+    process_list.update_processes([{'group': 'web', 'name': 'web', 'count': 3,
+                                    'cpu_percent': 9.0, 'memory_percent': 2.0}])
+    assert list(process_list._rows) == ['web']
+    assert process_list._rows['web'].texts[1].value == "×3"
+
+
+def test_pool_stays_consistent_across_render_and_event_threads():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)     # Bascules fréquentes entre les deux threads
+    process_list = _process_list()
+    stop = threading.Event()
+
+    def toggle_groups():
+        while not stop.is_set():
+            process_list._change_group('name')
+            process_list._change_group('none')
+
+    thread = threading.Thread(target=toggle_groups)
+    thread.start()
+    try:
+        for tick in range(2000):
+            process_list.update_processes(_procs(*range(tick % 7, tick % 7 + 5)))
+            with process_list._lock:
+                shown = list(process_list._rows.values())
+                pool = shown + process_list._spare
+                # Une ligne n'est jamais à la fois affichée pour deux PID ou en réserve
+                assert len({id(entry) for entry in pool}) == len(pool)
+    finally:
+        stop.set()
+        thread.join()
+        sys.setswitchinterval(interval)
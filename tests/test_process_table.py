@@ -0,0 +1,136 @@
+"""
+Tests du cache des processus (réutilisation et identité des PID).
+"""
+import types
+
+import pytest
+
+import process_table
+from process_table import ProcessCache, ProcessRows, top_k
+
+
+class FakeSystem:
+    """Table de processus minimale : pid -> (create_time, nom, cpu)."""
+
+    def __init__(self):
+        self.table = {}
+        self.created = 0    # Nombre de psutil.Process construits
+        system = self
+
+        class NoSuchProcess(Exception):
+            pass
+
+        class Process:
+            # Comme psutil : l'objet garde son identité même si le PID est réattribué
+            def __init__(self, pid):
+                if pid not in system.table:
+                    raise NoSuchProcess(pid)
+                system.created += 1
+                self.pid = pid
+                self._create_time = system.table[pid][0]
+
+            def oneshot(self):
+                return _NullContext()
+
+            def create_time(self):
+                return self._create_time
+
+            def name(self):
+                # Comme /proc/<pid>/stat : lit le processus qui porte le PID aujourd'hui
+                if self.pid not in system.table:
+                    raise NoSuchProcess(self.pid)
+                return system.table[self.pid][1]
+
+            def cpu_percent(self, interval=None):
+                return system.table.get(self.pid, (0, '', 0.0))[2]
+
+            def memory_percent(self):
+                return 1.0
+
+            def ppid(self):
+                return 1
+
+        self.psutil = types.SimpleNamespace(
+            pids=lambda: list(self.table),
+            Process=Process,
+            NoSuchProcess=NoSuchProcess,
+            ZombieProcess=type('ZombieProcess', (NoSuchProcess,), {}),
+            AccessDenied=type('AccessDenied', (Exception,), {}),
+        )
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def system(monkeypatch):
+    fake = FakeSystem()
+    monkeypatch.setattr(process_table, 'psutil', fake.psutil)
+    return fake
+
+
+def test_cache_reuses_known_processes(system):
+    system.table = {10: (100.0, 'alpha', 5.0), 11: (101.0, 'beta', 2.0)}
+    cache = ProcessCache()
+    cache.sample()
+    first = dict(cache._entries)
+
+    created = system.created
+
+    cache.sample()
+    assert cache._entries.keys() == first.keys()
+    assert all(cache._entries[key][0] is first[key][0] for key in first)
+    assert system.created == created    # Aucun psutil.Process par tick
+
+
+def test_recycled_pid_is_evicted_and_readded(system):
+    system.table = {10: (100.0, 'old', 5.0)}
+    cache = ProcessCache()
+    cache.sample()
+
+    # Le processus 10 meurt, un autre processus reçoit le même PID
+    system.table = {10: (200.0, 'new', 7.0)}
+    rows = cache.sample(normalize_cpu=False)
+
+    assert list(cache._entries) == [(10, 200.0)]
+    assert rows.names == ['new']
+    assert rows.cpu[0] == 7.0
+
+
+def test_renamed_process_keeps_its_entry(system):
+    system.table = {10: (100.0, 'sh', 5.0)}
+    cache = ProcessCache()
+    cache.sample()
+    proc = cache._entries[(10, 100.0)][0]
+
+    # exec() : même processus (même create_time), nouveau nom
+    system.table = {10: (100.0, 'python', 5.0)}
+    rows = cache.sample()
+
+    assert rows.names == ['python']
+    assert cache._entries[(10, 100.0)] == (proc, 'python')
+
+
+def test_dead_processes_leave_the_cache(system):
+    system.table = {10: (100.0, 'alpha', 5.0), 11: (101.0, 'beta', 2.0)}
+    cache = ProcessCache()
+    cache.sample()
+
+    del system.table[11]
+    rows = cache.sample()
+    assert len(cache) == 1
+    assert list(rows.pids) == [10]
+
+
+def test_top_k_orders_by_column():
+    rows = ProcessRows()
+    for pid, cpu, memory in ((1, 5.0, 30.0), (2, 50.0, 10.0), (3, 20.0, 20.0)):
+        rows.append(pid, f"p{pid}", cpu, memory)
+
+    assert [row['pid'] for row in top_k(rows, 2, 'cpu')] == [2, 3]
+    assert [row['pid'] for row in top_k(rows, 2, 'memory')] == [1, 3]
@@ -0,0 +1,100 @@
+"""
+Tests des collecteurs /proc sur une arborescence factice.
+"""
+import os
+
+import pytest
+
+import procfs
+from procfs import ProcfsBackend, ProcScanner
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'preadv'), reason="pread /proc : Linux uniquement")
+
+NET_HEADER = (
+    "Inter-|   Receive                                                |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+)
+
+
+def _stat(*cpus):
+    """Lignes 'cpu' puis 'cpuN' : (user, idle) pour chaque ligne, autres champs à 0."""
+    lines = [f"{'cpu' if i == 0 else f'cpu{i - 1}'} {user} 0 0 {idle} 0 0 0 0 0 0" for i, (user, idle) in enumerate(cpus)]
+    return '\n'.join(lines) + "\nintr 0\n"
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / 'net').mkdir()
+    (tmp_path / 'stat').write_text(_stat((100, 100), (50, 50), (50, 50)))
+    (tmp_path / 'meminfo').write_text(
+        "MemTotal:       1000 kB\nMemFree:         200 kB\nMemAvailable:    400 kB\nSwapFree: 0 kB\n")
+    (tmp_path / 'net' / 'dev').write_text(NET_HEADER + (
+        "    lo:     100       1    0    0    0     0          0         0      100       1    0    0    0     0       0          0\n"
+        "  eth0:    5000      10    1    2    0     0          0         0     3000       6    3    4    0     0       0          0\n"))
+    return tmp_path
+
+
+def test_memory_and_network_follow_psutil_formulas(root):
+    backend = ProcfsBackend(str(root))
+    try:
+        memory = backend.virtual_memory()
+        assert (memory.total, memory.available, memory.used, memory.free) == (1024000, 409600, 614400, 204800)
+        assert memory.percent == 60.0
+
+        total = backend.net_io_counters()
+        assert (total.bytes_sent, total.bytes_recv, total.packets_recv, total.errin, total.dropout) == (3100, 5100, 11, 1, 4)
+        eth0 = backend.net_io_counters(pernic=True)['eth0']
+        assert (eth0.bytes_sent, eth0.bytes_recv) == (3000, 5000)
+    finally:
+        backend.close()
+
+
+def test_cpu_is_a_delta_over_the_kept_open_file(root):
+    backend = ProcfsBackend(str(root))
+    try:
+        # Réécriture sur place : le descripteur ouvert relit le nouveau contenu
+        (root / 'stat').write_text(_stat((160, 140), (50, 100), (110, 60)))
+        assert backend.cpu_percent(percpu=True) == [0.0, 85.7]
+        (root / 'stat').write_text(_stat((260, 140), (100, 100), (160, 60)))
+        assert backend.cpu_percent() == 100.0
+    finally:
+        backend.close()
+
+
+def _process(root, pid, comm, ppid, ticks, start, rss_pages):
+    directory = root / str(pid)
+    directory.mkdir(exist_ok=True)
+    # Champs après ')' : state ppid ... utime(14) stime(15) ... starttime(22)
+    fields = ['S', ppid] + [0] * 9 + [ticks, 0] + [0] * 6 + [start, 0]
+    (directory / 'stat').write_text(f"{pid} ({comm}) " + ' '.join(map(str, fields)) + "\n")
+    (directory / 'statm').write_text(f"100 {rss_pages} 0 0 0 0 0\n")
+
+
+def test_scanner_computes_cpu_deltas_and_tracks_pid_identity(root, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(procfs.time, 'monotonic', lambda: now[0])
+    _process(root, 1, 'init', 0, 10, 1, 25)
+    _process(root, 42, 'tricky) (name', 1, 100, 500, 50)
+    (root / 'self').mkdir()     # Entrées non numériques ignorées
+
+    scanner = ProcScanner(str(root))
+    monkeypatch.setattr(scanner, 'clock_ticks', 100)
+    monkeypatch.setattr(scanner, 'page_size', 4096)
+    first = scanner.scan(normalize_cpu=False)
+    assert sorted(zip(first.pids, first.names)) == [(1, 'init'), (42, 'tricky) (name')]
+    assert list(first.cpu) == [0.0, 0.0]    # Pas encore de delta
+
+    now[0] += 2.0
+    _process(root, 42, 'tricky) (name', 1, 200, 500, 50)     # 100 ticks en 2 s
+    _process(root, 1, 'init', 0, 10, 1, 25)
+    rows = scanner.scan(cpu_count=4)
+    by_pid = {pid: index for index, pid in enumerate(rows.pids)}
+    assert rows.cpu[by_pid[42]] == pytest.approx(50.0 / 4)
+    assert rows.memory[by_pid[42]] == pytest.approx(50 * 4096 * 100 / 1024000)
+    assert rows.ppids[by_pid[42]] == 1
+
+    # PID réattribué (starttime différent) : aucun delta avec l'ancien processus
+    now[0] += 1.0
+    _process(root, 42, 'other', 1, 5000, 900, 10)
+    rows = scanner.scan()
+    assert rows.cpu[list(rows.pids).index(42)] == 0.0
@@ -0,0 +1,72 @@
+"""
+Tests de l'enregistreur continu (formats, rotation, schéma .tkc, durabilité).
+"""
+import math
+
+import recorder
+from columnar_format import ColumnarReader
+from recorder import MetricsRecorder, read_recording
+
+
+def _snapshot(timestamp, **metrics):
+    return {'timestamp': timestamp, 'metrics': metrics}
+
+
+def _record(tmp_path, fmt, snapshots, **options):
+    rec = MetricsRecorder(tmp_path, fmt=fmt, flush_interval=0.01, **options)
+    rec.start()
+    for snapshot in snapshots:
+        assert rec.record(snapshot)
+    rec.stop()
+    return rec
+
+
+def test_ndjson_and_csv_round_trip(tmp_path):
+    snapshots = [_snapshot(1000.0 + i, cpu_percent=float(i), disks={'sda': {'read_kbps': 2.0 * i}})
+                 for i in range(3)]
+    rec = _record(tmp_path / 'ndjson', 'ndjson', snapshots)
+    assert rec.written == 3 and len(rec.files) == 1
+    assert [s['metrics']['cpu_percent'] for s in read_recording(rec.current_file)] == [0.0, 1.0, 2.0]
+
+    rec = _record(tmp_path / 'csv', 'csv', snapshots)
+    rows = list(read_recording(rec.current_file))
+    assert (1002.0, 'disks.sda.read_kbps', 4.0) in rows
+    assert len(rows) == 6
+
+
+def test_files_rotate_by_size(tmp_path):
+    snapshots = [_snapshot(1000.0 + i, cpu_percent=float(i)) for i in range(4)]
+    rec = _record(tmp_path, 'ndjson', snapshots, max_bytes=1, flush_records=1)
+    assert len(rec.files) == 4
+    assert sum(len(list(read_recording(path))) for path in rec.files) == 4
+
+
+def test_columnar_new_keys_start_a_new_file(tmp_path):
+    snapshots = [
+        _snapshot(1000.0, cpu_percent=1.0, disks={'sda': {'read_kbps': 1.0}}),
+        _snapshot(1001.0, cpu_percent=2.0, disks={'sda': {'read_kbps': 2.0}}),
+        _snapshot(1002.0, cpu_percent=3.0, disks={'sda': {'read_kbps': 3.0}, 'sdb': {'read_kbps': 9.0}}),
+        _snapshot(1003.0, cpu_percent=4.0, disks={'sdb': {'read_kbps': 8.0}}),
+    ]
+    rec = _record(tmp_path, 'tkc', snapshots, flush_records=10)
+    assert len(rec.files) == 2
+
+    first, second = (list(read_recording(path)) for path in rec.files)
+    assert [timestamp for timestamp, _ in first] == [1000.0, 1001.0]
+    assert [timestamp for timestamp, _ in second] == [1002.0, 1003.0]
+    assert second[0][1]['disks.sdb.read_kbps'] == 9.0
+    assert second[1][1]['cpu_percent'] == 4.0
+    # Les colonnes précédentes sont conservées ; une clé disparue vaut NaN
+    with ColumnarReader(rec.files[1]) as reader:
+        assert math.isnan(reader.column('disks.sda.read_kbps')[1])
+
+
+def test_every_format_is_synced_on_close(tmp_path, monkeypatch):
+    synced = []
+    real_fsync = recorder.os.fsync
+    monkeypatch.setattr(recorder.os, 'fsync', lambda fd: (synced.append(fd), real_fsync(fd)))
+    for fmt in recorder.RECORD_FORMATS:
+        synced.clear()
+        rec = _record(tmp_path / fmt, fmt, [_snapshot(1000.0, cpu_percent=1.0)], flush_records=10)
+        assert synced, fmt
+        assert len(list(read_recording(rec.current_file))) >= 1
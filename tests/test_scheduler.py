@@ -0,0 +1,59 @@
+"""
+Tests du planificateur à échéances (grille fixe, échéances manquées).
+"""
+from scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadlines_do_not_drift_with_job_duration():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock, slack=0.0)
+
+    def slow():
+        clock.now += 0.3
+
+    job = scheduler.add_job('tick', 1.0, slow, start=0.0)
+    assert scheduler.run_pending() == ['tick']
+    assert job.deadline == 1.0 and job.missed == 0
+
+    clock.now = 1.05
+    scheduler.run_pending()
+    assert job.deadline == 2.0
+
+
+def test_missed_deadlines_run_once_and_realign_on_grid():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock, slack=0.0)
+    calls = []
+    job = scheduler.add_job('tick', 1.0, lambda: calls.append(clock.now), start=0.0)
+    scheduler.run_pending()
+
+    clock.now = 4.5    # Échéances 1, 2, 3 et 4 dépassées
+    assert scheduler.run_pending() == ['tick']
+    assert len(calls) == 2    # Pas de rafale de rattrapage
+    assert job.missed == 3
+    assert job.deadline == 5.0
+    assert scheduler.time_until_next() == 0.5
+    assert scheduler.get_stats()['tick']['lateness_max_ms'] == 3500.0
+
+
+def test_deadline_advances_when_the_callback_raises():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock, slack=0.0)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    job = scheduler.add_job('tick', 1.0, fail, start=0.0)
+    try:
+        scheduler.run_pending()
+    except RuntimeError:
+        pass
+    assert job.deadline == 1.0 and job.runs == 1
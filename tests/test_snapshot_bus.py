@@ -0,0 +1,148 @@
+"""
+Tests du bus de snapshots (immuabilité, modes et politiques d'abonnement).
+"""
+import asyncio
+import json
+import threading
+import time
+from array import array
+
+import pytest
+
+from snapshot_bus import SnapshotBus
+from utils import json_default
+
+
+def _metrics():
+    return {
+        'cpu_percent': 12.5,
+        'cpu_history': memoryview(array('d', [1.0, 2.0, 3.0])),
+        'cpu_per_core': [10.0, 15.0],
+        'disks': {'sda': {'read_kbps': 4.0}},
+        'mounts': [{'mountpoint': '/', 'percent': 50.0}],
+    }
+
+
+def test_snapshot_is_deeply_frozen():
+    bus = SnapshotBus()
+    source = _metrics()
+    snapshot = bus.publish(source, {'cpu': [{'pid': 1, 'name': 'init', 'cpu_percent': 1.0}]})
+
+    # Les structures du producteur peuvent changer sans toucher le snapshot
+    source['disks']['sda']['read_kbps'] = 99.0
+    source['cpu_per_core'].append(20.0)
+    source['cpu_history'][0] = 42.0
+    assert snapshot.metrics['disks']['sda']['read_kbps'] == 4.0
+    assert snapshot.metrics['cpu_per_core'] == (10.0, 15.0)
+    assert snapshot.metrics['cpu_history'][0] == 1.0
+
+    with pytest.raises(TypeError):
+        snapshot.metrics['disks']['sda']['read_kbps'] = 0.0
+    with pytest.raises(TypeError):
+        snapshot.metrics['mounts'][0]['percent'] = 0.0
+    with pytest.raises(TypeError):
+        snapshot.top_processes['cpu'][0]['name'] = 'x'
+    with pytest.raises(TypeError):
+        snapshot.metrics['cpu_history'][0] = 0.0
+    with pytest.raises(AttributeError):
+        snapshot.version = 10
+
+
+def test_to_dict_is_plain_and_serializable():
+    snapshot = SnapshotBus().publish(_metrics(), {'cpu': [{'pid': 1}]})
+    data = snapshot.to_dict()
+    assert type(data['metrics']['disks']) is dict
+    assert data['metrics']['mounts'] == [{'mountpoint': '/', 'percent': 50.0}]
+    assert json.loads(json.dumps(data, default=json_default))['metrics']['cpu_history'] == [1.0, 2.0, 3.0]
+
+
+def test_versions_increase_and_latest_is_kept():
+    bus = SnapshotBus()
+    assert bus.latest() is None
+    first = bus.publish({'cpu_percent': 1.0})
+    second = bus.publish({'cpu_percent': 2.0})
+    assert (first.version, second.version) == (1, 2)
+    assert bus.latest() is second
+
+
+def _blocked_subscriber(bus, policy, maxsize=4):
+    """Abonné threadé bloqué sur son premier snapshot, jusqu'à `release`."""
+    release = threading.Event()
+    started = threading.Event()
+    seen = []
+
+    def callback(snapshot):
+        seen.append(snapshot['metrics']['n'])
+        started.set()
+        release.wait(5)
+
+    subscription = bus.subscribe(callback, mode='thread', policy=policy, maxsize=maxsize)
+    bus.publish({'n': 0})
+    assert started.wait(5)
+    return subscription, release, seen
+
+
+def test_latest_policy_keeps_only_newest_pending():
+    bus = SnapshotBus()
+    subscription, release, seen = _blocked_subscriber(bus, 'latest')
+    for n in range(1, 11):
+        bus.publish({'n': n})     # Ne bloque jamais, même abonné figé
+    assert subscription.dropped == 9
+    release.set()
+    deadline = time.monotonic() + 5
+    while len(seen) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    bus.close()
+    assert seen == [0, 10]
+
+
+def test_queue_policy_drops_oldest_beyond_maxsize():
+    bus = SnapshotBus()
+    subscription, release, seen = _blocked_subscriber(bus, 'queue', maxsize=4)
+    for n in range(1, 11):
+        bus.publish({'n': n})
+    assert subscription.dropped == 6
+    assert [snapshot['metrics']['n'] for snapshot in subscription._pending] == [7, 8, 9, 10]
+    release.set()
+
+
+def test_sync_subscriber_min_interval_and_unsubscribe():
+    bus = SnapshotBus()
+    seen = []
+    subscription = bus.subscribe(lambda snapshot: seen.append(snapshot.version), min_interval=60.0)
+    bus.publish({})
+    bus.publish({})
+    assert seen == [1]
+    assert subscription.dropped == 1
+    subscription.unsubscribe()
+    bus.publish({})
+    assert seen == [1]
+    assert bus.stats() == {}
+
+
+def test_failing_subscriber_does_not_stop_publication():
+    bus = SnapshotBus()
+    seen = []
+    bus.subscribe(lambda snapshot: 1 / 0, name='broken')
+    bus.subscribe(lambda snapshot: seen.append(snapshot.version))
+    bus.publish({})
+    assert seen == [1]
+
+
+def test_async_subscriber_awaits_coroutines():
+    bus = SnapshotBus()
+    loop = asyncio.new_event_loop()
+    seen = []
+
+    async def callback(snapshot):
+        await asyncio.sleep(0)
+        seen.append(snapshot.version)
+
+    try:
+        bus.subscribe(callback, mode='async', loop=loop)
+        bus.publish({})
+        bus.publish({})
+        loop.run_until_complete(asyncio.sleep(0.05))
+    finally:
+        loop.close()
+    assert seen[-1] == 2